@@ -0,0 +1,188 @@
+from collections import namedtuple
+import hashlib
+import json
+from pathlib import Path
+import pickle
+import sqlite3
+import subprocess
+import threading
+import time
+
+from rpmlint.version import __version__
+from xdg.BaseDirectory import xdg_cache_home
+
+
+# Stand-in for the package when diagnostics are replayed from the cache,
+# it carries just the attributes Filter.add_info looks at
+CachedPkg = namedtuple('CachedPkg', ('name', 'arch', 'current_linenum'))
+
+
+def cache_dir(configuration):
+    """
+    Return directory of the persistent caches
+    """
+    directory = configuration['CacheDir']
+    return Path(directory) if directory else Path(xdg_cache_home, 'rpmlint')
+
+
+class PersistentCache(object):
+    """
+    Key-value store in a SQLite table with the total size limited to
+    max_size bytes. When the limit is exceeded the least recently used
+    entries are evicted.
+
+    The connection is guarded by a lock so that the cache can be used
+    from several threads.
+    """
+
+    table = 'entries'
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # the database can be shared by several rpmlint processes
+        self.db = sqlite3.connect(str(path), timeout=60, check_same_thread=False)
+        with self.db:
+            self.db.execute(f'CREATE TABLE IF NOT EXISTS {self.table} '
+                            '(key TEXT PRIMARY KEY, value BLOB, size INTEGER, atime REAL)')
+
+    def serialize(self, value):
+        return value
+
+    def deserialize(self, content):
+        return content
+
+    def get(self, key):
+        """
+        Return the stored value or None if the key is not cached
+        """
+        with self.lock:
+            row = self.db.execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            with self.db:
+                self.db.execute(f'UPDATE {self.table} SET atime = ? WHERE key = ?', (time.time(), key))
+        return self.deserialize(row[0])
+
+    def put(self, key, value):
+        """
+        Store the value and evict the least recently used entries if the
+        cache is over its size
+        """
+        content = self.serialize(value)
+        with self.lock, self.db:
+            self.db.execute(f'INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)',
+                            (key, content, len(content), time.time()))
+            total = self.db.execute(f'SELECT TOTAL(size) FROM {self.table}').fetchone()[0]
+            if total <= self.max_size:
+                return
+            for old_key, size in self.db.execute(f'SELECT key, size FROM {self.table} ORDER BY atime').fetchall():
+                if total <= self.max_size:
+                    break
+                self.db.execute(f'DELETE FROM {self.table} WHERE key = ?', (old_key,))
+                total -= size
+
+    def close(self):
+        self.db.close()
+
+
+class ResultCache(PersistentCache):
+    """
+    Persistent cache of the diagnostics emitted for a package.
+
+    The results are keyed by the SHA-256 digest of the package file, the
+    fingerprint of the effective configuration, the rpmlint version, the
+    list of enabled checks and the host state they depend on (see
+    host_state of AbstractCheck).
+    """
+
+    table = 'results'
+
+    def __init__(self, path, max_size, configuration):
+        self.fingerprint = self.config_fingerprint(configuration)
+        super().__init__(path, max_size)
+
+    @staticmethod
+    def config_fingerprint(configuration):
+        """
+        Return digest of the configuration, it includes the filters and
+        badness loaded from rpmlintrc as they are merged to it
+        """
+        content = json.dumps(configuration, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def key(self, filename, checks, host_state=''):
+        """
+        Return the cache key for the package filename checked by the list
+        of checks in the host_state
+        """
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(self.fingerprint.encode())
+        digest.update(__version__.encode())
+        digest.update(' '.join(checks).encode())
+        digest.update(host_state.encode())
+        return digest.hexdigest()
+
+    def serialize(self, diagnostics):
+        return json.dumps(diagnostics)
+
+    def deserialize(self, content):
+        return json.loads(content)
+
+
+class ElfCache(PersistentCache):
+    """
+    Persistent cache of the parsed output of the ELF tools (readelf, ldd,
+    objdump and strings).
+
+    The entries are keyed by the digest of the file from the package
+    header, the tool and its version, so the same binary shipped in
+    another package, flavour or release is not analysed again.
+    """
+
+    table = 'elf'
+    # parsers and the tools they run
+    tools = {
+        'ReadelfParser': 'readelf',
+        'LddParser': 'ldd',
+        'ObjdumpParser': 'objdump',
+        'StringsParser': 'strings',
+    }
+    _tool_versions = None
+
+    @classmethod
+    def tool_versions(cls):
+        """
+        Return dictionary with the first line of the version of each tool
+        """
+        if cls._tool_versions is None:
+            versions = {}
+            for tool in cls.tools.values():
+                try:
+                    r = subprocess.run([tool, '--version'], encoding='utf8',
+                                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                    versions[tool] = r.stdout.partition('\n')[0]
+                except OSError:
+                    versions[tool] = ''
+            cls._tool_versions = versions
+        return cls._tool_versions
+
+    def key(self, digest, parser, path, *extra):
+        """
+        Return the cache key of the parser output for the file with digest
+        installed as path
+        """
+        tool_version = self.tool_versions()[self.tools[parser]]
+        parts = (digest, parser, tool_version, __version__, path) + extra
+        return hashlib.sha256('\0'.join(map(str, parts)).encode()).hexdigest()
+
+    def serialize(self, parser):
+        return pickle.dumps(parser)
+
+    def deserialize(self, content):
+        return pickle.loads(content)
@@ -1,12 +1,51 @@
 import re
 
+from rpmlint.helpers import installed_state
+
+# cost tiers of the checks from the cheapest one, a profile runs the checks
+# of its tier and of the tiers before it
+COST_TIERS = ('fast', 'standard', 'full')
+
 
 class AbstractCheck(object):
+    # cost tier of the check (see COST_TIERS) and what it needs to do its
+    # work: 'header', 'files' (the file list), 'content' (the extracted
+    # files) and 'tools' (external programs)
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    # external programs the check runs, see host_state
+    tools = ()
+    # True when the description file of the check describes all the issues
+    # the check reports, see reported_reasons
+    describes_all_reasons = False
+
     def __init__(self, config, output):
         # Note: do not add any capturing parentheses here
         self.macro_regex = re.compile(r'%+[{(]?[a-zA-Z_]\w{2,}[)}]?')
         self.config = config
         self.output = output
+        # compiled regexes the check looks for with pkg.grep, all of them
+        # are matched in a single pass over every scanned file
+        self.content_patterns = []
+
+    @classmethod
+    def reported_reasons(cls, config, output):
+        """
+        Return list of the names of all the issues the check reports, None
+        when they are not known up front. The check is not run at all when
+        all of them are filtered out.
+        """
+        if not cls.describes_all_reasons:
+            return None
+        return output.described_reasons(cls.__name__)
+
+    def host_state(self):
+        """
+        Return string describing what the results of the check depend on
+        besides the package and the configuration, e.g. the current date or
+        the installed tools. It is a part of the result cache key.
+        """
+        return installed_state(self.tools)
 
     def check(self, pkg):
         if pkg.is_source:
@@ -22,6 +61,23 @@ class AbstractCheck(object):
     def check_spec(self, pkg):
         return
 
+    def close(self):
+        """
+        Release the resources held by the check, called when the run ends
+        """
+        return
+
+    def reads_content(self, pkg, pkgfile):
+        """
+        Tell whether the check reads the content of pkgfile. Only the files
+        read by some of the enabled checks get extracted from the payload,
+        checks working just with the header data shall return False.
+
+        While the payload is extracted pkgfile is a FileView carrying only
+        the name, mode, flags and magic of the file.
+        """
+        return 'content' in self.needs
+
 
 class AbstractFilesCheck(AbstractCheck):
     def __init__(self, config, output, file_regexp):
@@ -29,10 +85,14 @@ class AbstractFilesCheck(AbstractCheck):
         super().__init__(config, output)
 
     def check_binary(self, pkg):
-        for filename in (x for x in pkg.files if x not in pkg.ghost_files):
-            if self.__files_re.match(filename):
+        ghost_files = pkg.ghost_files
+        for filename in pkg.files:
+            if filename not in ghost_files and self.__files_re.match(filename):
                 self.check_file(pkg, filename)
 
+    def reads_content(self, pkg, pkgfile):
+        return self.__files_re.match(pkgfile.name)
+
     def check_file(self, pkg, filename):
         """Virtual method called for each file that match the regexp passed
         to the constructor.
@@ -19,6 +19,10 @@ class AlternativesCheck(AbstractCheck):
       In %postun the update-alternatives with remove must be called
       Requires(post) and Requires(postun) must depend on update-alternatives
     """
+    cost = 'fast'
+    needs = ('header', 'files')
+    describes_all_reasons = True
+
     # Regex to match anything that can be in requires for update-alternatives
     re_requirement = re.compile(r'^(/usr/sbin/|%{?_sbindir}?/)?update-alternatives$')
     re_install = re.compile(r'--install\s+(?P<link>\S+)\s+(?P<name>\S+)\s+(\S+)\s+(\S+)')
@@ -33,6 +37,9 @@ class AlternativesCheck(AbstractCheck):
         self.install_binaries = {}
         self.slave_binaries = []
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check(self, pkg):
         if pkg.is_source:
             return
@@ -9,6 +9,11 @@ class AppDataCheck(AbstractFilesCheck):
     check appdata files for format violations
     https://www.freedesktop.org/software/appstream/docs/
     """
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('appstream-util',)
+    describes_all_reasons = True
+
     # default command, split here so we can mock it later
     cmd = f'appstream-util validate-relax --nonet '
 
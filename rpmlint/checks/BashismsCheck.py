@@ -5,10 +5,26 @@ from rpmlint.checks.AbstractCheck import AbstractFilesCheck
 
 
 class BashismsCheck(AbstractFilesCheck):
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('dash', 'checkbashisms')
+    describes_all_reasons = True
+
     def __init__(self, config, output):
         super().__init__(config, output, r'.*')
 
+    def _reports_issues(self):
+        return (self.output.is_reported('bin-sh-syntax-error') or
+                self.output.is_reported('potential-bashisms'))
+
+    def reads_content(self, pkg, pkgfile):
+        # the scripts are not needed when both the issues are filtered out
+        return self._reports_issues() and super().reads_content(pkg, pkgfile)
+
     def check_file(self, pkg, filename):
+        if not self._reports_issues():
+            return
+
         root = pkg.dirName()
         pkgfile = pkg.files[filename]
         filepath = root + filename
@@ -27,16 +43,18 @@ class BashismsCheck(AbstractFilesCheck):
         We need to see if it is valid syntax of bash and if there are no
         potential bash issues.
         """
-        try:
-            r = subprocess.run(['dash', '-n', filepath])
-            if r.returncode == 2:
-                self.output.add_info('W', pkg, 'bin-sh-syntax-error', filename)
-        except (FileNotFoundError, UnicodeDecodeError):
-            pass
-
-        try:
-            r = subprocess.run(['checkbashisms', filepath])
-            if r.returncode == 1:
-                self.output.add_info('W', pkg, 'potential-bashisms', filename)
-        except (FileNotFoundError, UnicodeDecodeError):
-            pass
+        if self.output.is_reported('bin-sh-syntax-error'):
+            try:
+                r = subprocess.run(['dash', '-n', filepath])
+                if r.returncode == 2:
+                    self.output.add_info('W', pkg, 'bin-sh-syntax-error', filename)
+            except (FileNotFoundError, UnicodeDecodeError):
+                pass
+
+        if self.output.is_reported('potential-bashisms'):
+            try:
+                r = subprocess.run(['checkbashisms', filepath])
+                if r.returncode == 1:
+                    self.output.add_info('W', pkg, 'potential-bashisms', filename)
+            except (FileNotFoundError, UnicodeDecodeError):
+                pass
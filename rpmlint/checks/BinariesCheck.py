@@ -1,20 +1,94 @@
 import concurrent.futures
 from pathlib import Path
 import re
+import sqlite3
 import stat
+import threading
 
 import rpm
+from rpmlint.cache import cache_dir, ElfCache
 from rpmlint.checks.AbstractCheck import AbstractCheck
+from rpmlint.helpers import installed_state, print_warning
 from rpmlint.lddparser import LddParser
+from rpmlint.libraryresolver import LibraryResolver
 from rpmlint.objdumpparser import ObjdumpParser
 from rpmlint.readelfparser import ReadelfParser
 from rpmlint.stringsparser import StringsParser
 
 
+class ElfFile(object):
+    """
+    State of one ELF file analysed by BinariesCheck.
+
+    ldd and objdump are run only when a check function reads the
+    corresponding parser first.
+    """
+
+    def __init__(self, check, pkg, pkgfile_path, path, is_exec=False, is_shobj=False):
+        self.check = check
+        self.pkg = pkg
+        self.pkgfile_path = pkgfile_path
+        self.path = path
+        self.is_exec = is_exec
+        self.is_shobj = is_shobj
+        pkgfile = pkg.files.get(path)
+        self.digest = pkgfile.md5 if pkgfile else None
+        self.readelf_parser = None
+        self._ldd_parser = None
+        self._objdump_parser = None
+        self.lock = threading.Lock()
+        # add_info arguments of the diagnostics of the file, the files are
+        # analysed concurrently so they are emitted later in the file order
+        self.diagnostics = []
+
+    def add_info(self, *args):
+        self.diagnostics.append(args)
+
+    def _lazy_parser(self, attr, parser_class, failed_info, parse=None):
+        with self.lock:
+            parser = getattr(self, attr)
+            if parser is None:
+                if parse is None:
+                    parser = self.check._parse_cached(self, parser_class.__name__,
+                                                      lambda: parser_class(self.pkgfile_path, self.path),
+                                                      lambda parser: parser.parsing_failed_reason)
+                else:
+                    parser = parse()
+                if parser.parsing_failed_reason:
+                    self.add_info('E', self.pkg, failed_info, self.path,
+                                  parser.parsing_failed_reason)
+                setattr(self, attr, parser)
+        return parser
+
+    @property
+    def ldd_parser(self):
+        # the resolved dependencies depend on the other files of the package,
+        # so they are not stored in the ELF cache
+        if self.check.native_ldd:
+            resolver = self.check.library_resolver(self.pkg)
+            return self._lazy_parser('_ldd_parser', LddParser, 'ldd-failed',
+                                     lambda: LddParser(self.pkgfile_path, self.path, resolver))
+        return self._lazy_parser('_ldd_parser', LddParser, 'ldd-failed')
+
+    @property
+    def objdump_parser(self):
+        native = self.check.native_elf_reader
+        return self._lazy_parser('_objdump_parser', ObjdumpParser, 'objdump-failed',
+                                 lambda: self.check._parse_cached(
+                                     self, 'ObjdumpParser',
+                                     lambda: ObjdumpParser(self.pkgfile_path, self.path, native),
+                                     lambda parser: parser.parsing_failed_reason,
+                                     native))
+
+
 class BinariesCheck(AbstractCheck):
     """
     Checks for binary files in the package.
     """
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('readelf', 'ldd', 'objdump', 'strings', 'c++filt')
+
     srcname_regex = re.compile(r'(.*?)-[0-9]')
     validso_regex = re.compile(r'(\.so\.\d+(\.\d+)*|\d\.so)$')
     soversion_regex = re.compile(r'.*?([0-9][.0-9]*)\.so|.*\.so\.([0-9][.0-9]*).*')
@@ -31,43 +105,137 @@ class BinariesCheck(AbstractCheck):
 
     def __init__(self, config, output):
         super().__init__(config, output)
-        self.is_exec = False
-        self.is_shobj = False
         self.system_lib_paths = config.configuration['SystemLibPaths']
+        self.native_elf_reader = config.configuration['UseNativeElfReader']
+        self.native_ldd = config.configuration['UseNativeDependencyResolver']
+        self._resolver = None
+        self.resolver_lock = threading.Lock()
+        self.elf_cache = self._open_elf_cache(config)
+        # ELF files of a package are analysed concurrently, the threads
+        # are shared by all the packages checked in the run
+        self.executor = None
         pie_exec_re = config.configuration['PieExecutables']
         self.pie_exec_re = re.compile(pie_exec_re) if pie_exec_re else None
         self.usr_lib_exception_regex = re.compile(config.configuration['UsrLibBinaryException'])
+        self.content_patterns = [self.invalid_dir_ref_regex]
 
-        self.setgid_call_regex = self.create_regexp_call(r'set(?:res|e)?gid')
-        self.setuid_call_regex = self.create_regexp_call(r'set(?:res|e)?uid')
-        self.setgroups_call_regex = self.create_regexp_call(r'(?:ini|se)tgroups')
-        self.mktemp_call_regex = self.create_regexp_call('mktemp')
-        self.gethostbyname_call_regex = self.create_regexp_call(r'(gethostbyname|gethostbyname2|gethostbyaddr|gethostbyname_r|gethostbyname2_r|gethostbyaddr_r)')
+        # names of the functions looked up in the function index
+        self.setgid_calls = {'setgid', 'setegid', 'setresgid'}
+        self.setuid_calls = {'setuid', 'seteuid', 'setresuid'}
+        self.setgroups_calls = {'setgroups', 'initgroups'}
+        self.mktemp_calls = {'mktemp'}
+        self.gethostbyname_calls = {'gethostbyname', 'gethostbyname2', 'gethostbyaddr',
+                                    'gethostbyname_r', 'gethostbyname2_r', 'gethostbyaddr_r'}
 
         # register all check functions
-        self.check_functions = [self._check_lto_section,
-                                self._check_no_text_in_archive,
-                                self._check_missing_symtab_in_archive,
-                                self._check_missing_debug_info_in_archive,
-                                self._check_executable_stack,
-                                self._check_shared_library,
-                                self._check_dependency,
-                                self._check_library_dependency_location,
-                                self._check_security_functions,
-                                self._check_rpath,
-                                self._check_library_dependency,
-                                self._check_forbidden_functions,
-                                self._check_executable_shlib,
-                                self._check_optflags]
+        check_functions = [self._check_lto_section,
+                           self._check_no_text_in_archive,
+                           self._check_missing_symtab_in_archive,
+                           self._check_missing_debug_info_in_archive,
+                           self._check_executable_stack,
+                           self._check_shared_library,
+                           self._check_dependency,
+                           self._check_library_dependency_location,
+                           self._check_security_functions,
+                           self._check_rpath,
+                           self._check_library_dependency,
+                           self._check_forbidden_functions,
+                           self._check_executable_shlib,
+                           self._check_optflags]
+        # precompile the forbidden function regexps and register their descriptions
+        self.forbidden_functions = {}
+        for name, func in config.configuration['WarnOnFunction'].items():
+            good_param = func.get('good_param')
+            self.forbidden_functions[name] = {
+                'f_name': func['f_name'],
+                'f_probe': self.create_function_probe(func['f_name']),
+                'waiver_regex': re.compile(good_param) if good_param else None,
+            }
+            self.output.error_details.update({name: func['description']})
+
+        disabled = config.configuration['DisabledElfChecks']
+        self.check_functions = [fn for fn in check_functions
+                                if fn.__name__[len('_check_'):] not in disabled]
+
+    def reads_content(self, pkg, pkgfile):
+        return pkgfile.magic.startswith('ELF ') or \
+            'current ar archive' in pkgfile.magic or \
+            'shell script' in pkgfile.magic or \
+            self.la_file_regex.search(pkgfile.name)
+
+    def host_state(self):
+        # the dependencies are resolved against the host libraries, the
+        # loader cache is rebuilt whenever they change
+        return super().host_state() + ' ' + installed_state(['/etc/ld.so.cache'])
+
+    def library_resolver(self, pkg):
+        """
+        Return LibraryResolver of the package, it's shared by all the ELF
+        files of the package
+        """
+        with self.resolver_lock:
+            if self._resolver is None or self._resolver.pkg is not pkg:
+                self._resolver = LibraryResolver(pkg, self.system_lib_paths)
+            return self._resolver
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.elf_cache is not None:
+            self.elf_cache.close()
+            self.elf_cache = None
+
+    def _submit(self, *args):
+        """
+        Run the ELF checks in the thread pool, it's started on first use
+        """
+        if self.executor is None:
+            threads = max(self.config.configuration['ElfThreads'], 1)
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+        return self.executor.submit(self._analyse_elf, *args)
 
     @staticmethod
-    def create_nonlibc_regexp_call(call):
-        r = r'(%s)\s?.*$' % call
-        return re.compile(r)
+    def _open_elf_cache(config):
+        """
+        Open the persistent cache of the ELF tools output if it is enabled
+        """
+        cache_size = config.configuration['ElfCacheSize']
+        if not cache_size:
+            return None
+        directory = cache_dir(config.configuration)
+        try:
+            return ElfCache(directory / 'elf.sqlite', cache_size * 1024 * 1024)
+        except (OSError, sqlite3.Error) as e:
+            print_warning(f'(none): W: unable to open the ELF cache in {directory}: {e}')
+            return None
+
+    def _parse_cached(self, elf, tool, parse, failed, *extra):
+        """
+        Return the tool parser created by parse() for the ELF file, it's
+        taken from the ELF cache when the file was analysed before.
+        Parsers for which failed(parser) is true are not stored.
+        """
+        key = None
+        if self.elf_cache and elf.digest:
+            key = self.elf_cache.key(elf.digest, tool, elf.path, *extra)
+            parser = self.elf_cache.get(key)
+            if parser is not None:
+                return parser
+        parser = parse()
+        if key and not failed(parser):
+            self.elf_cache.put(key, parser)
+        return parser
 
     @staticmethod
-    def create_regexp_call(call):
-        r = r'(%s(?:@GLIBC\S+)?)(?:\s|$)' % call
+    def create_function_probe(call):
+        """
+        Return set with the function name call or a regex if call is
+        a pattern, see ElfSymbolTableInfo.find_functions
+        """
+        if re.escape(call) == call:
+            return {call}
+        r = r'(%s)\s?.*$' % call
         return re.compile(r)
 
     def _check_libtool_wrapper(self, pkg, fname, pkgfile):
@@ -78,8 +246,7 @@ class BinariesCheck(AbstractCheck):
         if 'shell script' in pkgfile.magic:
             file_start = None
             try:
-                with open(pkgfile.path, 'rb') as inputf:
-                    file_start = inputf.read(2048)
+                file_start = pkg.read_file(pkgfile.path, 2048)
             except IOError:
                 pass
             if (file_start and b'This wrapper script should never '
@@ -141,7 +308,7 @@ class BinariesCheck(AbstractCheck):
             self.output.add_info('W', pkg, 'unstripped-binary-or-object',
                                  bin_name)
 
-    def _check_non_pie(self, pkg, bin_name, is_pie_exec):
+    def _check_non_pie(self, pkg, bin_name, is_pie_exec, is_shobj):
         """
         Check if the bin_name binary is built with PIE.
 
@@ -150,7 +317,7 @@ class BinariesCheck(AbstractCheck):
         We suppose that the package is arch dependent and bin_name is binary
         executable.
         """
-        if not self.is_shobj and not is_pie_exec:
+        if not is_shobj and not is_pie_exec:
             if self.pie_exec_re and self.pie_exec_re.search(bin_name):
                 self.output.add_info('E', pkg,
                                      'non-position-independent-executable',
@@ -214,16 +381,16 @@ class BinariesCheck(AbstractCheck):
         if has_usr_lib_file and not has_binary_in_usr_lib:
             self.output.add_info('W', pkg, 'only-non-binary-in-usr-lib')
 
-    def _check_no_text_in_archive(self, pkg, pkgfile_path, path):
+    def _check_no_text_in_archive(self, pkg, elf):
         """
         For an archive, test if any .text sections is empty.
         """
-        if self.readelf_parser.is_archive:
-            for comment in self.readelf_parser.comment_section_info.comments:
+        if elf.readelf_parser.is_archive:
+            for comment in elf.readelf_parser.comment_section_info.comments:
                 if comment.startswith('GHC '):
                     return
 
-            for elf_file in self.readelf_parser.section_info.elf_files:
+            for elf_file in elf.readelf_parser.section_info.elf_files:
                 code_in_text = False
                 for section in elf_file:
                     sn = section.name
@@ -233,70 +400,71 @@ class BinariesCheck(AbstractCheck):
                         code_in_text = True
                         break
                 if not code_in_text:
-                    self.output.add_info('E', pkg, 'lto-no-text-in-archive', path)
+                    elf.add_info('E', pkg, 'lto-no-text-in-archive', elf.path)
                     return
 
-    def _check_missing_symtab_in_archive(self, pkg, pkgfile_path, path):
+    def _check_missing_symtab_in_archive(self, pkg, elf):
         """
         FIXME Add test coverage.
         """
-        if self.readelf_parser.is_archive:
-            for elf_file in self.readelf_parser.section_info.elf_files:
+        if elf.readelf_parser.is_archive:
+            for elf_file in elf.readelf_parser.section_info.elf_files:
                 for section in elf_file:
                     if section.name == '.symtab':
                         return
 
-            self.output.add_info('E', pkg, 'static-library-without-symtab', path)
+            elf.add_info('E', pkg, 'static-library-without-symtab', elf.path)
 
-    def _check_missing_debug_info_in_archive(self, pkg, pkgfile_path, path):
-        if self.readelf_parser.is_archive:
-            for elf_file in self.readelf_parser.section_info.elf_files:
+    def _check_missing_debug_info_in_archive(self, pkg, elf):
+        if elf.readelf_parser.is_archive:
+            for elf_file in elf.readelf_parser.section_info.elf_files:
                 has_debug_info = any('.debug_' in section.name for section in elf_file)
                 if not has_debug_info:
-                    self.output.add_info('E', pkg, 'static-library-without-debuginfo', path)
+                    elf.add_info('E', pkg, 'static-library-without-debuginfo', elf.path)
                     return
 
     # Check for LTO sections
-    def _check_lto_section(self, pkg, pkgfile_path, path):
-        for elf_file in self.readelf_parser.section_info.elf_files:
+    def _check_lto_section(self, pkg, elf):
+        for elf_file in elf.readelf_parser.section_info.elf_files:
             for section in elf_file:
                 if '.gnu.lto_.' in section.name:
-                    self.output.add_info('E', pkg, 'lto-bytecode', path)
+                    elf.add_info('E', pkg, 'lto-bytecode', elf.path)
                     return
 
-    def _check_executable_stack(self, pkg, pkgfile_path, path):
+    def _check_executable_stack(self, pkg, elf):
         """
         Check if the stack is declared as executable which is usually an error.
 
         FIXME Add test coverage.
         """
-        if not self.readelf_parser.is_archive:
-            stack_headers = [h for h in self.readelf_parser.program_header_info.headers if h.name == 'GNU_STACK']
+        if not elf.readelf_parser.is_archive:
+            stack_headers = [h for h in elf.readelf_parser.program_header_info.headers if h.name == 'GNU_STACK']
             if not stack_headers:
-                self.output.add_info('E', pkg, 'missing-PT_GNU_STACK-section', path)
+                elf.add_info('E', pkg, 'missing-PT_GNU_STACK-section', elf.path)
             elif 'E' in stack_headers[0].flags:
-                self.output.add_info('E', pkg, 'executable-stack', path)
+                elf.add_info('E', pkg, 'executable-stack', elf.path)
 
-    def _check_soname_symlink(self, pkg, shlib, soname):
+    def _check_soname_symlink(self, pkg, elf, soname):
         """
         Check that we have a symlink with the soname in the package and it
         points to the checked shared library.
 
         Print an error if the symlink is invalid or missing.
         """
+        shlib = elf.path
         path = Path(shlib)
         symlink = path.parent / soname
         try:
 
             link = pkg.files[str(symlink)].linkto
             if link not in (shlib, path.parent, ''):
-                self.output.add_info('E', pkg, 'invalid-ldconfig-symlink', shlib, link)
+                elf.add_info('E', pkg, 'invalid-ldconfig-symlink', shlib, link)
         except KeyError:
             # if we do not have a symlink, report an issue
             if path.name.startswith('lib') or path.name.startswith('ld-'):
-                self.output.add_info('E', pkg, 'no-ldconfig-symlink', shlib)
+                elf.add_info('E', pkg, 'no-ldconfig-symlink', shlib)
 
-    def _check_shared_library(self, pkg, pkgfile_path, path):
+    def _check_shared_library(self, pkg, elf):
         """
         Various checks for the shared library.
 
@@ -307,17 +475,17 @@ class BinariesCheck(AbstractCheck):
         4) Print 'shlib-with-non-pic-code' error if the library contains
            object code that was compiled without -fPIC.
         """
-        if not self.readelf_parser.is_shlib:
+        if not elf.readelf_parser.is_shlib:
             return
 
-        soname = self.readelf_parser.dynamic_section_info.soname
+        soname = elf.readelf_parser.dynamic_section_info.soname
         if not soname:
-            self.output.add_info('W', pkg, 'no-soname', path)
+            elf.add_info('W', pkg, 'no-soname', elf.path)
         else:
             if not self.validso_regex.search(soname):
-                self.output.add_info('E', pkg, 'invalid-soname', path, soname)
+                elf.add_info('E', pkg, 'invalid-soname', elf.path, soname)
             else:
-                self._check_soname_symlink(pkg, path, soname)
+                self._check_soname_symlink(pkg, elf, soname)
 
                 # check if the major version of the library is in the package
                 # name
@@ -325,73 +493,79 @@ class BinariesCheck(AbstractCheck):
                 if res:
                     soversion = res.group(1) or res.group(2)
                     if soversion and soversion not in pkg.name:
-                        self.output.add_info('E', pkg, 'incoherent-version-in-name', soversion)
+                        elf.add_info('E', pkg, 'incoherent-version-in-name', soversion)
 
         # check if the object code in the library is compiled with PIC
-        if not self.readelf_parser.section_info.pic:
-            self.output.add_info('E', pkg, 'shlib-with-non-pic-code', path)
+        if not elf.readelf_parser.section_info.pic:
+            elf.add_info('E', pkg, 'shlib-with-non-pic-code', elf.path)
 
-    def _check_dependency(self, pkg, pkgfile_path, path):
+    def _check_dependency(self, pkg, elf):
         """
         FIXME Add test coverage.
         """
         # following issues are errors for shared libs and warnings for executables
-        if not self.readelf_parser.is_archive and not self.readelf_parser.is_debug:
-            info_type = 'E' if self.readelf_parser.is_shlib else 'W'
-            for symbol in self.ldd_parser.undefined_symbols:
-                self.output.add_info(info_type, pkg, 'undefined-non-weak-symbol', path, symbol)
-            for dependency in self.ldd_parser.unused_dependencies:
-                self.output.add_info(info_type, pkg, 'unused-direct-shlib-dependency',
-                                     path, dependency)
+        if not elf.readelf_parser.is_archive and not elf.readelf_parser.is_debug:
+            info_type = 'E' if elf.readelf_parser.is_shlib else 'W'
+            for symbol in elf.ldd_parser.undefined_symbols:
+                elf.add_info(info_type, pkg, 'undefined-non-weak-symbol', elf.path, symbol)
+            for dependency in elf.ldd_parser.unused_dependencies:
+                elf.add_info(info_type, pkg, 'unused-direct-shlib-dependency',
+                             elf.path, dependency)
 
-    def _check_library_dependency_location(self, pkg, pkgfile_path, path):
+    def _check_library_dependency_location(self, pkg, elf):
         """
         FIXME Add test coverage.
         """
-        if not self.readelf_parser.is_archive:
-            for dependency in self.ldd_parser.dependencies:
+        if not elf.readelf_parser.is_archive:
+            for dependency in elf.ldd_parser.dependencies:
                 if dependency.startswith('/opt/'):
-                    self.output.add_info('E', pkg, 'linked-against-opt-library', path, dependency)
+                    elf.add_info('E', pkg, 'linked-against-opt-library', elf.path, dependency)
                     break
 
         nonusr = ('/bin', '/lib', '/sbin')
-        if path.startswith(nonusr):
-            for dependency in self.ldd_parser.dependencies:
+        if elf.path.startswith(nonusr) and not elf.readelf_parser.is_archive:
+            for dependency in elf.ldd_parser.dependencies:
                 if dependency.startswith('/usr/'):
-                    self.output.add_info('W', pkg, 'linked-against-usr-library', path, dependency)
+                    elf.add_info('W', pkg, 'linked-against-usr-library', elf.path, dependency)
                     break
 
-    def _check_security_functions(self, pkg, pkgfile_path, path):
-        setgid = any(self.readelf_parser.symbol_table_info.get_functions_for_regex(self.setgid_call_regex))
-        setuid = any(self.readelf_parser.symbol_table_info.get_functions_for_regex(self.setuid_call_regex))
-        setgroups = any(self.readelf_parser.symbol_table_info.get_functions_for_regex(self.setgroups_call_regex))
-        mktemp = any(self.readelf_parser.symbol_table_info.get_functions_for_regex(self.mktemp_call_regex))
-        gethostbyname = any(self.readelf_parser.symbol_table_info.get_functions_for_regex(self.gethostbyname_call_regex))
+    def _check_security_functions(self, pkg, elf):
+        found = elf.readelf_parser.symbol_table_info.find_functions({
+            'setgid': self.setgid_calls,
+            'setuid': self.setuid_calls,
+            'setgroups': self.setgroups_calls,
+            'mktemp': self.mktemp_calls,
+            'gethostbyname': self.gethostbyname_calls})
+        setgid = 'setgid' in found
+        setuid = 'setuid' in found
+        setgroups = 'setgroups' in found
+        mktemp = 'mktemp' in found
+        gethostbyname = 'gethostbyname' in found
 
         if setgid and setuid and not setgroups:
-            self.output.add_info('E', pkg, 'missing-call-to-setgroups-before-setuid', path)
+            elf.add_info('E', pkg, 'missing-call-to-setgroups-before-setuid', elf.path)
 
         if mktemp:
-            self.output.add_info('E', pkg, 'call-to-mktemp', path)
+            elf.add_info('E', pkg, 'call-to-mktemp', elf.path)
 
         if gethostbyname:
-            self.output.add_info('W', pkg, 'binary-or-shlib-calls-gethostbyname', path)
+            elf.add_info('W', pkg, 'binary-or-shlib-calls-gethostbyname', elf.path)
 
-    def _check_rpath(self, pkg, pkgfile_path, path):
-        for runpath in self.readelf_parser.dynamic_section_info.runpath:
+    def _check_rpath(self, pkg, elf):
+        for runpath in elf.readelf_parser.dynamic_section_info.runpath:
             if runpath in self.system_lib_paths or not self.usr_lib_regex.search(runpath):
-                self.output.add_info('E', pkg, 'binary-or-shlib-defines-rpath', path, runpath)
+                elf.add_info('E', pkg, 'binary-or-shlib-defines-rpath', elf.path, runpath)
                 return
 
-    def _check_library_dependency(self, pkg, pkgfile_path, path):
-        dyn_section = self.readelf_parser.dynamic_section_info
+    def _check_library_dependency(self, pkg, elf):
+        dyn_section = elf.readelf_parser.dynamic_section_info
         if not len(dyn_section.needed) and not (dyn_section.soname and
                                                 self.ldso_soname_regex.search(dyn_section.soname)):
-            if self.is_shobj:
+            if elf.is_shobj:
                 msg = 'shared-library-without-dependency-information'
             else:
                 msg = 'statically-linked-binary'
-            self.output.add_info('E', pkg, msg, path)
+            elf.add_info('E', pkg, msg, elf.path)
         else:
             # linked against libc ?
             if 'libc.' not in dyn_section.runpath and \
@@ -401,61 +575,57 @@ class BinariesCheck(AbstractCheck):
                 for lib in dyn_section.needed:
                     if 'libc.' in lib:
                         return
-                if self.is_shobj:
+                if elf.is_shobj:
                     msg = 'library-not-linked-against-libc'
                 else:
                     msg = 'program-not-linked-against-libc'
-                self.output.add_info('W', pkg, msg, path)
-
-    def _check_forbidden_functions(self, pkg, pkgfile_path, path):
-        forbidden_functions = self.config.configuration['WarnOnFunction']
-        if forbidden_functions:
-            for name, func in forbidden_functions.items():
-                # precompile regexps
-                f_name = func['f_name']
-                func['f_regex'] = self.create_nonlibc_regexp_call(f_name)
-                if 'good_param' in func and func['good_param']:
-                    func['waiver_regex'] = re.compile(func['good_param'])
-                # register descriptions
-                self.output.error_details.update({name: func['description']})
-
-        forbidden_calls = []
-        for r_name, func in forbidden_functions.items():
-            if any(self.readelf_parser.symbol_table_info.get_functions_for_regex(func['f_regex'])):
-                forbidden_calls.append(r_name)
+                elf.add_info('W', pkg, msg, elf.path)
 
-        if not forbidden_calls:
+    def _check_forbidden_functions(self, pkg, elf):
+        # the filtered functions need neither the lookup nor the waivers
+        reported = {name: func['f_probe'] for name, func in self.forbidden_functions.items()
+                    if self.output.is_reported(name)}
+        if not reported:
             return
+        found = elf.readelf_parser.symbol_table_info.find_functions(reported)
+        forbidden_calls = [name for name in reported if name in found]
 
-        strings_parser = StringsParser(pkgfile_path)
-        failed_reason = strings_parser.parsing_failed_reason
-        if failed_reason:
-            self.output.add_info('E', pkg, 'strings-failed', path, failed_reason)
+        if not forbidden_calls:
             return
 
-        forbidden_functions_filtered = []
-
-        for fn in forbidden_calls:
-            f = forbidden_functions[fn]
-            if 'waiver_regex' not in f:
-                forbidden_functions_filtered.append(fn)
-                continue
+        waivers = {name: self.forbidden_functions[name]['waiver_regex'] for name in forbidden_calls
+                   if self.forbidden_functions[name]['waiver_regex']}
+        if waivers:
+            strings_parser = self._parse_cached(elf, 'StringsParser',
+                                                lambda: StringsParser(elf.pkgfile_path, self.native_elf_reader),
+                                                lambda parser: parser.parsing_failed_reason,
+                                                self.native_elf_reader)
+            failed_reason = strings_parser.parsing_failed_reason
+            if failed_reason:
+                elf.add_info('E', pkg, 'strings-failed', elf.path, failed_reason)
+                return
 
-            waiver = any(map(lambda string: f['waiver_regex'].search(string), strings_parser.strings))
-            if not waiver:
-                forbidden_functions_filtered.append(fn)
+            # match all the waivers in one pass over the strings, every
+            # waiver is dropped after its first hit
+            for string in strings_parser.strings:
+                for name, waiver_regex in list(waivers.items()):
+                    if waiver_regex.search(string):
+                        del waivers[name]
+                        forbidden_calls.remove(name)
+                if not waivers:
+                    break
 
-        for fn in forbidden_functions_filtered:
-            self.output.add_info('W', pkg, fn, path, forbidden_functions[fn]['f_name'])
+        for name in forbidden_calls:
+            elf.add_info('W', pkg, name, elf.path, self.forbidden_functions[name]['f_name'])
 
-    def _check_executable_shlib(self, pkg, pkgfile_path, path):
-        if not self.is_exec and self.readelf_parser.is_shlib:
-            interp = [h for h in self.readelf_parser.program_header_info.headers if h.name == 'INTERP']
+    def _check_executable_shlib(self, pkg, elf):
+        if not elf.is_exec and elf.readelf_parser.is_shlib:
+            interp = [h for h in elf.readelf_parser.program_header_info.headers if h.name == 'INTERP']
             if interp:
-                self.output.add_info('E', pkg, 'shared-library-not-executable', path)
+                elf.add_info('E', pkg, 'shared-library-not-executable', elf.path)
 
-    def _check_optflags(self, pkg, pkgfile_path, path):
-        if self.readelf_parser.is_archive:
+    def _check_optflags(self, pkg, elf):
+        if elf.readelf_parser.is_archive:
             return
 
         mandatory_optflags = self.config.configuration['MandatoryOptflags']
@@ -463,43 +633,54 @@ class BinariesCheck(AbstractCheck):
         if not mandatory_optflags and not forbidden_optflags:
             return
 
-        for dwarf_unit in self.objdump_parser.compile_units:
+        for dwarf_unit in elf.objdump_parser.compile_units:
             tokens = dwarf_unit['producer'].split(' ')
             missing = [mo for mo in mandatory_optflags if mo not in tokens]
             forbidden = [f for f in forbidden_optflags if f in tokens]
             if missing:
-                self.output.add_info('W', pkg, 'missing-mandatory-optflags', path, ' '.join(missing))
+                elf.add_info('W', pkg, 'missing-mandatory-optflags', elf.path, ' '.join(missing))
             if forbidden:
-                self.output.add_info('E', pkg, 'forbidden-optflags', path, ' '.join(forbidden))
+                elf.add_info('E', pkg, 'forbidden-optflags', elf.path, ' '.join(forbidden))
 
-    def run_elf_checks(self, pkg, pkgfile_path, path):
-        self.readelf_parser = ReadelfParser(pkgfile_path, path)
-        failed_reason = self.readelf_parser.parsing_failed_reason()
-        if failed_reason:
-            self.output.add_info('E', pkg, 'readelf-failed', path, failed_reason)
-            return
+    def run_elf_checks(self, pkg, pkgfile_path, path, is_exec=False, is_shobj=False):
+        """
+        Run all the check functions on the ELF file pkgfile_path installed
+        as path, emit their diagnostics and return its ElfFile.
+        """
+        elf = self._analyse_elf(pkg, pkgfile_path, path, is_exec, is_shobj)
+        self._emit_diagnostics(elf)
+        return elf
 
-        if not self.readelf_parser.is_archive:
-            self.ldd_parser = LddParser(pkgfile_path, path)
-            failed_reason = self.ldd_parser.parsing_failed_reason
-            if failed_reason:
-                self.output.add_info('E', pkg, 'ldd-failed', path, failed_reason)
-                return
+    def _analyse_elf(self, pkg, pkgfile_path, path, is_exec, is_shobj):
+        """
+        Run all the check functions on the ELF file, the diagnostics are
+        only collected in the returned ElfFile so it can run in a thread
+        """
+        elf = ElfFile(self, pkg, pkgfile_path, path, is_exec, is_shobj)
+        elf.readelf_parser = self._parse_cached(elf, 'ReadelfParser',
+                                                lambda: ReadelfParser(pkgfile_path, path, self.native_elf_reader),
+                                                lambda parser: parser.parsing_failed_reason(),
+                                                self.native_elf_reader)
+        failed_reason = elf.readelf_parser.parsing_failed_reason()
+        if failed_reason:
+            elf.add_info('E', pkg, 'readelf-failed', path, failed_reason)
+            return elf
 
-            self.objdump_parser = ObjdumpParser(pkgfile_path, path)
-            failed_reason = self.objdump_parser.parsing_failed_reason
-            if failed_reason:
-                self.output.add_info('E', pkg, 'objdump-failed', path, failed_reason)
-                return
+        for fn in self.check_functions:
+            fn(pkg, elf)
+        return elf
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = []
-            for fn in self.check_functions:
-                futures.append(executor.submit(fn, pkg, pkgfile_path, path))
-            concurrent.futures.wait(futures)
+    def _emit_diagnostics(self, elf):
+        """
+        Pass the diagnostics collected for the ELF file to the output
+        """
+        for args in elf.diagnostics:
+            self.output.add_info(*args)
+        elf.diagnostics = []
 
     def check_binary(self, pkg):
         exec_files = []
+        elf_files = []
         multi_pkg = False
         pkg_has_lib = False
         pkg_has_binary = False
@@ -507,6 +688,9 @@ class BinariesCheck(AbstractCheck):
         pkg_has_usrlib_file = False
         pkg_has_file_in_lib64 = False
 
+        # the type of every file is needed below
+        pkg.classify_files()
+
         #  go through the all files, run files checks and collect data that are
         #  needed later
         for fname, pkgfile in pkg.files.items():
@@ -568,35 +752,42 @@ class BinariesCheck(AbstractCheck):
 
             self._check_unstripped_binary(fname, pkg, pkgfile)
 
-            self.is_exec = 'executable' in pkgfile.magic
-            self.is_shobj = 'shared object' in pkgfile.magic
+            is_exec = 'executable' in pkgfile.magic
+            is_shobj = 'shared object' in pkgfile.magic
             is_pie_exec = 'pie executable' in pkgfile.magic
 
-            # run ELF checks
-            self.run_elf_checks(pkg, pkgfile.path, fname)
+            # run ELF checks, the files are analysed concurrently
+            future = self._submit(pkg, pkgfile.path, fname, is_exec, is_shobj)
+            elf_files.append((fname, is_pie_exec, future))
+
+        # collect data from the ELF files in the order of the files
+        for fname, is_pie_exec, future in elf_files:
+            elf = future.result()
+            self._emit_diagnostics(elf)
 
             # inspect binary file
-            is_shlib = self.readelf_parser.is_shlib
+            is_shlib = elf.readelf_parser.is_shlib
 
             if is_shlib:
                 pkg_has_lib = True
 
             # skip non-exec and non-SO
             # executables and shared objects only from here on
-            if not self.is_exec and not self.is_shobj:
+            is_exec = elf.is_exec
+            if not is_exec and not elf.is_shobj:
                 continue
 
-            if self.is_shobj and not self.is_exec and '.so' not in fname and \
+            if elf.is_shobj and not is_exec and '.so' not in fname and \
                     self.bin_regex.search(fname):
                 # pkgfile.magic does not contain 'executable' for PIEs
-                self.is_exec = True
+                is_exec = True
 
-            if self.is_exec:
+            if is_exec:
                 # add to the list of the all exec files
                 if self.bin_regex.search(fname):
                     exec_files.append(fname)
 
-                self._check_non_pie(pkg, fname, is_pie_exec)
+                self._check_non_pie(pkg, fname, is_pie_exec, elf.is_shobj)
 
         # find out if we have a multi-package
         srpm = pkg[rpm.RPMTAG_SOURCERPM]
@@ -11,10 +11,23 @@ class BuildDateCheck(AbstractFilesCheck):
 
     If so, it causes the package to rebuild when it's not needed.
     """
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+    describes_all_reasons = True
+
     def __init__(self, config, output):
         super().__init__(config, output, r'.*')
         self.looksliketime = re.compile('(2[0-3]|[01]?[0-9]):([0-5]?[0-9]):([0-5]?[0-9])')
         self.istoday = re.compile(time.strftime('%b %e %Y'))
+        self.content_patterns = [self.istoday, self.looksliketime]
+
+    def host_state(self):
+        return self.istoday.pattern
+
+    def reads_content(self, pkg, pkgfile):
+        # the same files check_file greps
+        return not pkg.is_source and stat.S_ISREG(pkgfile.mode) and \
+            not pkgfile.name.startswith('/usr/lib/debug')
 
     def check_file(self, pkg, filename):
         if filename.startswith('/usr/lib/debug') or pkg.is_source or \
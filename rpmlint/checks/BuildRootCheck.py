@@ -6,6 +6,10 @@ from rpmlint.checks.AbstractCheck import AbstractFilesCheck
 
 
 class BuildRootCheck(AbstractFilesCheck):
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+    describes_all_reasons = True
+
     def __init__(self, config, output):
         super().__init__(config, output, r'.*')
         self.prepare_regex(rpm.expandMacro('%buildroot'))
@@ -14,6 +18,12 @@ class BuildRootCheck(AbstractFilesCheck):
         for m in ('name', 'version', 'release', 'NAME', 'VERSION', 'RELEASE'):
             buildroot = buildroot.replace('%%{%s}' % (m), r'[\w\!-\.]{1,20}')
         self.build_root_re = re.compile(buildroot)
+        self.content_patterns = [self.build_root_re]
+
+    def reads_content(self, pkg, pkgfile):
+        # the same files check_file greps
+        return not pkg.is_source and stat.S_ISREG(pkgfile.mode) and \
+            not pkgfile.name.startswith('/usr/lib/debug')
 
     def check_file(self, pkg, filename):
         if filename.startswith('/usr/lib/debug') or pkg.is_source:
@@ -6,6 +6,13 @@ class ConfigFilesCheck(AbstractCheck):
     Check that configuration files are in a proper location and marked as
     'noreplace'.
     """
+    cost = 'fast'
+    needs = ('header', 'files')
+    describes_all_reasons = True
+
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check_binary(self, pkg):
         for filename in pkg.config_files:
             self._check_non_confdir_files(pkg, filename)
@@ -4,6 +4,12 @@ from rpmlint.checks.AbstractCheck import AbstractCheck
 
 
 class DBusPolicyCheck(AbstractCheck):
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+
+    def reads_content(self, pkg, pkgfile):
+        return pkgfile.name.startswith('/etc/dbus-1/system.d/')
+
     def check(self, pkg):
         if pkg.is_source:
             return
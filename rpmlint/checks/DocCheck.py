@@ -10,6 +10,11 @@ class DocCheck(AbstractCheck):
     """
     Package documentation checks.
     """
+    cost = 'fast'
+    needs = ('header', 'files')
+
+    def reads_content(self, pkg, pkgfile):
+        return False
 
     def check_binary(self, pkg):
         if not pkg.doc_files:
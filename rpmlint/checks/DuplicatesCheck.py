@@ -1,4 +1,3 @@
-import os
 import stat
 
 from rpmlint.checks.AbstractCheck import AbstractCheck
@@ -17,7 +16,16 @@ class DuplicatesCheck(AbstractCheck):
     sizes
     - key: md5 hash of the file
     - values: size of the file
+
+    nlinks
+    - key: inode of the file
+    - values: number of hard links to the file in the package
     """
+    cost = 'fast'
+    needs = ('header', 'files')
+
+    def reads_content(self, pkg, pkgfile):
+        return False
 
     def check(self, pkg):
         if pkg.is_source:
@@ -25,6 +33,7 @@ class DuplicatesCheck(AbstractCheck):
 
         md5s = {}
         sizes = {}
+        nlinks = {}
         total_dup_size = 0
 
         for fname, pkgfile in pkg.files.items():
@@ -34,6 +43,7 @@ class DuplicatesCheck(AbstractCheck):
             # fillup md5s and sizes dicts
             md5s.setdefault(pkgfile.md5, set()).add(fname)
             sizes[pkgfile.md5] = pkgfile.size
+            nlinks[pkgfile.inode] = nlinks.get(pkgfile.inode, 0) + 1
 
         # process duplicates
         for md5_hash in md5s:
@@ -52,11 +62,10 @@ class DuplicatesCheck(AbstractCheck):
 
             prefix = self._get_prefix(first)
 
-            st = os.stat(pkg.dirName() + '/' + first)
             # 1 (first) + number of others - number of hard links
             # (keeps track of how many directories have entries for this file)
             # diff is a number of files that are duplicates but not hard-links
-            diff = 1 + len(duplicates) - st[stat.ST_NLINK]
+            diff = 1 + len(duplicates) - nlinks[pkg.files[first].inode]
 
             if diff <= 0:
                 # now we have just hard-links in duplicates
@@ -7,6 +7,10 @@ from rpmlint.helpers import byte_to_string
 
 
 class ErlangCheck(AbstractFilesCheck):
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+    describes_all_reasons = True
+
     def __init__(self, config, output):
         super().__init__(config, output, r'.*?\.beam$')
         build_dir = expandMacro('%_builddir')
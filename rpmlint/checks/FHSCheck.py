@@ -13,6 +13,9 @@ class FHSCheck(AbstractCheck):
     FHS_usr_subdirs lists allowed directories in /usr (FHS chapter 4.2 and 4.3)
     FHS_var_subdirs lists allowed directories in /var (FHS chapter 5.2 and 5.3)
     """
+    cost = 'fast'
+    needs = ('header', 'files')
+
     usr_regex = re.compile('^/usr/([^/]+)')
     FHS_usr_subdirs = ('bin', 'lib', 'local', 'sbin', 'share', 'games', 'include',
                        'libexec', 'lib64', 'src', 'spool', 'tmp')
@@ -26,6 +29,9 @@ class FHSCheck(AbstractCheck):
         super().__init__(config, output)
         self.output.error_details.update(fhs_details_dict)
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check_binary(self, pkg):
         var_list = []
         usr_list = []
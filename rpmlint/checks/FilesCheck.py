@@ -18,7 +18,7 @@ import subprocess
 import rpm
 from rpmlint.checks.AbstractCheck import AbstractCheck
 from rpmlint.helpers import byte_to_string
-from rpmlint.pkg import catcmd, is_utf8, is_utf8_bytestr
+from rpmlint.pkg import catcmd, is_utf8_bytestr
 
 # must be kept in sync with the filesystem package
 STANDARD_DIRS = (
@@ -333,12 +333,17 @@ def script_interpreter(chunk):
 
 
 class FilesCheck(AbstractCheck):
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('gzip', 'bzip2', 'xz', 'gtbl', 'groff')
 
     man_regex = re.compile(r'/man(?:\d[px]?|n)/')
     info_regex = re.compile(r'(/usr/share|/usr)/info/')
 
     def __init__(self, config, output):
         super().__init__(config, output)
+        self.content_patterns = [buildconfig_rpath_regex, start_certificate_regex,
+                                 start_private_key_regex]
         self.use_debugsource = self.config.configuration['UseDebugSource']
         self.games_group_regex = re.compile(self.config.configuration['RpmGamesGroup'])
         self.dangling_exceptions = self.config.configuration['DanglingSymlinkExceptions']
@@ -387,6 +392,12 @@ class FilesCheck(AbstractCheck):
                                              """A file in the package is located in %s. It's not permitted
         for packages to install files in this directory.""" % i})
 
+    def reads_content(self, pkg, pkgfile):
+        # the beginning of every regular file of a binary package is peeked
+        # at, the content of the source packages is not read
+        return not pkg.is_source and stat.S_ISREG(pkgfile.mode) and \
+            not pkgfile.flags & rpm.RPMFILE_GHOST
+
     def peek(self, filename, pkg, length=1024):
         """
         Peek into a file, return a chunk from its beginning and a flag if it
@@ -394,8 +405,7 @@ class FilesCheck(AbstractCheck):
         """
         chunk = None
         try:
-            with open(filename, 'rb') as fobj:
-                chunk = fobj.read(length)
+            chunk = pkg.read_file(filename, length)
         except IOError as e:  # eg. https://bugzilla.redhat.com/209876
             self.output.add_info('W', pkg, 'read-error', e)
             return (chunk, False)
@@ -842,7 +852,7 @@ class FilesCheck(AbstractCheck):
                 res = man_base_regex.search(f)
                 if res:
                     man_basenames.add(res.group(1))
-                    if chunk:
+                    if chunk and self.output.is_reported('manual-page-warning'):
                         # TODO: sequence based invocation
                         command = subprocess.run(
                             '%s %s | gtbl | groff -mtty-char -Tutf8 '
@@ -917,7 +927,7 @@ class FilesCheck(AbstractCheck):
                         # We check only doc text files for UTF-8-ness;
                         # checking everything may be slow and can generate
                         # lots of unwanted noise.
-                        if not is_utf8(pkgfile.path):
+                        if not pkg.is_utf8(pkgfile.path):
                             self.output.add_info('W', pkg, 'file-not-utf8', f)
                     if fsf_license_regex.search(chunk) and \
                             fsf_wrong_address_regex.search(chunk):
@@ -927,7 +937,7 @@ class FilesCheck(AbstractCheck):
                     ff = compr_regex.sub('', f)
                     if not self.skipdocs_regex.search(ff):
                         # compressed docs, eg. info and man files etc
-                        if not is_utf8(pkgfile.path):
+                        if not pkg.is_utf8(pkgfile.path):
                             self.output.add_info('W', pkg, 'file-not-utf8', f)
 
             # normal dir check
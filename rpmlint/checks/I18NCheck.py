@@ -69,6 +69,19 @@ def is_valid_lang(lang):
 
 
 class I18NCheck(AbstractCheck):
+    cost = 'fast'
+    needs = ('header', 'files')
+    describes_all_reasons = True
+
+    @classmethod
+    def reported_reasons(cls, config, output):
+        return super().reported_reasons(config, output) + \
+            [prefix + correct for correct in INCORRECT_LOCALES.values()
+             for prefix in ('incorrect-i18n-tag-', 'incorrect-locale-')]
+
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check_binary(self, pkg):
         files = list(pkg.files.keys())
         files.sort()
@@ -4,9 +4,16 @@ from rpmlint.checks.AbstractCheck import AbstractCheck
 
 
 class IconSizesCheck(AbstractCheck):
+    cost = 'fast'
+    needs = ('header', 'files')
+    describes_all_reasons = True
+
     file_size_regex = re.compile(r'/icons/[^/]+/(?P<x>\d+)x(?P<y>\d+)/')
     info_size_regex = re.compile(r'(?P<x>\d+) x (?P<y>\d+)')
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check(self, pkg):
         if pkg.is_source:
             return
@@ -12,7 +12,6 @@ import re
 
 import rpm
 from rpmlint.checks.AbstractCheck import AbstractCheck
-from rpmlint.helpers import readlines
 
 
 chkconfig_content_regex = re.compile(r'^\s*#\s*chkconfig:\s*([-0-9]+)\s+[-0-9]+\s+[-0-9]+')
@@ -60,12 +59,17 @@ def substitute_shell_vars(val, script):
 
 
 class InitScriptCheck(AbstractCheck):
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
 
     def __init__(self, config, output):
         super().__init__(config, output)
         self.use_deflevels = self.config.configuration['UseDefaultRunlevels']
         self.use_subsys = self.config.configuration['UseVarLockSubsys']
 
+    def reads_content(self, pkg, pkgfile):
+        return pkgfile.name.startswith(('/etc/init.d/', '/etc/rc.d/init.d/'))
+
     def check_binary(self, pkg):
         initscript_list = []
         for fname, pkgfile in pkg.files.items():
@@ -108,7 +112,7 @@ class InitScriptCheck(AbstractCheck):
             # check common error in file content
             content = None
             try:
-                content = list(readlines(pkgfile.path))
+                content = pkg.read_lines(pkgfile.path)
             except Exception as e:
                 self.output.add_info('W', pkg, 'read-error', e)
                 continue
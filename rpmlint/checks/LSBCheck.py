@@ -15,9 +15,16 @@ class LSBCheck(AbstractCheck):
     Note: It uses values gained from rpm (RPMTAGs) not parsed from .rpm
     filename.
     """
+    cost = 'fast'
+    needs = ('header',)
+    describes_all_reasons = True
+
     name_regex = re.compile('^[a-z0-9.+-]+$')
     version_regex = re.compile('^[a-zA-Z0-9.+]+$')
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check(self, pkg):
         self._check_lsb_name(pkg)
         self._check_lsb_version(pkg)
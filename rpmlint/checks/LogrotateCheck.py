@@ -4,6 +4,12 @@ from rpmlint.checks.AbstractCheck import AbstractCheck
 
 
 class LogrotateCheck(AbstractCheck):
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+
+    def reads_content(self, pkg, pkgfile):
+        return pkgfile.name.startswith('/etc/logrotate.d/')
+
     def check(self, pkg):
         if pkg.is_source:
             return
@@ -17,7 +23,7 @@ class LogrotateCheck(AbstractCheck):
 
             if f.startswith('/etc/logrotate.d/'):
                 try:
-                    for n, o in self.parselogrotateconf(pkg.dirName(), f).items():
+                    for n, o in self.parselogrotateconf(pkg, f).items():
                         if n in dirs and dirs[n] != o:
                             self.output.add_info('E', pkg, 'logrotate-duplicate', n)
                         else:
@@ -38,9 +44,9 @@ class LogrotateCheck(AbstractCheck):
                                      '%s %s:%s %04o' % (d, files[d].user, files[d].group, mode))
 
     # extremely primitive logrotate parser
-    def parselogrotateconf(self, root, f):
+    def parselogrotateconf(self, pkg, f):
         dirs = {}
-        with open('/'.join((root, f))) as fd:
+        with pkg.open_text('/'.join((pkg.dirName(), f))) as fd:
             currentdirs = []
             for line in fd.readlines():
                 line = line.strip()
@@ -25,14 +25,26 @@ command_regex = re.compile(r'command=(?:\"([^\"]+)\"|([^ %s\"]+))' % '\t')
 icon_regex = re.compile(r'icon=\"?([^\" ]+)')
 update_menus_regex = re.compile(r'^[^#]*update-menus', re.MULTILINE)
 xpm_ext_regex = re.compile(r'/usr/share/icons/(mini/|large/).*\.xpm$')
+xpm_transparent_regex = re.compile('None",')
 version_regex = re.compile(r'([0-9.][0-9.]+)($|\s)')
 xdg_migrated_regex = re.compile(r'xdg=\"?([^\" ]+)')
 
 
 class MenuCheck(AbstractCheck):
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('/lib/cpp',)
+    describes_all_reasons = True
+
+    @classmethod
+    def reported_reasons(cls, config, output):
+        # the icon types come from the configuration
+        return super().reported_reasons(config, output) + \
+            [value['type'] + '-icon-not-in-package' for value in config.configuration['IconPath'].values()]
 
     def __init__(self, config, output):
         super().__init__(config, output)
+        self.content_patterns = [xpm_transparent_regex]
         self.valid_sections = self.config.configuration['ValidMenuSections']
         self.standard_needs = self.config.configuration['ExtraMenuNeeds']
         self.icon_paths = self.config.configuration['IconPath']
@@ -42,6 +54,9 @@ class MenuCheck(AbstractCheck):
         for value in self.launchers.values():
             value['regexp'] = re.compile(value['regexp'])
 
+    def reads_content(self, pkg, pkgfile):
+        return menu_file_regex.search(pkgfile.name) or xpm_ext_regex.search(pkgfile.name)
+
     def check_binary(self, pkg):
         files = pkg.files
         menus = []
@@ -72,7 +87,7 @@ class MenuCheck(AbstractCheck):
                     # Check non transparent xpm files
                     res = xpm_ext_regex.search(fname)
                     if res:
-                        if stat.S_ISREG(mode) and not pkg.grep('None",', fname):
+                        if stat.S_ISREG(mode) and not pkg.grep(xpm_transparent_regex, fname):
                             self.output.add_info('W', pkg, 'non-transparent-xpm', fname)
                 if fname.startswith('/usr/lib64/menu'):
                     self.output.add_info('E', pkg, 'menu-in-wrong-dir', fname)
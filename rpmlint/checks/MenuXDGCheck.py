@@ -19,6 +19,11 @@ class MenuXDGCheck(AbstractFilesCheck):
     """
     Check whether MenuXDG files installed by a package are valid.
     """
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('desktop-file-validate',)
+    describes_all_reasons = True
+
     def __init__(self, config, output):
         # desktop file need to be in $XDG_DATA_DIRS
         # $ echo $XDG_DATA_DIRS/applications
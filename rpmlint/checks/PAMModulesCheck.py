@@ -4,12 +4,18 @@ from rpmlint.checks.AbstractCheck import AbstractCheck
 
 
 class PAMModulesCheck(AbstractCheck):
+    cost = 'fast'
+    needs = ('header', 'files')
+
     pam_module_re = re.compile(r'^(?:/usr)?/lib(?:64)?/security/([^/]+\.so)$')
 
     def __init__(self, config, output):
         super().__init__(config, output)
         self.pam_whitelist = config.configuration['PAMModulesWhiteList']
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check(self, pkg):
         if pkg.is_source:
             return
@@ -8,6 +8,10 @@ class PkgConfigCheck(AbstractFilesCheck):
     """
     Validate that .pc files are correct.
     """
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+    describes_all_reasons = True
+
     suspicious_dir = re.compile(r'[=:](?:/usr/src/\w+/BUILD|/var/tmp|/tmp|/home)')
 
     def __init__(self, config, output):
@@ -27,7 +31,7 @@ class PkgConfigCheck(AbstractFilesCheck):
             return
 
         try:
-            with open(pkg.dirName() + '/' + filename, 'r', encoding='utf-8') as pc_file:
+            with pkg.open_text(pkg.dirName() + '/' + filename, encoding='utf-8') as pc_file:
                 for line in pc_file:
                     self._check_invalid_pkgconfig_file(pkg, filename, line)
                     self._check_invalid_libs_dir(pkg, filename, line)
@@ -71,10 +71,14 @@ def check_syntax_script(prog, commandline, script):
 
 
 class PostCheck(AbstractCheck):
+    cost = 'full'
+    needs = ('header', 'files', 'tools')
 
     def __init__(self, config, output):
         super().__init__(config, output)
         self.valid_shells = config.configuration['ValidShells']
+        # the scriptlets are checked by their interpreters
+        self.tools = [shell for shell in self.valid_shells if shell.startswith('/')]
         self.empty_shells = config.configuration['ValidEmptyShells']
         post_details_dict = {
             'postin-without-ghost-file-creation':
@@ -115,6 +119,9 @@ class PostCheck(AbstractCheck):
             })
         self.output.error_details.update(post_details_dict)
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check_binary(self, pkg):
         prereq = [x[0] for x in pkg.prereq]
 
@@ -6,16 +6,35 @@
 # Purpose       : check the presence of a PGP signature.
 #############################################################################
 
+import glob
 import re
 
+import rpm
 from rpmlint.checks.AbstractCheck import AbstractCheck
-from rpmlint.helpers import print_warning
+from rpmlint.helpers import installed_state, print_warning
 
 
 class SignatureCheck(AbstractCheck):
+    cost = 'full'
+    needs = ('header', 'tools')
+    tools = ('rpm',)
+    describes_all_reasons = True
+
     pgp_regex = re.compile(r'pgp|gpg', re.IGNORECASE)
     unknown_key_regex = re.compile(r'\(MISSING KEYS:(?:\([^)]+\))?\s+([^\)]+)\)')
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
+    def host_state(self):
+        # the keys are imported to the rpm database or to the keyring
+        keys = []
+        for macro in ('%{_dbpath}', '%{?_keyringpath}'):
+            directory = rpm.expandMacro(macro)
+            if directory:
+                keys += sorted(glob.glob(directory + '/*'))
+        return super().host_state() + ' ' + installed_state(keys)
+
     def check(self, pkg):
         res = pkg.checkSignature()
         if not res or res[0] != 0:
@@ -7,6 +7,9 @@ class SourceCheck(AbstractCheck):
     """
     Validate files in a source package.
     """
+    cost = 'fast'
+    needs = ('header', 'files')
+
     source_regex = re.compile(r'\.(tar|tgz)$')
     compressed_fileext_magic = {
         'xz': 'XZ compressed',
@@ -29,6 +32,9 @@ class SourceCheck(AbstractCheck):
         }
         self.output.error_details.update(source_details_dict)
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check_source(self, pkg):
         # process file list
         for fname, pkgfile in pkg.files.items():
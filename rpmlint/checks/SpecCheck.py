@@ -112,6 +112,9 @@ def contains_buildroot(line):
 
 
 class SpecCheck(AbstractCheck):
+    cost = 'full'
+    needs = ('header', 'files', 'content', 'tools')
+    tools = ('rpm',)
 
     def __init__(self, config, output):
         super().__init__(config, output)
@@ -123,6 +126,10 @@ class SpecCheck(AbstractCheck):
                                          '%s'.""" % ', '.join(self.valid_groups)})
         self.hardcoded_lib_path_exceptions_regex = re.compile(config.configuration['HardcodedLibPathExceptions'])
 
+    def reads_content(self, pkg, pkgfile):
+        # the spec file and all the sources
+        return pkg.is_source
+
     def check_source(self, pkg):
         wrong_spec = False
 
@@ -4,21 +4,27 @@ from rpmlint.checks.AbstractCheck import AbstractCheck
 
 
 class SysVInitOnSystemdCheck(AbstractCheck):
+    cost = 'fast'
+    needs = ('header', 'files')
+    describes_all_reasons = True
+
     def __init__(self, config, output):
         super().__init__(config, output)
         self.initscripts = set()
         self.bootscripts = set()
         self.systemdscripts = set()
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check(self, pkg):
         if pkg.is_source:
             return
 
         self._find_services_and_scripts(pkg)
 
-        for req in pkg.requires + pkg.prereq:
-            if req[0] == 'insserv':
-                self.output.add_info('E', pkg, 'obsolete-insserv-requirement')
+        if 'insserv' in pkg.req_names:
+            self.output.add_info('E', pkg, 'obsolete-insserv-requirement')
 
         for filename in self.bootscripts:
             self.output.add_info('E', pkg, 'deprecated-boot-script', filename)
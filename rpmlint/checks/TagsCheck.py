@@ -40,12 +40,16 @@ oldest_changelog_timestamp = calendar.timegm(time.strptime('1995-01-01', '%Y-%m-
 
 
 class TagsCheck(AbstractCheck):
+    cost = 'fast'
+    needs = ('header', 'files')
 
     def __init__(self, config, output):
         super().__init__(config, output)
         self.valid_groups = config.configuration['ValidGroups']
         self.valid_licenses = config.configuration['ValidLicenses']
-        self.invalid_requires = map(re.compile, config.configuration['InvalidRequires'])
+        invalid_requires = config.configuration['InvalidRequires']
+        self.invalid_requires_regex = invalid_requires and \
+            re.compile('|'.join('(?:%s)' % r for r in invalid_requires))
         self.packager_regex = re.compile(config.configuration['Packager'])
         self.release_ext = config.configuration['ReleaseExtension']
         self.extension_regex = self.release_ext and re.compile(self.release_ext)
@@ -92,6 +96,13 @@ class TagsCheck(AbstractCheck):
                     continue
                 self.output.add_info('W', pkg, 'unexpanded-macro', tagname, match)
 
+    def reads_content(self, pkg, pkgfile):
+        return False
+
+    def host_state(self):
+        # the spelling depends on the installed dictionaries
+        return ' '.join(self.spellchecker.dictionaries()) if self.spellcheck else ''
+
     def check(self, pkg):
 
         packager = pkg[rpm.RPMTAG_PACKAGER]
@@ -132,7 +143,7 @@ class TagsCheck(AbstractCheck):
         if self.use_epoch:
             for tag in ('obsoletes', 'conflicts', 'provides', 'recommends',
                         'suggests', 'enhances', 'supplements'):
-                for x in (x for x in getattr(pkg, tag)()
+                for x in (x for x in getattr(pkg, tag)
                           if x[1] and x[2][0] is None):
                     self.output.add_info('W', pkg, 'no-epoch-in-%s' % tag,
                                          Pkg.formatRequire(*x))
@@ -147,9 +158,9 @@ class TagsCheck(AbstractCheck):
             if self.use_epoch and d[1] and d[2][0] is None and \
                     not d[0].startswith('rpmlib('):
                 self.output.add_info('W', pkg, 'no-epoch-in-dependency', value)
-            for r in self.invalid_requires:
-                if r.search(d[0]):
-                    self.output.add_info('E', pkg, 'invalid-dependency', d[0])
+            if self.invalid_requires_regex and \
+                    self.invalid_requires_regex.search(d[0]):
+                self.output.add_info('E', pkg, 'invalid-dependency', d[0])
 
             if d[0].startswith('/usr/local/'):
                 self.output.add_info('E', pkg, 'invalid-dependency', d[0])
@@ -217,12 +228,12 @@ class TagsCheck(AbstractCheck):
                         else:
                             prov = res.group(1) + '-devel'
 
-                        if prov not in (x[0] for x in pkg.provides):
+                        if prov not in pkg.dependencies.names('provides'):
                             self.output.add_info('W', pkg, 'no-provides', prov)
 
                 if has_pc:
                     found_pkg_config_dep = False
-                    for p in (x[0] for x in pkg.provides):
+                    for p in pkg.dependencies.names('provides'):
                         if p.startswith('pkgconfig('):
                             found_pkg_config_dep = True
                             break
@@ -233,10 +244,8 @@ class TagsCheck(AbstractCheck):
         ignored_words = set()
         for pf in pkg.files:
             ignored_words.update(pf.split('/'))
-        ignored_words.update((x[0] for x in pkg.provides))
-        ignored_words.update((x[0] for x in pkg.requires))
-        ignored_words.update((x[0] for x in pkg.conflicts))
-        ignored_words.update((x[0] for x in pkg.obsoletes))
+        for kind in ('provides', 'requires', 'conflicts', 'obsoletes'):
+            ignored_words.update(pkg.dependencies.names(kind))
 
         langs = pkg[rpm.RPMTAG_HEADERI18NTABLE]
 
@@ -379,10 +388,9 @@ class TagsCheck(AbstractCheck):
                 elif tag == 'URL':
                     self.output.add_info('W', pkg, 'no-url-tag')
 
-        obs_names = [x[0] for x in pkg.obsoletes]
-        prov_names = [x[0] for x in pkg.provides]
+        prov_names = pkg.dependencies.names('provides')
 
-        for o in (x for x in obs_names if x not in prov_names):
+        for o in (x[0] for x in pkg.obsoletes if x[0] not in prov_names):
             self.output.add_info('W', pkg, 'obsolete-not-provided', o)
         for o in pkg.obsoletes:
             value = Pkg.formatRequire(*o)
@@ -390,12 +398,8 @@ class TagsCheck(AbstractCheck):
 
         # TODO: should take versions, <, <=, =, >=, > into account here
         #       https://bugzilla.redhat.com/460872
-        useless_provides = set()
-        for p in prov_names:
-            if (prov_names.count(p) != 1 and
-                    not p.startswith('debuginfo(') and
-                    p not in useless_provides):
-                useless_provides.add(p)
+        useless_provides = (p for p, provs in prov_names.items()
+                            if len(provs) != 1 and not p.startswith('debuginfo('))
         for p in sorted(useless_provides):
             self.output.add_info('E', pkg, 'useless-provides', p)
 
@@ -458,7 +462,7 @@ class TagsCheck(AbstractCheck):
             self.output.add_info('E', pkg, 'tag-not-utf8', '%description', lang)
         description = byte_to_string(description)
         self._unexpanded_macros(pkg, '%%description -l %s' % lang, description)
-        if self.spellcheck:
+        if self.spellcheck and self.output.is_reported('spelling-error'):
             pkgname = byte_to_string(pkg.header[rpm.RPMTAG_NAME])
             typos = self.spellchecker.spell_check(description, '%description -l {}', lang, pkgname, ignored_words)
             for typo in typos.items():
@@ -480,7 +484,7 @@ class TagsCheck(AbstractCheck):
             self.output.add_info('E', pkg, 'tag-not-utf8', 'Summary', lang)
         summary = byte_to_string(summary)
         self._unexpanded_macros(pkg, 'Summary(%s)' % lang, summary)
-        if self.spellcheck:
+        if self.spellcheck and self.output.is_reported('spelling-error'):
             pkgname = byte_to_string(pkg.header[rpm.RPMTAG_NAME])
             typos = self.spellchecker.spell_check(summary, 'Summary({})', lang, pkgname, ignored_words)
             for typo in typos.items():
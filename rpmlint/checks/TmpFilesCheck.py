@@ -10,10 +10,16 @@ class TmpFilesCheck(AbstractCheck):
     """
     Validate that temporary files meet tmpfiles.d packaging rules.
     """
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+    describes_all_reasons = True
 
     # interesting types in tmpfiles.d configuration file (see tmpfiles.d(5))
     interesting_types = ('f', 'F', 'w', 'd', 'D', 'p', 'L', 'c', 'b')
 
+    def reads_content(self, pkg, pkgfile):
+        return pkgfile.name.startswith('/usr/lib/tmpfiles.d/')
+
     def check(self, pkg):
         if pkg.is_source:
             return
@@ -71,7 +77,7 @@ class TmpFilesCheck(AbstractCheck):
 
         Print a warning if it's not there.
         """
-        with open(pkgfile.path) as inputf:
+        with pkg.open_text(pkgfile.path) as inputf:
             for line in inputf:
                 # skip comments
                 line = line.split('#')[0].split('\n')[0]
@@ -2,10 +2,16 @@ from rpmlint.checks.AbstractCheck import AbstractCheck
 
 
 class XinetdDepCheck(AbstractCheck):
+    cost = 'fast'
+    needs = ('header',)
+    describes_all_reasons = True
+
+    def reads_content(self, pkg, pkgfile):
+        return False
+
     def check(self, pkg):
         if pkg.is_source:
             return
 
-        for req in pkg.requires + pkg.prereq:
-            if req[0] == 'xinetd':
-                self.output.add_info('E', pkg, 'obsolete-xinetd-requirement')
+        if 'xinetd' in pkg.req_names:
+            self.output.add_info('E', pkg, 'obsolete-xinetd-requirement')
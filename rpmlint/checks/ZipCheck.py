@@ -9,14 +9,21 @@ class ZipCheck(AbstractCheck):
     """
     Validate zip and jar files correctness.
     """
+    cost = 'standard'
+    needs = ('header', 'files', 'content')
+
     zip_regex = re.compile(r'\.(zip|[ewj]ar)$')
     jar_regex = re.compile(r'\.[ewj]ar$')
 
+    def reads_content(self, pkg, pkgfile):
+        return self.zip_regex.search(pkgfile.name)
+
     def check(self, pkg):
         for fname, pkgfile in pkg.files.items():
+            if not self.zip_regex.search(fname):
+                continue
             path = pkgfile.path
-            if self.zip_regex.search(fname) and Path(path).exists() and \
-               Path(path).is_file() and is_zipfile(path):
+            if Path(path).exists() and Path(path).is_file() and is_zipfile(path):
                 try:
                     with ZipFile(path, 'r') as z:
                         # zip checks
@@ -2,6 +2,7 @@ import argparse
 from pathlib import Path
 import sys
 
+from rpmlint.checks.AbstractCheck import COST_TIERS
 from rpmlint.helpers import print_warning
 from rpmlint.lint import Lint
 from rpmlint.rpmdiff import Rpmdiff
@@ -87,6 +88,11 @@ def process_lint_args(argv):
     parser.add_argument('-v', '--verbose', '--info', action='store_true', help='provide detailed explanations where available')
     parser.add_argument('-p', '--print-config', action='store_true', help='print the settings that are in effect when using the rpmlint')
     parser.add_argument('-i', '--installed', nargs='+', default='', help='installed packages to be validated by rpmlint')
+    parser.add_argument('--no-cache', action='store_true', help='do not use the persistent caches of the check results and of the ELF analysis')
+    parser.add_argument('--format', choices=('text', 'jsonl'), default='text', help='output format of the diagnostics, jsonl prints one JSON object per line')
+    parser.add_argument('--stream', action='store_true', help='print the diagnostics of each package as soon as it is checked')
+    parser.add_argument('--profile', choices=COST_TIERS, help='run only the checks up to the cost tier, full by default')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N', help='number of packages to be validated in parallel, 0 means number of CPUs')
     lint_modes_parser = parser.add_mutually_exclusive_group()
     lint_modes_parser.add_argument('-s', '--strict', action='store_true', help='treat all messages as errors')
     lint_modes_parser.add_argument('-P', '--permissive', action='store_true', help='treat individual errors as non-fatal')
@@ -102,6 +108,9 @@ def process_lint_args(argv):
         if not options.config.exists():
             print_warning(f"User specified configuration '{options.config}' does not exist")
             exit(2)
+    if options.jobs < 0:
+        print_warning(f'Invalid number of jobs: {options.jobs}')
+        exit(2)
     # make sure rpmlintrc exists
     if options.rpmlintrc:
         if not options.rpmlintrc.exists():
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+import threading
+
+
+class ContentCache(object):
+    """
+    LRU cache of the content of the package files shared by all the checks,
+    the size of the stored content is limited to max_size bytes.
+
+    The beginning of a file is stored when only the head is requested, it's
+    replaced by the whole content when some check needs more of the file.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.lock = threading.Lock()
+        # path -> (content, whether it's the whole file)
+        self.entries = OrderedDict()
+
+    def read(self, path, length=None):
+        """
+        Return the first length bytes of the file on path, the whole content
+        when length is None. OSError is raised when the file can't be read.
+        """
+        path = str(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None:
+                content, complete = entry
+                if complete or (length is not None and len(content) >= length):
+                    self.entries.move_to_end(path)
+                    return content if length is None else content[:length]
+
+        with open(path, 'rb') as f:
+            content = f.read() if length is None else f.read(length)
+        complete = length is None or len(content) < length
+        self._store(path, content, complete)
+        return content
+
+    def _store(self, path, content, complete):
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.size -= len(old[0])
+            if len(content) > self.max_size:
+                return
+            self.entries[path] = (content, complete)
+            self.size += len(content)
+            while self.size > self.max_size:
+                _, (evicted, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
@@ -0,0 +1,149 @@
+import codecs
+import re
+import threading
+
+# patterns referring to their groups can't be merged to the combined one
+backreference_regex = re.compile(r'\\[1-9]|\(\?P=')
+# bytes read from the scanned files at once
+read_chunk_size = 1 << 16
+
+
+def read_text(path):
+    """
+    Return the content of the file on path as it was read line by line in
+    the text mode: up to the first line that isn't valid UTF-8 and with
+    the universal newlines. None is returned if the file can't be read.
+
+    The file is read in chunks of read_chunk_size bytes and the reading
+    stops at the first invalid byte, so the binary files are not loaded
+    whole. The text returned is kept in memory though, the patterns are
+    searched in all of it at once.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = []
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(read_chunk_size)
+                # bytes of a character split by the previous chunk
+                pending = decoder.getstate()[0]
+                try:
+                    chunks.append(decoder.decode(data, final=not data))
+                except UnicodeDecodeError as e:
+                    # keep the complete lines before the invalid byte
+                    chunks.append((pending + data)[:e.start].decode())
+                    text = ''.join(chunks)
+                    text = text[:text.rfind('\n') + 1]
+                    break
+                if not data:
+                    text = ''.join(chunks)
+                    break
+    except OSError:
+        return None
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+class ContentScanner(object):
+    """
+    Matcher of the regular expressions the checks look for in the content
+    of the package files.
+
+    The checks register their patterns up front (see content_patterns of
+    AbstractCheck). Every file is then read once and searched by a single
+    combined expression, the individual patterns are run only on the files
+    the combined expression matches.
+
+    The patterns match the same lines as when they were searched line by
+    line: every match found in the whole text in the multiline mode is
+    confirmed by the original pattern on its line, so matches spanning
+    several lines are skipped.
+    """
+
+    def __init__(self, regexes=()):
+        self.lock = threading.Lock()
+        # regex -> the pattern compiled in the multiline mode
+        self.patterns = {}
+        self._combined = None
+        for regex in regexes:
+            self.register(regex)
+
+    def register(self, regex):
+        """
+        Add the regex (compiled str pattern) to the patterns searched in
+        every scanned file
+        """
+        with self.lock:
+            if regex not in self.patterns:
+                self.patterns[regex] = re.compile(regex.pattern, regex.flags | re.MULTILINE)
+                self._combined = None
+
+    def _combine(self, regexes):
+        """
+        Return (combined pattern or None, patterns to run on their own)
+        """
+        mergeable = []
+        separate = []
+        for regex in regexes:
+            pattern = self.patterns[regex]
+            if pattern.flags == re.UNICODE | re.MULTILINE and not backreference_regex.search(pattern.pattern):
+                mergeable.append(pattern.pattern)
+            else:
+                separate.append(regex)
+        if not mergeable:
+            return None, separate
+        try:
+            combined = re.compile('|'.join(f'(?:{pattern})' for pattern in mergeable), re.MULTILINE)
+        except re.error:
+            return None, list(regexes)
+        return combined, separate
+
+    def scan(self, path, regexes=None):
+        """
+        Return dictionary with the line number of the first match of each
+        of regexes (all the registered ones by default) in the file on path,
+        None is stored for the regexes that don't match.
+        """
+        with self.lock:
+            if regexes is None:
+                regexes = list(self.patterns)
+                if self._combined is None:
+                    self._combined = self._combine(regexes)
+                combined, separate = self._combined
+            else:
+                combined, separate = self._combine(regexes)
+            patterns = {regex: self.patterns[regex] for regex in regexes}
+
+        matches = dict.fromkeys(regexes)
+        text = read_text(path)
+        if not text:
+            return matches
+        if combined is None or combined.search(text):
+            candidates = regexes
+        else:
+            candidates = separate
+        for regex in candidates:
+            matches[regex] = self._first_line(text, regex, patterns[regex])
+        return matches
+
+    @staticmethod
+    def _first_line(text, regex, pattern):
+        """
+        Return number of the first line of text regex matches, pattern is
+        regex in the multiline mode used to skip the lines without match
+        """
+        pos = 0
+        while True:
+            match = pattern.search(text, pos)
+            # an empty match after the last newline isn't on any line
+            if not match or match.start() == len(text) and text.endswith('\n'):
+                return None
+            start = text.rfind('\n', 0, match.start()) + 1
+            end = text.find('\n', match.start())
+            end = len(text) if end == -1 else end + 1
+            if regex.search(text[start:end]):
+                return text.count('\n', 0, start) + 1
+            if end == len(text):
+                return None
+            pos = end
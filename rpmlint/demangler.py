@@ -0,0 +1,90 @@
+import ctypes
+import ctypes.util
+from functools import lru_cache
+import subprocess
+import threading
+
+
+class Demangler(object):
+    """
+    Demangler of the C++ symbol names shared by all the checked files.
+
+    The names are demangled in-process by __cxa_demangle of libstdc++ when
+    the library can be loaded. Otherwise a single c++filt process is kept
+    running and the names are fed to it line by line.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = None
+        self.cxa_demangle = None
+        self.free = None
+        try:
+            libstdcxx = ctypes.CDLL(ctypes.util.find_library('stdc++'))
+            libc = ctypes.CDLL(ctypes.util.find_library('c'))
+            # getattr as the name would be mangled as a private one here
+            self.cxa_demangle = getattr(libstdcxx, '__cxa_demangle')
+            self.free = libc.free
+        except (OSError, TypeError, AttributeError):
+            return
+        self.cxa_demangle.restype = ctypes.c_void_p
+        self.cxa_demangle.argtypes = [ctypes.c_char_p, ctypes.c_void_p, ctypes.c_void_p,
+                                      ctypes.POINTER(ctypes.c_int)]
+        self.free.argtypes = [ctypes.c_void_p]
+
+    def demangle(self, symbol):
+        """
+        Return the demangled symbol, names that are not mangled are
+        returned unchanged
+        """
+        if self.cxa_demangle is None:
+            return self._demangle_cxxfilt(symbol)
+        # c++filt demangles only the function and variable names, the
+        # library would turn a name like 'i' to the type 'int'
+        if not symbol.startswith('_Z'):
+            return symbol
+        status = ctypes.c_int()
+        result = self.cxa_demangle(symbol.encode(), None, None, ctypes.byref(status))
+        if not result:
+            return symbol
+        try:
+            return ctypes.string_at(result).decode('utf-8', errors='replace')
+        finally:
+            self.free(result)
+
+    def _demangle_cxxfilt(self, symbol):
+        with self.lock:
+            if self.process is None:
+                self.process = subprocess.Popen(['c++filt'], encoding='utf8', bufsize=1,
+                                                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            try:
+                self.process.stdin.write(symbol + '\n')
+                self.process.stdin.flush()
+                line = self.process.stdout.readline()
+            except OSError:
+                line = ''
+            if not line:
+                # start a new process for the next symbol
+                self.process.kill()
+                self.process = None
+                raise OSError('c++filt terminated unexpectedly')
+            return line.rstrip('\n')
+
+
+_demangler = None
+_demangler_lock = threading.Lock()
+
+
+@lru_cache(maxsize=65536)
+def demangle(symbol):
+    """
+    Return the demangled C++ symbol, the results are memoized as the same
+    symbols (libstdc++, Qt, ...) recur in many binaries.
+
+    OSError is raised when c++filt is needed and can't be run.
+    """
+    global _demangler
+    with _demangler_lock:
+        if _demangler is None:
+            _demangler = Demangler()
+    return _demangler.demangle(symbol)
@@ -0,0 +1,364 @@
+import struct
+import zlib
+
+from rpmlint.elfreader import ElfReaderError, map_elf_objects, SHF_COMPRESSED, SHT_NOBITS
+
+# compression types of SHF_COMPRESSED sections
+ELFCOMPRESS_ZLIB = 1
+
+DW_UT_skeleton = 0x04
+
+DW_TAG_compile_unit = 0x11
+DW_AT_producer = 0x25
+DW_AT_str_offsets_base = 0x72
+
+# unit types of DWARF 5 with the size of the additional header fields,
+# None stands for the offset size
+DW_UT_HEADER_EXTRA = {
+    0x01: (),            # DW_UT_compile
+    0x02: (8, None),     # DW_UT_type
+    0x03: (),            # DW_UT_partial
+    0x04: (8,),          # DW_UT_skeleton
+    0x05: (8,),          # DW_UT_split_compile
+    0x06: (8, None),     # DW_UT_split_type
+}
+
+# attribute forms
+DW_FORM_addr = 0x01
+DW_FORM_block2 = 0x03
+DW_FORM_block4 = 0x04
+DW_FORM_string = 0x08
+DW_FORM_block = 0x09
+DW_FORM_block1 = 0x0a
+DW_FORM_sdata = 0x0d
+DW_FORM_strp = 0x0e
+DW_FORM_ref_addr = 0x10
+DW_FORM_indirect = 0x16
+DW_FORM_exprloc = 0x18
+DW_FORM_strx = 0x1a
+DW_FORM_line_strp = 0x1f
+DW_FORM_implicit_const = 0x21
+DW_FORM_strx1 = 0x25
+DW_FORM_strx2 = 0x26
+DW_FORM_strx3 = 0x27
+DW_FORM_strx4 = 0x28
+
+# forms with a fixed size of the value
+DW_FORM_FIXED_SIZE = {
+    0x05: 2,    # DW_FORM_data2
+    0x06: 4,    # DW_FORM_data4
+    0x07: 8,    # DW_FORM_data8
+    0x0b: 1,    # DW_FORM_data1
+    0x0c: 1,    # DW_FORM_flag
+    0x11: 1,    # DW_FORM_ref1
+    0x12: 2,    # DW_FORM_ref2
+    0x13: 4,    # DW_FORM_ref4
+    0x14: 8,    # DW_FORM_ref8
+    0x19: 0,    # DW_FORM_flag_present
+    0x1c: 4,    # DW_FORM_ref_sup4
+    0x1e: 16,   # DW_FORM_data16
+    0x20: 8,    # DW_FORM_ref_sig8
+    0x21: 0,    # DW_FORM_implicit_const
+    0x24: 8,    # DW_FORM_ref_sup8
+    0x25: 1,    # DW_FORM_strx1
+    0x26: 2,    # DW_FORM_strx2
+    0x27: 3,    # DW_FORM_strx3
+    0x28: 4,    # DW_FORM_strx4
+    0x29: 1,    # DW_FORM_addrx1
+    0x2a: 2,    # DW_FORM_addrx2
+    0x2b: 3,    # DW_FORM_addrx3
+    0x2c: 4,    # DW_FORM_addrx4
+}
+# forms with an unsigned LEB128 value
+DW_FORM_ULEB = (0x0f, 0x15, 0x1a, 0x1b, 0x22, 0x23, 0x1f01, 0x1f02)
+# forms with a value of the offset size (DW_FORM_sec_offset, DW_FORM_strp_sup
+# and the GNU alternate file references)
+DW_FORM_OFFSET = (0x0e, 0x17, 0x1d, 0x1f, 0x1f20, 0x1f21)
+# forms of the string index values
+DW_FORM_STRX = (DW_FORM_strx, DW_FORM_strx1, DW_FORM_strx2, DW_FORM_strx3, DW_FORM_strx4)
+
+
+class DwarfSection:
+    """
+    Content of a debug section: the buffer with start and end offsets.
+
+    Uncompressed sections are read directly from the mapped file, the
+    compressed ones (SHF_COMPRESSED or .zdebug_*) are decompressed.
+    """
+
+    def __init__(self, elf_object, section):
+        data = elf_object.data
+        start = elf_object.base + section.offset
+        end = start + section.size
+        if section.type == SHT_NOBITS:
+            data, start, end = b'', 0, 0
+        elif end > elf_object.end:
+            raise ElfReaderError(f'section {section.name} is out of the file')
+        if section.flags & SHF_COMPRESSED:
+            chdr = elf_object.layout.chdr
+            if chdr.unpack_from(data, start)[0] != ELFCOMPRESS_ZLIB:
+                raise ElfReaderError(f'unsupported compression of section {section.name}')
+            data = self._decompress(data[start + chdr.size:end])
+            start, end = 0, len(data)
+        elif section.name.startswith('.zdebug') and data[start:start + 4] == b'ZLIB':
+            # 'ZLIB' followed by the uncompressed size as 64-bit big endian
+            data = self._decompress(data[start + 12:end])
+            start, end = 0, len(data)
+        self.data = data
+        self.start = start
+        self.end = end
+
+    @staticmethod
+    def _decompress(content):
+        try:
+            return zlib.decompress(content)
+        except zlib.error as e:
+            raise ElfReaderError(str(e))
+
+    def string(self, offset):
+        """
+        Return NUL terminated string at offset of the section
+        """
+        start = self.start + offset
+        if offset < 0 or start >= self.end:
+            raise ElfReaderError(f'string offset 0x{offset:x} is out of the section')
+        end = self.data.find(b'\0', start, self.end)
+        if end < 0:
+            end = self.end
+        return bytes(self.data[start:end]).decode('utf-8', errors='replace')
+
+
+class DwarfReader:
+    """
+    Minimal reader of the DWARF debug information of one ELF object.
+
+    Only the first DIE of every unit is decoded, so reading the compile
+    units does not depend on the size of the debug information.
+    """
+
+    def __init__(self, elf_object):
+        self.elf_object = elf_object
+        self.endian = '<' if elf_object.data[elf_object.base + 5] == 1 else '>'
+        self.sections = {}
+        for section in elf_object.sections:
+            name = section.name
+            if name.startswith('.zdebug'):
+                name = '.debug' + name[len('.zdebug'):]
+            self.sections[name] = section
+        if '.rela.debug_info' in self.sections or '.rel.debug_info' in self.sections:
+            # the offsets are valid only after the relocations are applied
+            raise ElfReaderError('relocatable debug information is not supported')
+        self.contents = {}
+        # abbreviation offset -> {code: (tag, attribute specifications)}
+        self.abbreviations = {}
+
+    def section(self, name):
+        if name not in self.contents:
+            if name not in self.sections:
+                raise ElfReaderError(f'missing section {name}')
+            self.contents[name] = DwarfSection(self.elf_object, self.sections[name])
+        return self.contents[name]
+
+    def _unpack(self, fmt, section, offset):
+        st = struct.Struct(self.endian + fmt)
+        if offset + st.size > section.end:
+            raise ElfReaderError('truncated debug section')
+        return st.unpack_from(section.data, offset)
+
+    def _uint(self, size, section, offset):
+        if offset + size > section.end:
+            raise ElfReaderError('truncated debug section')
+        return int.from_bytes(section.data[offset:offset + size],
+                              'little' if self.endian == '<' else 'big')
+
+    @staticmethod
+    def _leb128(section, offset, signed=False):
+        """
+        Return (value, offset after the value) of the LEB128 number
+        """
+        result = 0
+        shift = 0
+        while True:
+            if offset >= section.end:
+                raise ElfReaderError('truncated LEB128 number')
+            byte = section.data[offset]
+            offset += 1
+            result |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        if signed and byte & 0x40:
+            result -= 1 << shift
+        return result, offset
+
+    def abbreviation(self, abbrev_offset, code):
+        """
+        Return (tag, [(attribute, form, implicit constant)]) of the
+        abbreviation code from the table at abbrev_offset
+        """
+        table = self.abbreviations.setdefault(abbrev_offset, {})
+        if code in table:
+            return table[code]
+        # the tables are parsed only up to the requested code, the rest
+        # is parsed by the following requests
+        section = self.section('.debug_abbrev')
+        offset = table.get(None, section.start + abbrev_offset)
+        while True:
+            entry_code, offset = self._leb128(section, offset)
+            if not entry_code:
+                raise ElfReaderError(f'abbreviation {code} not found')
+            tag, offset = self._leb128(section, offset)
+            offset += 1     # DW_CHILDREN_yes/no
+            specs = []
+            while True:
+                attribute, offset = self._leb128(section, offset)
+                form, offset = self._leb128(section, offset)
+                if not attribute and not form:
+                    break
+                value = None
+                if form == DW_FORM_implicit_const:
+                    value, offset = self._leb128(section, offset, signed=True)
+                specs.append((attribute, form, value))
+            table[entry_code] = (tag, specs)
+            table[None] = offset
+            if entry_code == code:
+                return table[code]
+
+    def _skip(self, form, section, offset, offset_size, address_size, version):
+        """
+        Return offset after the attribute value of the form
+        """
+        if form in DW_FORM_FIXED_SIZE:
+            return offset + DW_FORM_FIXED_SIZE[form]
+        if form in DW_FORM_OFFSET:
+            return offset + offset_size
+        if form in DW_FORM_ULEB or form == DW_FORM_sdata:
+            return self._leb128(section, offset)[1]
+        if form == DW_FORM_addr:
+            return offset + address_size
+        if form == DW_FORM_ref_addr:
+            return offset + (address_size if version == 2 else offset_size)
+        if form == DW_FORM_string:
+            end = section.data.find(b'\0', offset, section.end)
+            if end < 0:
+                raise ElfReaderError('unterminated string')
+            return end + 1
+        if form in (DW_FORM_block, DW_FORM_exprloc):
+            length, offset = self._leb128(section, offset)
+            return offset + length
+        for block_form, size in ((DW_FORM_block1, 1), (DW_FORM_block2, 2), (DW_FORM_block4, 4)):
+            if form == block_form:
+                return offset + size + self._uint(size, section, offset)
+        raise ElfReaderError(f'unsupported attribute form 0x{form:x}')
+
+    def _string_value(self, form, section, offset, offset_size):
+        """
+        Return the string of the attribute value, for DW_FORM_strx* the
+        index of the string is returned as int
+        """
+        if form == DW_FORM_string:
+            return self.section_string(section, offset)
+        if form == DW_FORM_strp:
+            return self.section('.debug_str').string(self._uint(offset_size, section, offset))
+        if form == DW_FORM_line_strp:
+            return self.section('.debug_line_str').string(self._uint(offset_size, section, offset))
+        if form == DW_FORM_strx:
+            return self._leb128(section, offset)[0]
+        if form in DW_FORM_STRX:
+            return self._uint(DW_FORM_FIXED_SIZE[form], section, offset)
+        raise ElfReaderError(f'unsupported string form 0x{form:x}')
+
+    @staticmethod
+    def section_string(section, offset):
+        end = section.data.find(b'\0', offset, section.end)
+        if end < 0:
+            raise ElfReaderError('unterminated string')
+        return bytes(section.data[offset:end]).decode('utf-8', errors='replace')
+
+    def compile_units(self):
+        """
+        Return list of dictionaries with the producer of every compile unit,
+        the units without producer are represented by an empty dictionary
+        """
+        if '.debug_info' not in self.sections:
+            return []
+        info = self.section('.debug_info')
+        units = []
+        offset = info.start
+        while offset < info.end:
+            unit_length, = self._unpack('I', info, offset)
+            offset += 4
+            offset_size = 4
+            if unit_length == 0xffffffff:
+                unit_length, = self._unpack('Q', info, offset)
+                offset += 8
+                offset_size = 8
+            unit_end = offset + unit_length
+            if unit_end > info.end:
+                raise ElfReaderError('truncated compilation unit')
+            version, = self._unpack('H', info, offset)
+            offset += 2
+            if version < 2 or version > 5:
+                raise ElfReaderError(f'unsupported DWARF version {version}')
+            if version >= 5:
+                unit_type = info.data[offset]
+                address_size = info.data[offset + 1]
+                abbrev_offset = self._uint(offset_size, info, offset + 2)
+                offset += 2 + offset_size
+                if unit_type not in DW_UT_HEADER_EXTRA:
+                    raise ElfReaderError(f'unsupported unit type 0x{unit_type:x}')
+                if unit_type == DW_UT_skeleton:
+                    # objdump follows the skeleton to the split DWARF object
+                    raise ElfReaderError('split DWARF is not supported')
+                for size in DW_UT_HEADER_EXTRA[unit_type]:
+                    offset += size or offset_size
+            else:
+                abbrev_offset = self._uint(offset_size, info, offset)
+                address_size = info.data[offset + offset_size]
+                offset += offset_size + 1
+
+            code, offset = self._leb128(info, offset)
+            if code:
+                tag, specs = self.abbreviation(abbrev_offset, code)
+                if tag == DW_TAG_compile_unit:
+                    units.append(self._unit_producer(specs, info, offset, offset_size,
+                                                     address_size, version))
+            offset = unit_end
+        return units
+
+    def _unit_producer(self, specs, info, offset, offset_size, address_size, version):
+        producer = None
+        str_offsets_base = None
+        for attribute, form, _ in specs:
+            while form == DW_FORM_indirect:
+                form, offset = self._leb128(info, offset)
+            if attribute == DW_AT_producer:
+                producer = self._string_value(form, info, offset, offset_size)
+            elif attribute == DW_AT_str_offsets_base:
+                str_offsets_base = self._uint(offset_size, info, offset)
+            offset = self._skip(form, info, offset, offset_size, address_size, version)
+        if producer is None:
+            return {}
+        if isinstance(producer, int):
+            # the index is resolved with the table of this unit, the default
+            # base skips the header of the only table in the section
+            str_offsets = self.section('.debug_str_offsets')
+            if str_offsets_base is None:
+                str_offsets_base = 2 * offset_size
+            index_offset = str_offsets.start + str_offsets_base + producer * offset_size
+            producer = self.section('.debug_str').string(self._uint(offset_size, str_offsets, index_offset))
+        return {'producer': producer}
+
+
+def read_compile_units(path):
+    """
+    Return list of the compile units (dictionaries with their producer) of
+    all the ELF objects of the file, ElfReaderError is raised for the debug
+    information the reader can't handle.
+    """
+    def extract(data, objects):
+        units = []
+        for elf_object in objects:
+            units.extend(DwarfReader(elf_object).compile_units())
+        return units
+    return map_elf_objects(path, extract, sections_only=True)
@@ -0,0 +1,532 @@
+import mmap
+import re
+import struct
+
+
+class ElfReaderError(Exception):
+    """
+    Raised when the file can't be read by the native ELF reader.
+    """
+
+
+# section types
+SHT_PROGBITS = 1
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+SHT_DYNAMIC = 6
+SHT_NOBITS = 8
+SHT_DYNSYM = 11
+SHT_GNU_VERDEF = 0x6ffffffd
+SHT_GNU_VERNEED = 0x6ffffffe
+SHT_GNU_VERSYM = 0x6fffffff
+
+# section flags
+SHF_WRITE = 0x1
+SHF_ALLOC = 0x2
+SHF_EXECINSTR = 0x4
+SHF_COMPRESSED = 0x800
+
+# minimal length of the strings as used by strings(1)
+STRINGS_MIN_LENGTH = 4
+
+# special section indexes and counts
+SHN_UNDEF = 0
+SHN_XINDEX = 0xffff
+PN_XNUM = 0xffff
+
+# program header types as printed by readelf
+PT_NAMES = {
+    0: 'NULL',
+    1: 'LOAD',
+    2: 'DYNAMIC',
+    3: 'INTERP',
+    4: 'NOTE',
+    5: 'SHLIB',
+    6: 'PHDR',
+    7: 'TLS',
+    0x6474e550: 'GNU_EH_FRAME',
+    0x6474e551: 'GNU_STACK',
+    0x6474e552: 'GNU_RELRO',
+    0x6474e553: 'GNU_PROPERTY',
+}
+
+# dynamic section tags as printed by readelf
+DT_NAMES = {
+    0: 'NULL',
+    1: 'NEEDED',
+    2: 'PLTRELSZ',
+    3: 'PLTGOT',
+    4: 'HASH',
+    5: 'STRTAB',
+    6: 'SYMTAB',
+    7: 'RELA',
+    8: 'RELASZ',
+    9: 'RELAENT',
+    10: 'STRSZ',
+    11: 'SYMENT',
+    12: 'INIT',
+    13: 'FINI',
+    14: 'SONAME',
+    15: 'RPATH',
+    16: 'SYMBOLIC',
+    17: 'REL',
+    18: 'RELSZ',
+    19: 'RELENT',
+    20: 'PLTREL',
+    21: 'DEBUG',
+    22: 'TEXTREL',
+    23: 'JMPREL',
+    24: 'BIND_NOW',
+    25: 'INIT_ARRAY',
+    26: 'FINI_ARRAY',
+    27: 'INIT_ARRAYSZ',
+    28: 'FINI_ARRAYSZ',
+    29: 'RUNPATH',
+    30: 'FLAGS',
+    32: 'PREINIT_ARRAY',
+    33: 'PREINIT_ARRAYSZ',
+    34: 'SYMTAB_SHNDX',
+    35: 'RELRSZ',
+    36: 'RELR',
+    37: 'RELRENT',
+    0x6ffffdf5: 'GNU_PRELINKED',
+    0x6ffffdf8: 'CHECKSUM',
+    0x6ffffef5: 'GNU_HASH',
+    0x6ffffef6: 'TLSDESC_PLT',
+    0x6ffffef7: 'TLSDESC_GOT',
+    0x6ffffff0: 'VERSYM',
+    0x6ffffff9: 'RELACOUNT',
+    0x6ffffffa: 'RELCOUNT',
+    0x6ffffffb: 'FLAGS_1',
+    0x6ffffffc: 'VERDEF',
+    0x6ffffffd: 'VERDEFNUM',
+    0x6ffffffe: 'VERNEED',
+    0x6fffffff: 'VERNEEDNUM',
+    0x7ffffffd: 'AUXILIARY',
+    0x7fffffff: 'FILTER',
+}
+
+# dynamic tags whose value is a string, with the readelf description
+DT_STRINGS = {
+    'NEEDED': 'Shared library',
+    'SONAME': 'Library soname',
+    'RPATH': 'Library rpath',
+    'RUNPATH': 'Library runpath',
+}
+DT_SIZES = ('PLTRELSZ', 'RELASZ', 'RELAENT', 'STRSZ', 'SYMENT', 'RELSZ', 'RELENT',
+            'INIT_ARRAYSZ', 'FINI_ARRAYSZ', 'PREINIT_ARRAYSZ', 'RELRSZ', 'RELRENT')
+DT_COUNTS = ('VERDEFNUM', 'VERNEEDNUM', 'RELACOUNT', 'RELCOUNT')
+DF_NAMES = ((0x1, 'ORIGIN'), (0x2, 'SYMBOLIC'), (0x4, 'TEXTREL'), (0x8, 'BIND_NOW'),
+            (0x10, 'STATIC_TLS'))
+DF_1_NAMES = ((0x1, 'NOW'), (0x2, 'GLOBAL'), (0x4, 'GROUP'), (0x8, 'NODELETE'),
+              (0x10, 'LOADFLTR'), (0x20, 'INITFIRST'), (0x40, 'NOOPEN'), (0x80, 'ORIGIN'),
+              (0x100, 'DIRECT'), (0x400, 'INTERPOSE'), (0x800, 'NODEFLIB'),
+              (0x1000, 'NODUMP'), (0x2000, 'CONFALT'), (0x4000, 'ENDFILTEE'),
+              (0x8000000, 'PIE'))
+
+STB_LOCAL = 0
+STB_WEAK = 2
+
+# symbol types, bindings and visibilities as printed by readelf
+STT_NAMES = {0: 'NOTYPE', 1: 'OBJECT', 2: 'FUNC', 3: 'SECTION', 4: 'FILE',
+             5: 'COMMON', 6: 'TLS', 10: 'IFUNC'}
+STB_NAMES = {0: 'LOCAL', 1: 'GLOBAL', 2: 'WEAK', 10: 'UNIQUE'}
+STV_NAMES = {0: 'DEFAULT', 1: 'INTERNAL', 2: 'HIDDEN', 3: 'PROTECTED'}
+
+# struct layouts of the ELF structures for (class, endianness)
+ELF_CLASS32 = 1
+ELF_CLASS64 = 2
+ELF_DATA_LSB = 1
+ELF_DATA_MSB = 2
+
+
+class ElfLayout:
+    """
+    Compiled struct formats of the ELF structures for one ELF class and
+    endianness.
+    """
+    def __init__(self, elf_class, elf_data):
+        prefix = '<' if elf_data == ELF_DATA_LSB else '>'
+        self.is_64 = elf_class == ELF_CLASS64
+        if self.is_64:
+            self.header = struct.Struct(prefix + 'HHIQQQIHHHHHH')
+            self.section = struct.Struct(prefix + 'IIQQQQIIQQ')
+            self.program_header = struct.Struct(prefix + 'IIQQQQQQ')
+            self.dynamic = struct.Struct(prefix + 'qQ')
+            self.symbol = struct.Struct(prefix + 'IBBHQQ')
+            self.chdr = struct.Struct(prefix + 'IIQQ')
+        else:
+            self.header = struct.Struct(prefix + 'HHIIIIIHHHHHH')
+            self.section = struct.Struct(prefix + 'IIIIIIIIII')
+            self.program_header = struct.Struct(prefix + 'IIIIIIII')
+            self.dynamic = struct.Struct(prefix + 'iI')
+            self.symbol = struct.Struct(prefix + 'IIIBBH')
+            self.chdr = struct.Struct(prefix + 'III')
+        self.half = struct.Struct(prefix + 'H')
+        self.verneed = struct.Struct(prefix + 'HHIII')
+        self.vernaux = struct.Struct(prefix + 'IHHII')
+        self.verdef = struct.Struct(prefix + 'HHHHIII')
+        self.verdaux = struct.Struct(prefix + 'II')
+
+
+LAYOUTS = {(c, d): ElfLayout(c, d)
+           for c in (ELF_CLASS32, ELF_CLASS64)
+           for d in (ELF_DATA_LSB, ELF_DATA_MSB)}
+
+
+class ElfRawSection:
+    """
+    One section header of an ELF object.
+    """
+    __slots__ = ['name', 'type', 'flags', 'offset', 'size', 'link', 'info', 'entsize']
+
+    def __init__(self, name, sh_type, flags, offset, size, link, info, entsize):
+        self.name = name
+        self.type = sh_type
+        self.flags = flags
+        self.offset = offset
+        self.size = size
+        self.link = link
+        self.info = info
+        self.entsize = entsize
+
+
+class ElfObject:
+    """
+    Everything ReadelfParser needs to know about one ELF object: either
+    a standalone file or a member of an ar archive.
+
+    The data are read in a single pass over the mapped file and stored in
+    the same form readelf prints them.
+    """
+
+    def __init__(self, data, base, size, sections_only=False):
+        self.data = data
+        self.base = base
+        self.end = base + size
+        self.sections_only = sections_only
+        self.all_sections = []
+        self.sections = []
+        # (type name, flags) tuples, e.g. ('GNU_STACK', 'RW')
+        self.program_headers = []
+        # (tag name, value) tuples, e.g. ('NEEDED', 'Shared library: [libc.so.6]')
+        self.dynamic = []
+        # (type, bind, visibility, name) tuples
+        self.symbols = []
+        self.comments = []
+        # raw dynamic information used for the dependency resolution
+        self.needed = []
+        self.soname = None
+        self.rpath = []
+        self.runpath = []
+        # (name, version, defined, weak, hidden) tuples of the dynamic symbols
+        self.dynamic_symbols = []
+        # EI_CLASS and e_machine, objects differing in them can't be linked
+        self.elf_class = data[base + 4]
+        self.machine = None
+
+        if data[base + 4] not in (ELF_CLASS32, ELF_CLASS64) or \
+                data[base + 5] not in (ELF_DATA_LSB, ELF_DATA_MSB):
+            raise ElfReaderError('unsupported ELF class or data encoding')
+        self.layout = LAYOUTS[(data[base + 4], data[base + 5])]
+        self.parse()
+
+    def _unpack(self, st, offset):
+        if offset < 0 or offset + st.size > self.end - self.base:
+            raise ElfReaderError('truncated ELF file')
+        return st.unpack_from(self.data, self.base + offset)
+
+    def _string(self, section, offset):
+        """
+        Return NUL terminated string at offset in the string table section
+        """
+        start = self.base + section.offset + offset
+        end = self.data.find(b'\0', start, self.base + section.offset + section.size)
+        if end < 0:
+            end = self.base + section.offset + section.size
+        return self.data[start:end].decode('utf-8', errors='replace')
+
+    def _content(self, section):
+        if section.type == SHT_NOBITS:
+            return b''
+        if section.offset + section.size > self.end - self.base:
+            raise ElfReaderError(f'section {section.name} is out of the file')
+        start = self.base + section.offset
+        return self.data[start:start + section.size]
+
+    def parse(self):
+        layout = self.layout
+        (e_type, e_machine, e_version, e_entry, e_phoff, e_shoff, e_flags, e_ehsize,
+         e_phentsize, e_phnum, e_shentsize, e_shnum, e_shstrndx) = self._unpack(layout.header, 16)
+        self.machine = e_machine
+
+        # extended numbering is stored in the initial section header
+        if e_shoff and (e_shnum == 0 or e_shstrndx == SHN_XINDEX or e_phnum == PN_XNUM):
+            sh = self._unpack(layout.section, e_shoff)
+            if e_shnum == 0:
+                e_shnum = sh[5]
+            if e_shstrndx == SHN_XINDEX:
+                e_shstrndx = sh[6]
+            if e_phnum == PN_XNUM:
+                e_phnum = sh[7]
+
+        self.parse_sections(e_shoff, e_shentsize, e_shnum, e_shstrndx)
+        if self.sections_only:
+            return
+        self.parse_program_headers(e_phoff, e_phentsize, e_phnum)
+        for section in self.sections:
+            if section.type == SHT_DYNAMIC:
+                self.parse_dynamic(section)
+            elif section.name == '.comment' and not section.flags & SHF_COMPRESSED:
+                self.parse_comment(section)
+        versions = self.parse_versions()
+        for section in self.sections:
+            if section.type in (SHT_SYMTAB, SHT_DYNSYM):
+                self.parse_symbols(section, versions if section.type == SHT_DYNSYM else None)
+
+    def parse_sections(self, shoff, shentsize, shnum, shstrndx):
+        if not shoff or not shnum:
+            return
+        layout = self.layout
+        raw = []
+        for i in range(shnum):
+            (sh_name, sh_type, sh_flags, sh_addr, sh_offset, sh_size, sh_link, sh_info,
+             sh_addralign, sh_entsize) = self._unpack(layout.section, shoff + i * shentsize)
+            raw.append((sh_name, ElfRawSection('', sh_type, sh_flags, sh_offset, sh_size,
+                                               sh_link, sh_info, sh_entsize)))
+        strtab = raw[shstrndx][1] if shstrndx < len(raw) else None
+        for sh_name, section in raw:
+            if strtab is not None:
+                section.name = self._string(strtab, sh_name)
+        self.all_sections = [section for _, section in raw]
+        # the initial NULL section is not listed by readelf
+        self.sections = self.all_sections[1:]
+
+    def parse_program_headers(self, phoff, phentsize, phnum):
+        if not phoff:
+            return
+        layout = self.layout
+        for i in range(phnum):
+            ph = self._unpack(layout.program_header, phoff + i * phentsize)
+            if layout.is_64:
+                p_type, p_flags = ph[0], ph[1]
+            else:
+                p_type, p_flags = ph[0], ph[6]
+            name = PT_NAMES.get(p_type, f'0x{p_type:x}')
+            flags = ('R' if p_flags & 4 else '') + ('W' if p_flags & 2 else '') + \
+                ('E' if p_flags & 1 else '')
+            self.program_headers.append((name, flags))
+
+    def _linked(self, section):
+        if section.link < len(self.all_sections):
+            return self.all_sections[section.link]
+        raise ElfReaderError(f'invalid link of section {section.name}')
+
+    def parse_dynamic(self, section):
+        layout = self.layout
+        strtab = self._linked(section)
+        count = section.size // layout.dynamic.size
+        for i in range(count):
+            tag, value = self._unpack(layout.dynamic, section.offset + i * layout.dynamic.size)
+            key = DT_NAMES.get(tag, f'0x{tag:x}')
+            if key in DT_STRINGS:
+                string = self._string(strtab, value)
+                if key == 'NEEDED':
+                    self.needed.append(string)
+                elif key == 'SONAME':
+                    self.soname = string
+                elif key == 'RPATH':
+                    self.rpath.extend(string.split(':'))
+                else:
+                    self.runpath.extend(string.split(':'))
+                value = f'{DT_STRINGS[key]}: [{string}]'
+            elif key in DT_SIZES:
+                value = f'{value} (bytes)'
+            elif key in DT_COUNTS:
+                value = str(value)
+            elif key == 'PLTREL':
+                value = {7: 'RELA', 17: 'REL'}.get(value, str(value))
+            elif key == 'FLAGS':
+                value = ' '.join(name for bit, name in DF_NAMES if value & bit)
+            elif key == 'FLAGS_1':
+                value = 'Flags: ' + ' '.join(name for bit, name in DF_1_NAMES if value & bit)
+            else:
+                value = f'0x{value:x}'
+            self.dynamic.append((key, value))
+            # readelf stops at the terminating entry
+            if tag == 0:
+                break
+
+    def parse_comment(self, section):
+        for comment in self._content(section).split(b'\0'):
+            if comment:
+                self.comments.append(comment.decode('utf-8', errors='replace'))
+
+    def parse_versions(self):
+        """
+        Return list of version names (or None) for every dynamic symbol
+        """
+        layout = self.layout
+        names = {}
+        versym = None
+        for section in self.sections:
+            if section.type == SHT_GNU_VERSYM:
+                versym = section
+            elif section.type == SHT_GNU_VERNEED:
+                strtab = self._linked(section)
+                offset = section.offset
+                for _ in range(section.info):
+                    vn_version, vn_cnt, vn_file, vn_aux, vn_next = self._unpack(layout.verneed, offset)
+                    aux = offset + vn_aux
+                    for _ in range(vn_cnt):
+                        vna_hash, vna_flags, vna_other, vna_name, vna_next = self._unpack(layout.vernaux, aux)
+                        names[vna_other] = (self._string(strtab, vna_name), False)
+                        aux += vna_next
+                    if not vn_next:
+                        break
+                    offset += vn_next
+            elif section.type == SHT_GNU_VERDEF:
+                strtab = self._linked(section)
+                offset = section.offset
+                for _ in range(section.info):
+                    vd_version, vd_flags, vd_ndx, vd_cnt, vd_hash, vd_aux, vd_next = \
+                        self._unpack(layout.verdef, offset)
+                    # the base version is the name of the file itself
+                    if vd_cnt and not vd_flags & 1:
+                        vda_name, vda_next = self._unpack(layout.verdaux, offset + vd_aux)
+                        names[vd_ndx] = (self._string(strtab, vda_name), True)
+                    if not vd_next:
+                        break
+                    offset += vd_next
+        if versym is None or not names:
+            return None
+        versions = []
+        for i in range(versym.size // 2):
+            versions.append(self._unpack(layout.half, versym.offset + i * 2)[0])
+        return (versions, names)
+
+    def parse_symbols(self, section, versions):
+        layout = self.layout
+        strtab = self._linked(section)
+        st = layout.symbol
+        entsize = section.entsize or st.size
+        data = self._content(section)
+        for i in range(len(data) // entsize):
+            if layout.is_64:
+                st_name, st_info, st_other, st_shndx, st_value, st_size = \
+                    st.unpack_from(data, i * entsize)
+            else:
+                st_name, st_value, st_size, st_info, st_other, st_shndx = \
+                    st.unpack_from(data, i * entsize)
+            name = self._string(strtab, st_name)
+            # symbols without name (e.g. of sections) are skipped like
+            # when the readelf output is parsed
+            if not name:
+                continue
+            version = None
+            index = 0
+            if versions and i < len(versions[0]):
+                index = versions[0][i]
+                version = versions[1].get(index & 0x7fff)
+            if section.type == SHT_DYNSYM and st_info >> 4 != STB_LOCAL:
+                self.dynamic_symbols.append((name, version[0] if version else None,
+                                             st_shndx != SHN_UNDEF, st_info >> 4 == STB_WEAK,
+                                             bool(index & 0x8000)))
+            if version:
+                # symbols of the version definitions are printed without the suffix
+                if version[0] != name:
+                    version_name, defined = version
+                    if defined and st_shndx != SHN_UNDEF and not index & 0x8000:
+                        name = f'{name}@@{version_name}'
+                    else:
+                        name = f'{name}@{version_name}'
+            self.symbols.append((STT_NAMES.get(st_info & 0xf, str(st_info & 0xf)),
+                                 STB_NAMES.get(st_info >> 4, str(st_info >> 4)),
+                                 STV_NAMES[st_other & 0x3],
+                                 name))
+
+
+def _archive_members(data):
+    """
+    Yield (offset, size) of all members of an ar archive that are ELF files
+    """
+    offset = 8
+    while offset + 60 <= len(data):
+        header = data[offset:offset + 60]
+        if header[58:60] != b'`\n':
+            raise ElfReaderError('malformed archive member header')
+        name = header[:16].rstrip()
+        try:
+            size = int(header[48:58])
+        except ValueError:
+            raise ElfReaderError('malformed archive member size')
+        start = offset + 60
+        # BSD style long names are stored at the beginning of the data
+        if name.startswith(b'#1/'):
+            name_len = int(name[3:])
+            start += name_len
+            size -= name_len
+        # symbol table and long names table are not interesting
+        if name not in (b'/', b'//', b'/SYM64/') and data[start:start + 4] == b'\x7fELF':
+            yield start, size
+        offset = offset + 60 + int(header[48:58])
+        offset += offset % 2
+
+
+def map_elf_objects(path, callback, sections_only=False):
+    """
+    Map the file on path and return callback(data, objects) where objects
+    is list of ElfObject instances of the file or of the archive members.
+
+    ElfReaderError is raised for anything else than ELF file or archive.
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ElfReaderError('empty file')
+    try:
+        if data[:4] == b'\x7fELF':
+            objects = [ElfObject(data, 0, len(data), sections_only)]
+        elif data[:8] == b'!<arch>\n':
+            objects = [ElfObject(data, start, size, sections_only)
+                       for start, size in _archive_members(data)]
+        else:
+            raise ElfReaderError('not an ELF file or archive')
+        return callback(data, objects)
+    except (struct.error, IndexError, ValueError) as e:
+        raise ElfReaderError(str(e))
+    finally:
+        data.close()
+
+
+def read_elf(path):
+    """
+    Read an ELF file or an ar archive with ELF members and return list of
+    ElfObject instances, one for every ELF object found.
+
+    ElfReaderError is raised for anything else.
+    """
+    # all the strings are copied out of the map before it's closed
+    return map_elf_objects(path, lambda data, objects: objects)
+
+
+printable_regex = re.compile(rb'[\t\x20-\x7e]{%d,}' % STRINGS_MIN_LENGTH)
+
+
+def read_strings(path):
+    """
+    Return list of the printable character runs (like strings(1) does)
+    found in the read-only data sections of an ELF file or archive.
+    """
+    def extract(data, objects):
+        strings = []
+        for elf_object in objects:
+            for section in elf_object.sections:
+                if section.type == SHT_PROGBITS and section.flags & SHF_ALLOC and \
+                        not section.flags & (SHF_WRITE | SHF_EXECINSTR | SHF_COMPRESSED):
+                    start = elf_object.base + section.offset
+                    end = min(start + section.size, elf_object.end)
+                    strings.extend(m.decode('ascii') for m in printable_regex.findall(data, start, end))
+        return strings
+    return map_elf_objects(path, extract, sections_only=True)
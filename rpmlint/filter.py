@@ -1,11 +1,19 @@
+from collections import namedtuple
+import json
 from pathlib import Path
 import re
+import sys
 import textwrap
 
 from rpmlint.color import Color
 from rpmlint.helpers import print_warning
 import toml
 
+# A reported issue, package is the file name of the checked package and
+# details are the non-empty details as strings
+Diagnostic = namedtuple('Diagnostic', ('package', 'arch', 'line', 'level', 'reason',
+                                       'details', 'badness'))
+
 
 class Filter(object):
     """
@@ -24,8 +32,12 @@ class Filter(object):
         self.non_named_group_re = re.compile(r'[^\\](\()[^:]')
         # compile filters regexp
         self._populate_filter_regexp(config.configuration['Filters'])
+        # reason -> whether it passes the filters, see is_reported
+        self._reported = {}
         # informative or quiet
         self.info = config.info
+        # output format, 'text' or 'jsonl'
+        self.format = 'text'
         # How many bad hits we already collected while collecting issues
         self.score = 0
         # Dictionary containing mapped values of descriptions for the errors.
@@ -36,6 +48,9 @@ class Filter(object):
         self.printed_messages = {'I': 0, 'W': 0, 'E': 0}
         # Messages
         self.results = []
+        # When a list, the raw diagnostics passed to add_info are appended
+        # to it so they can be replayed later (e.g. from the result cache)
+        self.recorded = None
 
     @staticmethod
     def _load_descriptions():
@@ -48,12 +63,28 @@ class Filter(object):
             print_warning(f'(none): W: unable to parse description files: {terr}')
         return descriptions
 
+    @staticmethod
+    def described_reasons(name):
+        """
+        Return list of the issues described in the description file of
+        the check name, it's empty when there is no such file
+        """
+        path = Path(__file__).parent / 'descriptions' / f'{name}.toml'
+        try:
+            return list(toml.load(path))
+        except (OSError, toml.decoder.TomlDecodeError):
+            return []
+
     def add_info(self, level, package, reason, *details):
         """
         Add the issue to the store for later usage
         """
+        if self.recorded is not None:
+            self.recorded.append((level, package.name, package.arch, package.current_linenum,
+                                  reason, [str(detail) for detail in details if detail]))
+
         # we can be completely filtered for the reason
-        if self.filters_re and self.filters_re.search(reason):
+        if not self.is_reported(reason):
             return
 
         # filename in some cases can contain tmp paths and we don't need it
@@ -73,28 +104,70 @@ class Filter(object):
         # as an error
         if self.strict:
             level = 'E'
-        # set coloring
-        if level == 'E':
+        # raise the counters
+        self.score += badness
+        self.printed_messages[level] += 1
+        self.results.append(Diagnostic(filename, package.arch, package.current_linenum,
+                                       level, reason,
+                                       tuple(str(detail) for detail in details if detail),
+                                       badness))
+
+    @staticmethod
+    def format_diagnostic(diag):
+        """
+        Return the diagnostic as (colored) line of the text output
+        """
+        if diag.level == 'E':
             lvl_color = Color.Red
-        elif level == 'W':
+        elif diag.level == 'W':
             lvl_color = Color.Yellow
         else:
             lvl_color = Color.Bold
-        # raise the counters
-        self.score += badness
-        self.printed_messages[level] += 1
-        # compile the message
-        line = f'{package.current_linenum}:' if package.current_linenum else ''
-        arch = f'.{package.arch}' if package.arch else ''
-        bad_output = f' (Badness: {badness})' if badness else ''
-        detail_output = ''
-        for detail in details:
-            if detail:
-                detail_output += f' {detail}'
-        result = f'{Color.Bold}{filename}{arch}:{line}{Color.Reset} {lvl_color}{level}: {reason}{Color.Reset}'
-        result += bad_output
-        result += detail_output
-        self.results.append(result)
+        line = f'{diag.line}:' if diag.line else ''
+        arch = f'.{diag.arch}' if diag.arch else ''
+        result = f'{Color.Bold}{diag.package}{arch}:{line}{Color.Reset} {lvl_color}{diag.level}: {diag.reason}{Color.Reset}'
+        if diag.badness:
+            result += f' (Badness: {diag.badness})'
+        for detail in diag.details:
+            result += f' {detail}'
+        return result
+
+    @staticmethod
+    def format_json(diag):
+        """
+        Return the diagnostic as JSON object on one line
+        """
+        return json.dumps(diag._asdict(), ensure_ascii=False)
+
+    def is_reported(self, reason):
+        """
+        Tell whether the issues with the reason get reported, i.e. they are
+        not dropped by the filters. Checks use it to skip the work needed
+        only for the filtered issues.
+        """
+        reported = self._reported.get(reason)
+        if reported is None:
+            reported = not (self.filters_re and self.filters_re.search(reason))
+            self._reported[reason] = reported
+        return reported
+
+    def reset(self):
+        """
+        Drop all the collected results together with the counters
+        """
+        self.score = 0
+        self.printed_messages = {'I': 0, 'W': 0, 'E': 0}
+        self.results = []
+
+    def merge(self, results, score, printed_messages):
+        """
+        Merge the results and counters collected by another Filter
+        instance (e.g. in a worker process) into this one
+        """
+        self.results.extend(results)
+        self.score += score
+        for level, count in printed_messages.items():
+            self.printed_messages[level] += count
 
     def print_results(self, results):
         """
@@ -103,23 +176,50 @@ class Filter(object):
         If there is description to be provided it needs to be provided only
         once per reason.
         """
-        output = ''
+        return ''.join(self._render(results))
+
+    def write_results(self, results, stream=None):
+        """
+        Write the results to the stream (stdout by default) in the selected
+        format as they get rendered
+        """
+        stream = stream or sys.stdout
+        for chunk in self._render(results):
+            stream.write(chunk)
+        stream.flush()
+
+    def flush_results(self, stream=None):
+        """
+        Write the collected results out and drop them, the counters and the
+        score are kept
+        """
+        self.write_results(self.results, stream)
+        self.results = []
+
+    def _render(self, results):
         results.sort(key=self.__diag_sortkey, reverse=True)
+        if self.format == 'jsonl':
+            for diag in results:
+                yield self._normalize(self.format_json(diag) + '\n')
+            return
         last_reason = ''
         for diag in results:
+            output = ''
             if self.info:
-                reason = diag.split()[2]
                 # print out details for each reason we had
-                if reason != last_reason:
+                if diag.reason != last_reason:
                     if last_reason:
                         output += self.get_description(last_reason)
-                    last_reason = reason
-            output += diag + '\n'
+                    last_reason = diag.reason
+            output += self.format_diagnostic(diag) + '\n'
+            yield self._normalize(output)
         if self.info and last_reason:
-            output += self.get_description(last_reason)
+            yield self.get_description(last_reason)
+
+    @staticmethod
+    def _normalize(output):
         # normalize the output as rpm 4.15 uses surrogates
-        output = output.encode('utf-8', errors='surrogateescape').decode('utf-8', errors='replace')
-        return output
+        return output.encode('utf-8', errors='surrogateescape').decode('utf-8', errors='replace')
 
     def get_description(self, reason):
         """
@@ -151,8 +251,6 @@ class Filter(object):
 
     def __diag_sortkey(self, x):
         """
-        Sorting helper, xs[1] is packagename line architecture
-                        xs[2] is the reason of the error
+        Sorting helper, the diagnostics are grouped by the reason
         """
-        xs = x.split()
-        return (xs[2], xs[1])
+        return (x.reason, x.level)
@@ -1,6 +1,7 @@
 # File containing various helper functions used across rpmlint
 
-from shutil import get_terminal_size
+import os
+from shutil import get_terminal_size, which
 import sys
 
 from rpmlint.color import Color
@@ -44,6 +45,22 @@ def byte_to_string(item):
     return item.decode(encoding='UTF-8', errors='replace')
 
 
+def installed_state(paths):
+    """
+    Return string identifying the installed files on paths by their size
+    and modification time, the names without a slash are looked up in PATH
+    """
+    state = []
+    for path in paths:
+        found = path if '/' in path else which(path)
+        try:
+            st = os.stat(found)
+            state.append(f'{path}={found}:{st.st_size}:{st.st_mtime_ns}')
+        except (OSError, TypeError):
+            state.append(f'{path}=')
+    return ' '.join(state)
+
+
 def readlines(path):
     with open(path, 'rb') as fobj:
         for line in fobj:
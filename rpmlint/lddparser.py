@@ -1,12 +1,18 @@
 import re
 import subprocess
 
+from rpmlint.demangler import demangle
+from rpmlint.elfreader import ElfReaderError
+
 
 class LddParser:
     """
     Class contains all information obtained by ldd command
     about undefined symbols and unused direct dependencies.
 
+    When a LibraryResolver is given the same information is computed
+    in-process and ldd is not run at all.
+
     Parse these 2 outputs:
 
     $ ldd -u libnss-unused-dependency.so
@@ -36,14 +42,29 @@ class LddParser:
     unused_regex = re.compile(r'^\s+(?P<lib>\S+)')
     undef_regex = re.compile(r'^undefined symbol:\s+(?P<symbol>[^, ]+)')
 
-    def __init__(self, pkgfile_path, path):
+    def __init__(self, pkgfile_path, path, resolver=None):
         self.pkgfile_path = pkgfile_path
+        self.path = path
         self.dependencies = []
         self.unused_dependencies = []
         self.undefined_symbols = []
         self.parsing_failed_reason = None
-        self.parse_dependencies()
-        self.parse_undefined_symbols()
+        if resolver is not None:
+            self.resolve(resolver)
+        else:
+            self.parse_dependencies()
+            self.parse_undefined_symbols()
+        self.demangle_undefined_symbols()
+
+    def resolve(self, resolver):
+        """
+        Get the same information from LibraryResolver without running ldd
+        """
+        try:
+            self.dependencies, self.unused_dependencies, self.undefined_symbols = \
+                resolver.resolve(self.pkgfile_path, self.path)
+        except (ElfReaderError, OSError) as e:
+            self.parsing_failed_reason = str(e)
 
     def parse_dependencies(self):
         r = subprocess.run(['ldd', '-u', self.pkgfile_path], encoding='utf8',
@@ -79,11 +100,9 @@ class LddParser:
             else:
                 self.dependencies.append(line.strip())
 
-        # run c++filt demangler for all collected symbols
-        if self.undefined_symbols:
-            r = subprocess.run(['c++filt'] + self.undefined_symbols, encoding='utf8',
-                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if r.returncode != 0:
-                self.parsing_failed_reason = r.stderr
-            else:
-                self.undefined_symbols = r.stdout.splitlines()
+    def demangle_undefined_symbols(self):
+        if self.undefined_symbols and not self.parsing_failed_reason:
+            try:
+                self.undefined_symbols = [demangle(symbol) for symbol in self.undefined_symbols]
+            except OSError as e:
+                self.parsing_failed_reason = str(e)
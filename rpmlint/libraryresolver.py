@@ -0,0 +1,197 @@
+from collections import deque
+from functools import lru_cache
+import glob
+import os
+from pathlib import PurePosixPath
+
+from rpmlint.elfreader import ElfReaderError, read_elf
+
+
+class SharedObject:
+    """
+    Dynamic linking information of one ELF file: its dependencies, search
+    paths and the dynamic symbols it defines and references.
+    """
+
+    def __init__(self, elf_object):
+        self.needed = elf_object.needed
+        self.soname = elf_object.soname
+        self.rpath = elf_object.rpath
+        self.runpath = elf_object.runpath
+        self.elf_class = elf_object.elf_class
+        self.machine = elf_object.machine
+        # (name, version) of all the defined symbols and names of those
+        # that satisfy an unversioned reference
+        self.defined = set()
+        self.default_names = set()
+        # (name, version, weak) of the undefined symbols
+        self.references = []
+        for name, version, defined, weak, hidden in elf_object.dynamic_symbols:
+            if defined:
+                self.defined.add((name, version))
+                if not hidden:
+                    self.default_names.add(name)
+            else:
+                self.references.append((name, version, weak))
+
+    def defines(self, name, version):
+        if version:
+            return (name, version) in self.defined
+        return name in self.default_names
+
+    def compatible(self, other):
+        """
+        Return True if other can be loaded together with this object
+        """
+        return self.elf_class == other.elf_class and self.machine == other.machine
+
+
+@lru_cache(maxsize=256)
+def load_shared_object(path):
+    """
+    Return SharedObject for the ELF file on path, the host libraries are
+    shared by all the checked files so they are read only once
+    """
+    elf_objects = read_elf(path)
+    if len(elf_objects) != 1:
+        raise ElfReaderError(f'{path} is not an ELF object')
+    return SharedObject(elf_objects[0])
+
+
+@lru_cache(maxsize=16)
+def read_ld_so_conf(path='/etc/ld.so.conf'):
+    """
+    Return the library directories configured for the dynamic loader in
+    path (the ones ldconfig puts to the ld.so cache), the include
+    directives are followed
+    """
+    directories = []
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return directories
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line or line.startswith('hwcap '):
+            continue
+        if line.startswith('include '):
+            for pattern in line.split()[1:]:
+                pattern = os.path.join(os.path.dirname(path), pattern)
+                for included in sorted(glob.glob(pattern)):
+                    directories.extend(read_ld_so_conf(included))
+        else:
+            # the old syntax allows 'dir=type' entries
+            directories.append(line.split('=', 1)[0].rstrip())
+    return directories
+
+
+class LibraryResolver(object):
+    """
+    In-process replacement of 'ldd -u' and 'ldd -r'.
+
+    The libraries are looked up the way the dynamic loader does it:
+    in the RPATH/RUNPATH directories, the directories configured in
+    ld.so.conf and the SystemLibPaths directories, skipping the libraries
+    of a different ELF class or machine. The dynamic loader never runs on
+    the untrusted package content. For every directory the package is
+    searched first, then the host.
+    """
+
+    def __init__(self, pkg, system_lib_paths, ld_so_conf='/etc/ld.so.conf'):
+        self.pkg = pkg
+        self.system_lib_paths = system_lib_paths
+        self.loader_paths = list(dict.fromkeys(read_ld_so_conf(ld_so_conf) + system_lib_paths))
+
+    def _package_file(self, path):
+        """
+        Return the extracted path of the file installed as path in the
+        package, symlinks are followed inside the package
+        """
+        for _ in range(16):
+            pkgfile = self.pkg.files.get(path)
+            if pkgfile is None:
+                return None
+            if not pkgfile.linkto:
+                return pkgfile.path
+            path = os.path.normpath(os.path.join(os.path.dirname(path), pkgfile.linkto))
+        return None
+
+    def find(self, name, search_paths, main):
+        """
+        Return (installed path, SharedObject) of the library name loadable
+        by main or None if it can't be found
+        """
+        if '/' in name:
+            candidates = [name]
+        else:
+            candidates = [str(PurePosixPath(directory, name)) for directory in search_paths]
+        for candidate in candidates:
+            filename = self._package_file(candidate)
+            if filename is None:
+                if not os.path.isfile(candidate):
+                    continue
+                filename = candidate
+            try:
+                obj = load_shared_object(filename)
+            except (ElfReaderError, OSError):
+                continue
+            if main.compatible(obj):
+                return candidate, obj
+        return None
+
+    def _search_paths(self, obj, path, rpath):
+        """
+        Return the directories searched for the dependencies of obj
+        installed as path, rpath is inherited from the loading objects
+        """
+        origin = os.path.dirname(path)
+        dirs = obj.runpath if obj.runpath else rpath + obj.rpath
+        dirs = [d.replace('$ORIGIN', origin).replace('${ORIGIN}', origin) for d in dirs if d]
+        return dirs + self.loader_paths
+
+    def resolve(self, pkgfile_path, path):
+        """
+        Return (dependencies, unused dependencies, undefined symbols) of
+        the ELF file pkgfile_path installed as path. The dependencies are
+        formatted like the ldd output.
+        """
+        main = load_shared_object(pkgfile_path)
+        dependencies = []
+        # library name -> (SharedObject or None, path shown by ldd -u)
+        loaded = {}
+        scope = []
+        direct = {}
+        queue = deque([(main, path, [], True)])
+        while queue:
+            obj, obj_path, rpath, is_main = queue.popleft()
+            search_paths = self._search_paths(obj, obj_path, rpath)
+            inherited = rpath + obj.rpath if not obj.runpath else rpath
+            for name in obj.needed:
+                if name not in loaded:
+                    found = self.find(name, search_paths, main)
+                    if found is None:
+                        dependencies.append(f'{name} => not found')
+                        loaded[name] = (None, name)
+                    else:
+                        installed, dependency = found
+                        dependencies.append(installed if installed == name else f'{name} => {installed}')
+                        loaded[name] = (dependency, installed)
+                        scope.append(dependency)
+                        queue.append((dependency, installed, inherited, False))
+                if is_main:
+                    direct[name] = loaded[name]
+
+        # bind the references of the file to the first object defining them
+        used = set()
+        undefined = []
+        for name, version, weak in main.references:
+            provider = next((obj for obj in scope if obj.defines(name, version)), None)
+            if provider is not None:
+                used.add(id(provider))
+            elif not weak:
+                undefined.append(name)
+
+        unused = [shown for dependency, shown in direct.values()
+                  if dependency is None or id(dependency) not in used]
+        return dependencies, unused, undefined
@@ -1,8 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
 import importlib
+from multiprocessing.util import Finalize
+import os
+import sqlite3
+import sys
 from tempfile import gettempdir
 
+from rpmlint.cache import cache_dir, CachedPkg, ResultCache
+from rpmlint.checks.AbstractCheck import COST_TIERS
 from rpmlint.color import Color
 from rpmlint.config import Config
+from rpmlint.contentcache import ContentCache
+from rpmlint.contentscanner import ContentScanner
 from rpmlint.filter import Filter
 from rpmlint.helpers import print_warning, string_center
 from rpmlint.pkg import FakePkg, getInstalledPkgs, Pkg
@@ -17,6 +26,8 @@ class Lint(object):
     def __init__(self, options):
         # initialize configuration
         self.checks = {}
+        self.content_scanner = None
+        self.host_state = None
         self.options = options
         self.packages_checked = 0
         self.specfiles_checked = 0
@@ -31,10 +42,20 @@ class Lint(object):
             self.config.strict = options['strict']
         if options['permissive']:
             self.config.permissive = options['permissive']
+        if options['profile']:
+            self.config.configuration['Profile'] = options['profile']
+        if self.config.configuration['Profile'] not in COST_TIERS:
+            print_warning(f'(none): W: unknown profile {self.config.configuration["Profile"]}, running all the checks')
+            self.config.configuration['Profile'] = COST_TIERS[-1]
         if not self.config.configuration['ExtractDir']:
             self.config.configuration['ExtractDir'] = gettempdir()
         # initialize output buffer
         self.output = Filter(self.config)
+        self.output.format = options['format']
+        # the fingerprint has to be taken before the checks get loaded
+        self.cache = self._open_result_cache()
+        if self.options['no_cache']:
+            self.config.configuration['ElfCacheSize'] = 0
         # preload the check list
         self.load_checks()
 
@@ -48,30 +69,53 @@ class Lint(object):
         if self.options['explain']:
             self.print_explanation(self.options['explain'])
             return retcode
-        # if there are installed arguments just load them up as extra
-        # items to the rpmfile option
-        if self.options['installed']:
-            self.validate_installed_packages(self._load_installed_rpms(self.options['installed']))
-        # if no exclusive option is passed then just loop over all the
-        # arguments that are supposed to be either rpm or spec files
-        self.validate_files(self.options['rpmfile'])
-        self._print_header()
-        print(self.output.print_results(self.output.results))
+        # only the diagnostics go to stdout in the JSON Lines format, the
+        # rest of the report is printed to stderr
+        report = sys.stderr if self.output.format == 'jsonl' else sys.stdout
+        # the diagnostics are written as the packages get checked when
+        # streaming so the header has to go first
+        if self.options['stream']:
+            self._print_header(report)
+        try:
+            # if there are installed arguments just load them up as extra
+            # items to the rpmfile option
+            if self.options['installed']:
+                self.validate_installed_packages(self._load_installed_rpms(self.options['installed']))
+            # if no exclusive option is passed then just loop over all the
+            # arguments that are supposed to be either rpm or spec files
+            self.validate_files(self.options['rpmfile'])
+        finally:
+            self.close()
+        if not self.options['stream']:
+            self._print_header(report)
+        self.output.write_results(self.output.results)
+        if self.output.format == 'text':
+            print('')
         quit_color = Color.Bold
         if self.output.printed_messages['W'] > 0:
             quit_color = Color.Yellow
         if self.output.badness_threshold > 0 and self.output.score > self.output.badness_threshold:
             msg = string_center(f'Badness {self.output.score} exceeeds threshold {self.output.badness_threshold}, aborting.', '-')
-            print(f'{Color.Red}{msg}{Color.Reset}')
+            print(f'{Color.Red}{msg}{Color.Reset}', file=report)
             quit_color = Color.Red
             retcode = 66
         elif self.output.printed_messages['E'] > 0 and not self.config.permissive:
             quit_color = Color.Red
             retcode = 64
         msg = string_center('{} packages and {} specfiles checked; {} errors, {} warnings'.format(self.packages_checked, self.specfiles_checked, self.output.printed_messages['E'], self.output.printed_messages['W']), '=')
-        print(f'{quit_color}{msg}{Color.Reset}')
+        print(f'{quit_color}{msg}{Color.Reset}', file=report)
         return retcode
 
+    def close(self):
+        """
+        Release the resources held by the checks and the result cache
+        """
+        for check in self.checks.values():
+            check.close()
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+
     def _load_installed_rpms(self, packages):
         existing_packages = []
         for name in packages:
@@ -107,29 +151,46 @@ class Lint(object):
                 self.options['rpmlintrc'] = rpmlintrc[0]
                 self.config.load_rpmlintrc(rpmlintrc[0])
 
-    def _print_header(self):
+    def _open_result_cache(self):
+        """
+        Open the persistent cache of the check results if it is enabled
+        """
+        cache_size = self.config.configuration['ResultCacheSize']
+        if self.options['no_cache'] or not cache_size:
+            return None
+        directory = cache_dir(self.config.configuration)
+        try:
+            return ResultCache(directory / 'results.sqlite', cache_size * 1024 * 1024,
+                               self.config.configuration)
+        except (OSError, sqlite3.Error) as e:
+            print_warning(f'(none): W: unable to open the result cache in {directory}: {e}')
+            return None
+
+    def _print_header(self, file=None):
         """
         Print out header information about the state of the
         rpmlint prior printing out the check report.
         """
         intro = string_center('rpmlint session starts', '=')
-        print(f'{Color.Bold}{intro}{Color.Reset}')
-        print(f'rpmlint: {__version__}')
-        print(f'configuration:')
+        print(f'{Color.Bold}{intro}{Color.Reset}', file=file)
+        print(f'rpmlint: {__version__}', file=file)
+        print(f'configuration:', file=file)
         for config in self.config.conf_files:
-            print(f'    {config}')
+            print(f'    {config}', file=file)
         if self.options['rpmlintrc']:
             rpmlintrc = self.options['rpmlintrc']
-            print(f'rpmlintrc: {rpmlintrc}')
-        no_checks = len(self.config.configuration['Checks'])
+            print(f'rpmlintrc: {rpmlintrc}', file=file)
+        print(f'profile: {self.config.configuration["Profile"]}', file=file)
+        no_checks = len(self.checks)
         no_pkgs = len(self.options['installed']) + len(self.options['rpmfile'])
-        print(f'{Color.Bold}checks: {no_checks}, packages: {no_pkgs}{Color.Reset}')
-        print('')
-        print('')
+        print(f'{Color.Bold}checks: {no_checks}, packages: {no_pkgs}{Color.Reset}', file=file)
+        print('', file=file)
+        print('', file=file)
 
     def validate_installed_packages(self, packages):
         for pkg in packages:
             self.run_checks(pkg)
+            self._flush_results()
 
     def validate_files(self, files):
         """
@@ -144,8 +205,40 @@ class Lint(object):
         # check all elements if they are a folder or a file with proper suffix
         # and expand everything
         packages = self._expand_filelist(files)
+        jobs = self.options['jobs']
+        if jobs == 0:
+            jobs = os.cpu_count()
+        if jobs and jobs > 1 and len(packages) > 1:
+            self._validate_files_parallel(packages, jobs)
+            return
         for pkg in packages:
             self.validate_file(pkg)
+            self._flush_results()
+
+    def _flush_results(self):
+        """
+        Write out the diagnostics of the package checked last when
+        streaming, only the counters are kept for the summary then
+        """
+        if self.options['stream']:
+            self.output.flush_results()
+
+    def _validate_files_parallel(self, packages, jobs):
+        """
+        Validate the packages in a pool of worker processes, each of them
+        owning its own check instances, and merge their results back.
+        """
+        # the workers must not pick up the rpmlintrc on their own again,
+        # it was already resolved (or refused) by us
+        options = {**self.options, 'rpmfile': [], 'installed': ''}
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(options, list(self.checks))) as executor:
+            for results, score, printed_messages, packages_checked, specfiles_checked in \
+                    executor.map(_validate_worker, packages):
+                self.output.merge(results, score, printed_messages)
+                self.packages_checked += packages_checked
+                self.specfiles_checked += specfiles_checked
+                self._flush_results()
 
     def _expand_filelist(self, files):
         packages = []
@@ -165,6 +258,9 @@ class Lint(object):
     def validate_file(self, pname):
         try:
             if pname.suffix == '.rpm' or pname.suffix == '.spm':
+                if self.cache:
+                    self.validate_cached_file(pname)
+                    return
                 with Pkg(pname, self.config.configuration['ExtractDir']) as pkg:
                     self.run_checks(pkg)
             elif pname.suffix == '.spec':
@@ -173,9 +269,42 @@ class Lint(object):
         except Exception as e:
             print_warning(f'(none): E: while reading {pname}: {e}')
 
+    def validate_cached_file(self, pname):
+        """
+        Replay the diagnostics of the package from the result cache, check
+        the package and store its diagnostics when it is not cached yet.
+        """
+        if self.host_state is None:
+            self.host_state = '\0'.join(check.host_state() for check in self.checks.values())
+        key = self.cache.key(pname, list(self.checks), self.host_state)
+        diagnostics = self.cache.get(key)
+        if diagnostics is not None:
+            for level, name, arch, linenum, reason, details in diagnostics:
+                self.output.add_info(level, CachedPkg(name, arch, linenum), reason, *details)
+            self.packages_checked += 1
+            return
+
+        self.output.recorded = []
+        try:
+            with Pkg(pname, self.config.configuration['ExtractDir']) as pkg:
+                self.run_checks(pkg)
+            # the extraction can fail for a transient reason like a full disk
+            if not pkg.extraction_error:
+                self.cache.put(key, self.output.recorded)
+        finally:
+            self.output.recorded = None
+
     def run_checks(self, pkg):
+        pkg.extract_filter = self.reads_content
+        if self.content_scanner is None:
+            self.content_scanner = ContentScanner(pattern for check in self.checks.values()
+                                                  for pattern in check.content_patterns)
+        pkg.content_scanner = self.content_scanner
+        pkg.content_cache = ContentCache(self.config.configuration['ContentCacheSize'] * 1024 * 1024)
         for checker in self.checks:
             self.checks[checker].check(pkg)
+        if pkg.extraction_error:
+            self.output.add_info('E', pkg, 'payload-extraction-failed', pkg.extraction_error)
         self.packages_checked += 1
 
     def run_spec_checks(self, pkg):
@@ -183,6 +312,12 @@ class Lint(object):
             self.checks[checker].check_spec(pkg)
         self.specfiles_checked += 1
 
+    def reads_content(self, pkg, pkgfile):
+        """
+        Tell whether some of the loaded checks reads the content of pkgfile
+        """
+        return any(check.reads_content(pkg, pkgfile) for check in self.checks.values())
+
     def print_config(self):
         """
         Just output the current configuration
@@ -208,11 +343,57 @@ class Lint(object):
         for check in self.config.configuration['Checks']:
             if check in self.checks:
                 continue
-            self.checks[check] = self.load_check(check)
+            obj = self.load_check(check)
+            if obj is not None:
+                self.checks[check] = obj
 
     def load_check(self, name):
-        """Load a (check) module by its name, unless it is already loaded."""
+        """
+        Load a (check) module by its name, unless it is already loaded.
+        None is returned when the check is beyond the cost tier of the
+        profile or when all the issues it reports are filtered out, there is
+        no point in running it then.
+        """
         module = importlib.import_module(f'.{name}', package='rpmlint.checks')
         klass = getattr(module, name)
+        if COST_TIERS.index(klass.cost) > COST_TIERS.index(self.config.configuration['Profile']):
+            return None
+        reasons = klass.reported_reasons(self.config, self.output)
+        if reasons and not any(self.output.is_reported(reason) for reason in reasons):
+            return None
         obj = klass(self.config, self.output)
         return obj
+
+
+# Lint instance owned by a worker process of the --jobs pool
+_worker_lint = None
+
+
+def _init_worker(options, checks):
+    """
+    Initialize the Lint instance of a worker process, limited to the checks
+    the parent has loaded.
+    """
+    global _worker_lint
+    _worker_lint = Lint(options)
+    _worker_lint.checks = {name: _worker_lint.checks[name] for name in checks}
+    # the packages are checked in parallel already
+    _worker_lint.config.configuration['ElfThreads'] = 1
+    # the pool runs no atexit handlers in the workers, the finalizers with
+    # exitpriority are run when the worker process exits
+    Finalize(None, _worker_lint.close, exitpriority=10)
+
+
+def _validate_worker(pname):
+    """
+    Validate one file in the worker process and return the collected data
+    so they can be merged in the parent process.
+    """
+    lint = _worker_lint
+    lint.output.reset()
+    lint.packages_checked = 0
+    lint.specfiles_checked = 0
+    lint.validate_file(pname)
+    output = lint.output
+    return (output.results, output.score, output.printed_messages,
+            lint.packages_checked, lint.specfiles_checked)
@@ -1,5 +1,8 @@
 import subprocess
 
+from rpmlint.dwarfreader import read_compile_units
+from rpmlint.elfreader import ElfReaderError
+
 
 class ObjdumpParser:
     """
@@ -18,14 +21,24 @@ class ObjdumpParser:
        <2c>   DW_AT_language    : 32769    (MIPS assembler)
      Compilation Unit @ offset 0x2e:
       Length:        0x3c (32-bit)
+
+    With native set only DW_AT_producer of the compile units is read
+    in-process, objdump is run for the debug information the native
+    reader can't handle.
     """
 
     dw_at_prefix = 'DW_AT_'
 
-    def __init__(self, pkgfile_path, path):
+    def __init__(self, pkgfile_path, path, native=False):
         self.pkgfile_path = pkgfile_path
         self.compile_units = []
         self.parsing_failed_reason = None
+        if native:
+            try:
+                self.compile_units = read_compile_units(pkgfile_path)
+                return
+            except (ElfReaderError, OSError):
+                pass
         self.parse_dwarf_compilation_units()
 
     def parse_dwarf_compilation_units(self):
@@ -1,14 +1,19 @@
+from array import array
 import bz2
 from collections import namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 import gzip
+import io
 import lzma
 import os
 from pathlib import Path
 import re
-from shlex import quote
+import shutil
 import stat
 import subprocess
 import tempfile
+import threading
 from urllib.parse import urljoin
 
 try:
@@ -20,12 +25,31 @@ try:
 except ImportError:
     _magic = None
 import rpm
+from rpmlint.contentcache import ContentCache
+from rpmlint.contentscanner import ContentScanner
 from rpmlint.helpers import byte_to_string, print_warning
 from rpmlint.pkgfile import PkgFile
 
 
+# libmagic cookies can't be shared by threads, every thread gets its own
+_magic_cookies = threading.local()
+_magic_cookies.cookie = _magic
+
+
+def _magic_cookie():
+    cookie = getattr(_magic_cookies, 'cookie', None)
+    if cookie is None:
+        cookie = _magic_cookies.cookie = magic.open(magic.MAGIC_NONE)
+        cookie.load()
+    return cookie
+
+
 DepInfo = namedtuple('DepInfo', ('name', 'flags', 'version'))
 
+# Stand-in for PkgFile when the payload is extracted, it carries just the
+# FileTable columns the reads_content filters of the checks look at
+FileView = namedtuple('FileView', ('name', 'mode', 'flags', 'magic'))
+
 # 64: RPMSENSE_PREREQ is 0 with rpm 4.4..4.7, we want 64 here in order
 # to do the right thing with those versions and packages built with other
 # rpm versions
@@ -359,13 +383,342 @@ def parse_deps(line):
     return prcos
 
 
+# %_isa suffix of the dependency names, e.g. 'foo(x86-64)'
+isa_regex = re.compile(r'\(\w+-\d+\)$')
+
+
+class DependencyIndex(object):
+    """
+    Dependencies of a package read from the header.
+
+    The DepInfo lists of every kind of dependency are created when
+    a check first needs them, the names are indexed so lookups don't have
+    to scan the lists (that matters for packages with thousands of
+    dependencies). get finds the names with the %_isa suffix as well.
+    """
+
+    # kind -> (name, flags, version) header tags, prereq are the requires
+    # with one of the PREREQ_FLAG bits
+    tags = {
+        'requires': (rpm.RPMTAG_REQUIRENAME, rpm.RPMTAG_REQUIREFLAGS,
+                     rpm.RPMTAG_REQUIREVERSION),
+        'provides': (rpm.RPMTAG_PROVIDENAME, rpm.RPMTAG_PROVIDEFLAGS,
+                     rpm.RPMTAG_PROVIDEVERSION),
+        'conflicts': (rpm.RPMTAG_CONFLICTNAME, rpm.RPMTAG_CONFLICTFLAGS,
+                      rpm.RPMTAG_CONFLICTVERSION),
+        'obsoletes': (rpm.RPMTAG_OBSOLETENAME, rpm.RPMTAG_OBSOLETEFLAGS,
+                      rpm.RPMTAG_OBSOLETEVERSION),
+        'recommends': (rpm.RPMTAG_RECOMMENDNAME, rpm.RPMTAG_RECOMMENDFLAGS,
+                       rpm.RPMTAG_RECOMMENDVERSION),
+        'suggests': (rpm.RPMTAG_SUGGESTNAME, rpm.RPMTAG_SUGGESTFLAGS,
+                     rpm.RPMTAG_SUGGESTVERSION),
+        'enhances': (rpm.RPMTAG_ENHANCENAME, rpm.RPMTAG_ENHANCEFLAGS,
+                     rpm.RPMTAG_ENHANCEVERSION),
+        'supplements': (rpm.RPMTAG_SUPPLEMENTNAME, rpm.RPMTAG_SUPPLEMENTFLAGS,
+                        rpm.RPMTAG_SUPPLEMENTVERSION),
+    }
+
+    def __init__(self, header):
+        self.header = header
+        self.lock = threading.Lock()
+        # kind -> list of DepInfo
+        self._deps = {}
+        # kind -> {name: list of DepInfo}
+        self._names = {}
+        self._isa_names = {}
+
+    def _gather(self, kind):
+        nametag, flagstag, versiontag = self.tags[kind]
+        names = self.header[nametag]
+        flags = self.header[flagstag]
+        versions = self.header[versiontag]
+        deps = []
+        prereq = []
+        for loop in range(len(versions or ())):
+            name = byte_to_string(names[loop])
+            evr = stringToVersion(byte_to_string(versions[loop]))
+            if kind == 'requires' and flags[loop] & PREREQ_FLAG:
+                prereq.append(DepInfo(name, flags[loop] & (~PREREQ_FLAG), evr))
+            else:
+                deps.append(DepInfo(name, flags[loop], evr))
+        self._deps[kind] = deps
+        if kind == 'requires':
+            self._deps['prereq'] = prereq
+
+    def deps(self, kind):
+        """
+        Return list of DepInfo of the dependencies of the kind
+        """
+        with self.lock:
+            if kind not in self._deps:
+                self._gather('requires' if kind == 'prereq' else kind)
+            return self._deps[kind]
+
+    def names(self, kind):
+        """
+        Return dictionary of the dependency names of the kind to the list
+        of DepInfo with the name
+        """
+        index = self._names.get(kind)
+        if index is None:
+            index = {}
+            for dep in self.deps(kind):
+                index.setdefault(dep.name, []).append(dep)
+            self._names[kind] = index
+        return index
+
+    def _lookup(self, kind):
+        # the names with and without the %_isa suffix
+        index = self._isa_names.get(kind)
+        if index is None:
+            index = {}
+            for dep in self.deps(kind):
+                index.setdefault(dep.name, []).append(dep)
+                name = isa_regex.sub('', dep.name)
+                if name != dep.name:
+                    index.setdefault(name, []).append(dep)
+            self._isa_names[kind] = index
+        return index
+
+    def get(self, name, kinds=('requires', 'prereq')):
+        """
+        Return list of DepInfo of the kinds named name or name%_isa
+        """
+        deps = []
+        for kind in kinds:
+            deps.extend(self._lookup(kind).get(name, ()))
+        return deps
+
+
+class FileTable(Mapping):
+    """
+    Mapping of the file names of a package to PkgFile objects backed by
+    the file arrays of the header.
+
+    The header data are kept as columns (numeric ones as compact arrays)
+    and a PkgFile is created only when a check accesses the file, so the
+    memory and time needed scale with the files the checks really touch.
+    The created objects are kept, changes made to them persist.
+
+    The files whose type is not known from the header are classified by
+    libmagic only when their magic is read, classify_all does it for all
+    of them on a thread pool.
+    """
+
+    _magic_from_compressed_re = re.compile(r'\([^)]+\s+compressed\s+data\b')
+
+    def __init__(self, header, root):
+        self.root = root
+        names = [byte_to_string(x) for x in header[rpm.RPMTAG_FILENAMES]]
+        # file name -> column index, the last entry wins for duplicate names
+        self.index = {name: idx for idx, name in enumerate(names)}
+        self.flags = array('q', header[rpm.RPMTAG_FILEFLAGS])
+        self.modes = array('q', header[rpm.RPMTAG_FILEMODES])
+        self.sizes = array('q', header[rpm.RPMTAG_FILESIZES])
+        self.mtimes = array('q', header[rpm.RPMTAG_FILEMTIMES])
+        self.rdevs = array('q', header[rpm.RPMTAG_FILERDEVS])
+        inodes = header[rpm.RPMTAG_FILEINODES]
+        # rpm-python < 4.6 does not return a list for this (or FILEDEVICES,
+        # FWIW) for packages containing exactly one file
+        if not isinstance(inodes, list):
+            inodes = [inodes]
+        self.inodes = array('q', inodes)
+        self.users = header[rpm.RPMTAG_FILEUSERNAME]
+        self.groups = header[rpm.RPMTAG_FILEGROUPNAME]
+        self.links = header[rpm.RPMTAG_FILELINKTOS]
+        self.md5s = header[rpm.RPMTAG_FILEMD5S]
+        self.langs = header[rpm.RPMTAG_FILELANGS]
+        self.requires = header[rpm.RPMTAG_FILEREQUIRE]
+        self.provides = header[rpm.RPMTAG_FILEPROVIDE]
+        try:  # rpm >= 4.7.0
+            self.filecaps = header[rpm.RPMTAG_FILECAPS]
+        except AttributeError:
+            self.filecaps = None
+        self.names = names
+        # None stands for the files that have to be classified by libmagic
+        self.magics = [self._header_magic(idx, byte_to_string(magic))
+                       for idx, magic in enumerate(header[rpm.RPMTAG_FILECLASS])]
+        self.pkgfiles = {}
+
+    def _header_magic(self, idx, magic):
+        """
+        Return the file type of the file known without reading it or None
+        if libmagic has to be used
+        """
+        mode = self.modes[idx]
+        if not magic:
+            if stat.S_ISDIR(mode):
+                magic = 'directory'
+            elif stat.S_ISLNK(mode):
+                magic = "symbolic link to `%s'" % self._linkto(idx)
+            elif not self.sizes[idx]:
+                magic = 'empty'
+        if not magic and not self.flags[idx] & rpm.RPMFILE_GHOST and _magic:
+            return None
+        return self._filter_magic(magic)
+
+    def _libmagic(self, idx):
+        """
+        Return the file type of the extracted file as reported by libmagic
+        """
+        magic = ''
+        # file() method evaluates every file twice with python2,
+        # use descriptor() method instead
+        try:
+            path = os.path.normpath(os.path.join(self.root() or '/', self.names[idx].lstrip('/')))
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                magic = byte_to_string(_magic_cookie().descriptor(fd))
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+        return self._filter_magic(magic)
+
+    def classify(self, pkgfile):
+        """
+        Return magic of the pkgfile, it's computed on the first access
+        """
+        idx = self.index[pkgfile.name]
+        if self.magics[idx] is None:
+            self.magics[idx] = self._libmagic(idx)
+        return self.magics[idx]
+
+    def view(self, name):
+        """
+        Return FileView of the file or None if it's not in the table or it
+        has to be classified by libmagic, no PkgFile is created
+        """
+        idx = self.index.get(name)
+        if idx is None or self.magics[idx] is None:
+            return None
+        return FileView(name, self.modes[idx], self.flags[idx], self.magics[idx])
+
+    def classify_all(self):
+        """
+        Classify all the files not known from the header at once, libmagic
+        releases the GIL so the files are classified by a pool of threads
+        """
+        pending = [idx for idx, magic in enumerate(self.magics) if magic is None]
+        if not pending:
+            return
+        # extract the package before the threads need the files
+        self.root()
+        with ThreadPoolExecutor() as executor:
+            for idx, file_magic in zip(pending, executor.map(self._libmagic, pending)):
+                self.magics[idx] = file_magic
+
+    def _filter_magic(self, magic):
+        if magic is None:
+            magic = ''
+        elif self._magic_from_compressed_re.search(magic):
+            # Discard magic from inside compressed files ('file -z')
+            # until PkgFile gets decompression support.  We may get
+            # such magic strings from package headers already now;
+            # for example Fedora's rpmbuild as of F-11's 4.7.1 is
+            # patched so it generates them.
+            magic = ''
+        return magic
+
+    def _linkto(self, idx):
+        link = byte_to_string(self.links[idx])
+        return link and os.path.normpath(link)
+
+    def _create(self, name, idx):
+        pkgfile = PkgFile(name, self.root)
+        pkgfile.flags = self.flags[idx]
+        pkgfile.mode = self.modes[idx]
+        pkgfile.user = byte_to_string(self.users[idx])
+        pkgfile.group = byte_to_string(self.groups[idx])
+        pkgfile.linkto = self._linkto(idx)
+        pkgfile.size = self.sizes[idx]
+        pkgfile.md5 = self.md5s[idx]
+        pkgfile.mtime = self.mtimes[idx]
+        pkgfile.rdev = self.rdevs[idx]
+        pkgfile.inode = self.inodes[idx]
+        pkgfile.requires = parse_deps(byte_to_string(self.requires[idx]))
+        pkgfile.provides = parse_deps(byte_to_string(self.provides[idx]))
+        pkgfile.lang = byte_to_string(self.langs[idx])
+        pkgfile.magic = self.magics[idx]
+        pkgfile.classify = self.classify
+        if self.filecaps:
+            pkgfile.filecaps = self.filecaps[idx]
+        return pkgfile
+
+    def __getitem__(self, name):
+        pkgfile = self.pkgfiles.get(name)
+        if pkgfile is None:
+            # the files are accessed from several threads, all of them
+            # have to get the same object
+            pkgfile = self.pkgfiles.setdefault(name, self._create(name, self.index[name]))
+        return pkgfile
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def names_with_flag(self, flag):
+        """
+        Return the names of the files with the flag as an ordered set
+        (dictionary with None values)
+        """
+        flags = self.flags
+        return {name: None for name, idx in self.index.items() if flags[idx] & flag}
+
+
 # classes representing package
 
+# default memory budget of the file content cache of a package
+CONTENT_CACHE_SIZE = 64 * 1024 * 1024
+
+
 class AbstractPkg(object):
 
     def cleanup(self):
         pass
 
+    def classify_files(self):
+        """
+        Compute magic of all the files at once, it's worth to call it before
+        the magic of most of the files is read
+        """
+        pass
+
+    def read_file(self, path, length=None):
+        """
+        Return the first length bytes (everything when length is None) of
+        the extracted file on path. The content is kept in the content cache
+        so it's read from the disk only once for all the checks.
+        """
+        return self.content_cache.read(path, length)
+
+    def read_lines(self, path):
+        """
+        Return list of the lines of the file on path like helpers.readlines
+        """
+        return [byte_to_string(line) for line in io.BytesIO(self.read_file(path))]
+
+    def open_text(self, path, encoding=None):
+        """
+        Return text stream of the file on path (decoded the same way as
+        when it's opened in the text mode) served from the content cache
+        """
+        return io.TextIOWrapper(io.BytesIO(self.read_file(path)), encoding=encoding)
+
+    def is_utf8(self, path):
+        """
+        Tell whether the content of the file is UTF-8, the compressed files
+        are decompressed first
+        """
+        if compression_algorithm(path) is None:
+            return is_utf8_bytestr(self.read_file(path))
+        return is_utf8(path)
+
     def __enter__(self):
         return self
 
@@ -375,15 +728,26 @@ class AbstractPkg(object):
 
 class Pkg(AbstractPkg):
 
-    _magic_from_compressed_re = re.compile(r'\([^)]+\s+compressed\s+data\b')
-
     def __init__(self, filename, dirname, header=None, is_source=False, extracted=False):
         self.filename = filename
         self.extracted = extracted
-        self.dirname = self.dir_name(dirname)
         self.current_linenum = None
-
-        self._req_names = -1
+        # description of problems that happened while extracting the payload
+        self.extraction_error = None
+        # the payload is extracted only once some check needs the content
+        self.dirname = None
+        self._extract_dir = dirname
+        # callable telling whether the content of a PkgFile has to be
+        # extracted, everything is extracted when not set
+        self.extract_filter = None
+        # ContentScanner with the patterns of the checks, the files are
+        # scanned for all of them at once when grep is first called
+        self.content_scanner = None
+        self._content_matches = {}
+        self.content_cache = ContentCache(CONTENT_CACHE_SIZE)
+        self.files = {}
+
+        self._req_names = None
 
         if header:
             self.header = header
@@ -402,18 +766,16 @@ class Pkg(AbstractPkg):
 
         self.name = self[rpm.RPMTAG_NAME]
 
-        (self.requires, self.prereq, self.provides, self.conflicts,
-         self.obsoletes, self.recommends, self.suggests, self.enhances,
-         self.supplements) = self._gatherDepInfo()
-
-        self.req_names = [x[0] for x in self.requires + self.prereq]
+        self.dependencies = DependencyIndex(self.header)
 
         self.files = self._gatherFilesInfo()
-        self.config_files = [x.name for x in self.files.values() if x.is_config]
-        self.doc_files = [x.name for x in self.files.values() if x.is_doc]
-        self.ghost_files = [x.name for x in self.files.values() if x.is_ghost]
-        self.noreplace_files = [x.name for x in self.files.values() if x.is_noreplace]
-        self.missingok_files = [x.name for x in self.files.values() if x.is_missingok]
+        # names of the files with the given flag, kept in the order of the
+        # files as dictionaries (ordered sets) so membership tests are cheap
+        self.config_files = self.files.names_with_flag(rpm.RPMFILE_CONFIG)
+        self.doc_files = self.files.names_with_flag(rpm.RPMFILE_DOC)
+        self.ghost_files = self.files.names_with_flag(rpm.RPMFILE_GHOST)
+        self.noreplace_files = self.files.names_with_flag(rpm.RPMFILE_NOREPLACE)
+        self.missingok_files = self.files.names_with_flag(rpm.RPMFILE_MISSINGOK)
 
         if self.is_no_source:
             self.arch = 'nosrc'
@@ -426,7 +788,7 @@ class Pkg(AbstractPkg):
     # NoSource files are ghosts in source packages.
     @property
     def is_no_source(self):
-        return self.is_source and self.ghost_files
+        return self.is_source and bool(self.ghost_files)
 
     # access the tags like an array
     def __getitem__(self, key):
@@ -449,8 +811,11 @@ class Pkg(AbstractPkg):
                 val = byte_to_string(val)
             return val
 
-    # return the name of the directory where the package is extracted
+    # return the name of the directory where the package is extracted,
+    # extract it on the first call
     def dirName(self):
+        if self.dirname is None:
+            self.dirname = self.dir_name(self._extract_dir)
         return self.dirname
 
     def dir_name(self, dirname):
@@ -466,15 +831,97 @@ class Pkg(AbstractPkg):
                 prefix='rpmlint.%s.' % Path(self.filename).name, dir=dirname
             )
             dirname = self.__tmpdir.name
-            # TODO: sequence based command invocation
-            # TODO: warn some way if this fails (e.g. rpm2cpio not installed)
-            command_str = \
-                'rpm2cpio %(f)s | cpio -id -D %(d)s ; chmod -R +rX %(d)s' % \
-                {'f': quote(str(self.filename)), 'd': quote(dirname)}
-            subprocess.run(command_str, shell=True)
+            # installed packages have nothing to extract
+            if not self.extracted:
+                self._extract_payload(dirname)
             self.extracted = True
         return dirname
 
+    def _extract_payload(self, dirname):
+        """
+        Stream the payload of the package and write all its files under
+        dirname, the problems encountered are stored in extraction_error.
+        """
+        ts = rpm.TransactionSet()
+        ts.setVSFlags(rpm._RPMVSF_NOSIGNATURES)
+        errors = []
+        try:
+            fd = rpm.fd.open(str(self.filename))
+            try:
+                header = ts.hdrFromFdno(fd)
+                compressor = byte_to_string(header[rpm.RPMTAG_PAYLOADCOMPRESSOR]) or 'gzip'
+                payload = rpm.fd.open(fd, flags=compressor)
+                archive = rpm.files(header).archive(payload)
+                for rpmfile in archive:
+                    # all members of a hardlink set share the content
+                    if stat.S_ISREG(rpmfile.mode) and \
+                            not any(self._reads_content(link.name) for link in rpmfile.links or (rpmfile,)):
+                        continue
+                    try:
+                        self._extract_file(archive, rpmfile, dirname)
+                    except OSError as e:
+                        errors.append(f'{rpmfile.name}: {e.strerror}')
+            finally:
+                fd.close()
+        except (rpm.error, OSError) as e:
+            errors.append(str(e))
+        if errors:
+            self.extraction_error = '; '.join(errors)
+
+    def _reads_content(self, filename):
+        """
+        Tell whether the content of the file is needed by the checks
+        """
+        if self.extract_filter is None:
+            return True
+        view = self.files.view(filename)
+        # files of unknown type have to be extracted to be classified
+        return view is None or self.extract_filter(self, view)
+
+    @staticmethod
+    def _extract_file(archive, rpmfile, dirname):
+        """
+        Write one file of the payload archive under dirname.
+
+        Everything is made readable (and directories and executables also
+        searchable) so the checks are able to inspect the content.
+        """
+        path = os.path.normpath(os.path.join(dirname, rpmfile.name.lstrip('/')))
+        # never write anything outside of the extraction directory, not even
+        # through symlinks to directories extracted before
+        root = os.path.realpath(dirname)
+        if os.path.commonpath((root, os.path.realpath(os.path.dirname(path)))) != root:
+            return
+        mode = rpmfile.mode
+        if stat.S_ISDIR(mode):
+            os.makedirs(path, exist_ok=True)
+            os.chmod(path, stat.S_IMODE(mode) & 0o777 | 0o755)
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if stat.S_ISLNK(mode):
+            os.symlink(rpmfile.linkto, path)
+        elif stat.S_ISREG(mode):
+            with open(path, 'wb') as out:
+                # only the last member of a hardlink set carries the content
+                if archive.hascontent():
+                    shutil.copyfileobj(archive, out)
+            perms = stat.S_IMODE(mode) & 0o777 | 0o644
+            if mode & 0o111:
+                perms |= 0o111
+            os.chmod(path, perms)
+            if rpmfile.nlink > 1 and archive.hascontent():
+                for link in rpmfile.links:
+                    linkpath = os.path.normpath(os.path.join(dirname, link.name.lstrip('/')))
+                    if linkpath != path and \
+                            os.path.commonpath((root, os.path.realpath(os.path.dirname(linkpath)))) == root:
+                        if os.path.lexists(linkpath):
+                            os.unlink(linkpath)
+                        os.link(path, linkpath)
+
+    def classify_files(self):
+        self.files.classify_all()
+
     def checkSignature(self):
         ret = subprocess.run(('rpm', '-K', self.filename), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
         text = ret.stdout.decode()
@@ -484,23 +931,31 @@ class Pkg(AbstractPkg):
 
     # remove the extracted files from the package
     def cleanup(self):
+        self.content_cache.clear()
         if self.extracted and self.dirname:
             self.__tmpdir.cleanup()
 
     def grep(self, regex, filename):
         """Grep regex from a file, return matching line numbers."""
-        ret = []
-        lineno = 0
-        try:
-            with open(Path(self.dirName() or '/', filename.lstrip('/'))) as in_file:
-                for line in in_file:
-                    lineno += 1
-                    if regex.search(line):
-                        ret.append(str(lineno))
-                        break
-        except Exception:
-            pass
-        return ret
+        line = self.content_match(regex, filename)
+        return [str(line)] if line else []
+
+    def content_match(self, regex, filename):
+        """
+        Return the line number of the first match of regex in the file or
+        None if it doesn't match. The results of all the registered patterns
+        are computed in one pass over the file and remembered.
+        """
+        if self.content_scanner is None:
+            self.content_scanner = ContentScanner()
+        self.content_scanner.register(regex)
+        path = Path(self.dirName() or '/', filename.lstrip('/'))
+        matches = self._content_matches.get(filename)
+        if matches is None:
+            matches = self._content_matches[filename] = self.content_scanner.scan(path)
+        elif regex not in matches:
+            matches.update(self.content_scanner.scan(path, [regex]))
+        return matches[regex]
 
     def langtag(self, tag, lang):
         """Get value of tag in the given language."""
@@ -514,82 +969,7 @@ class Pkg(AbstractPkg):
 
     # extract information about the files
     def _gatherFilesInfo(self):
-
-        ret = {}
-        flags = self.header[rpm.RPMTAG_FILEFLAGS]
-        modes = self.header[rpm.RPMTAG_FILEMODES]
-        users = self.header[rpm.RPMTAG_FILEUSERNAME]
-        groups = self.header[rpm.RPMTAG_FILEGROUPNAME]
-        links = [byte_to_string(x) for x in self.header[rpm.RPMTAG_FILELINKTOS]]
-        sizes = self.header[rpm.RPMTAG_FILESIZES]
-        md5s = self.header[rpm.RPMTAG_FILEMD5S]
-        mtimes = self.header[rpm.RPMTAG_FILEMTIMES]
-        rdevs = self.header[rpm.RPMTAG_FILERDEVS]
-        langs = self.header[rpm.RPMTAG_FILELANGS]
-        inodes = self.header[rpm.RPMTAG_FILEINODES]
-        requires = [byte_to_string(x) for x in self.header[rpm.RPMTAG_FILEREQUIRE]]
-        provides = [byte_to_string(x) for x in self.header[rpm.RPMTAG_FILEPROVIDE]]
-        files = [byte_to_string(x) for x in self.header[rpm.RPMTAG_FILENAMES]]
-        magics = [byte_to_string(x) for x in self.header[rpm.RPMTAG_FILECLASS]]
-        try:  # rpm >= 4.7.0
-            filecaps = self.header[rpm.RPMTAG_FILECAPS]
-        except AttributeError:
-            filecaps = None
-
-        # rpm-python < 4.6 does not return a list for this (or FILEDEVICES,
-        # FWIW) for packages containing exactly one file
-        if not isinstance(inodes, list):
-            inodes = [inodes]
-
-        if files:
-            for idx in range(0, len(files)):
-                pkgfile = PkgFile(files[idx])
-                pkgfile.path = os.path.normpath(os.path.join(
-                    self.dirName() or '/', pkgfile.name.lstrip('/')))
-                pkgfile.flags = flags[idx]
-                pkgfile.mode = modes[idx]
-                pkgfile.user = byte_to_string(users[idx])
-                pkgfile.group = byte_to_string(groups[idx])
-                pkgfile.linkto = links[idx] and os.path.normpath(links[idx])
-                pkgfile.size = sizes[idx]
-                pkgfile.md5 = md5s[idx]
-                pkgfile.mtime = mtimes[idx]
-                pkgfile.rdev = rdevs[idx]
-                pkgfile.inode = inodes[idx]
-                pkgfile.requires = parse_deps(requires[idx])
-                pkgfile.provides = parse_deps(provides[idx])
-                pkgfile.lang = byte_to_string(langs[idx])
-                pkgfile.magic = magics[idx]
-                if not pkgfile.magic:
-                    if stat.S_ISDIR(pkgfile.mode):
-                        pkgfile.magic = 'directory'
-                    elif stat.S_ISLNK(pkgfile.mode):
-                        pkgfile.magic = "symbolic link to `%s'" % pkgfile.linkto
-                    elif not pkgfile.size:
-                        pkgfile.magic = 'empty'
-                if (not pkgfile.magic and
-                        not pkgfile.is_ghost and _magic):
-                    # file() method evaluates every file twice with python2,
-                    # use descriptor() method instead
-                    try:
-                        fd = os.open(pkgfile.path, os.O_RDONLY)
-                        pkgfile.magic = byte_to_string(_magic.descriptor(fd))
-                        os.close(fd)
-                    except OSError:
-                        pass
-                if pkgfile.magic is None:
-                    pkgfile.magic = ''
-                elif Pkg._magic_from_compressed_re.search(pkgfile.magic):
-                    # Discard magic from inside compressed files ('file -z')
-                    # until PkgFile gets decompression support.  We may get
-                    # such magic strings from package headers already now;
-                    # for example Fedora's rpmbuild as of F-11's 4.7.1 is
-                    # patched so it generates them.
-                    pkgfile.magic = ''
-                if filecaps:
-                    pkgfile.filecaps = filecaps[idx]
-                ret[pkgfile.name] = pkgfile
-        return ret
+        return FileTable(self.header, self.dirName)
 
     def readlink(self, pkgfile):
         """
@@ -603,82 +983,60 @@ class Pkg(AbstractPkg):
             result = self.files.get(linkpath)
         return result
 
+    @property
+    def requires(self):
+        return self.dependencies.deps('requires')
+
+    @property
+    def prereq(self):
+        return self.dependencies.deps('prereq')
+
+    @property
+    def provides(self):
+        return self.dependencies.deps('provides')
+
+    @property
+    def conflicts(self):
+        return self.dependencies.deps('conflicts')
+
+    @property
+    def obsoletes(self):
+        return self.dependencies.deps('obsoletes')
+
+    @property
+    def recommends(self):
+        return self.dependencies.deps('recommends')
+
+    @property
+    def suggests(self):
+        return self.dependencies.deps('suggests')
+
+    @property
+    def enhances(self):
+        return self.dependencies.deps('enhances')
+
+    @property
+    def supplements(self):
+        return self.dependencies.deps('supplements')
+
+    @property
+    def req_names(self):
+        """
+        Names of the requires and prereq as dictionary (ordered set)
+        """
+        if self._req_names is None:
+            self._req_names = dict.fromkeys(x[0] for x in self.requires + self.prereq)
+        return self._req_names
+
     def check_versioned_dep(self, name, version):
-        # try to match name%_isa as well (e.g. 'foo(x86-64)', 'foo(x86-32)')
-        name_re = re.compile(r'^%s(\(\w+-\d+\))?$' % re.escape(name))
-        for d in self.requires + self.prereq:
-            if name_re.match(d[0]):
-                if d[1] & rpm.RPMSENSE_EQUAL != rpm.RPMSENSE_EQUAL \
-                        or d[2][1] != version:
-                    return False
-                return True
+        # match name%_isa as well (e.g. 'foo(x86-64)', 'foo(x86-32)')
+        for d in self.dependencies.get(name):
+            if d[1] & rpm.RPMSENSE_EQUAL != rpm.RPMSENSE_EQUAL \
+                    or d[2][1] != version:
+                return False
+            return True
         return False
 
-    # internal function to gather dependency info used by the above ones
-    def _gather_aux(self, header, xs, nametag, flagstag, versiontag,
-                    prereq=None):
-        names = header[nametag]
-        flags = header[flagstag]
-        versions = header[versiontag]
-
-        if versions:
-            for loop in range(len(versions)):
-                name = byte_to_string(names[loop])
-                evr = stringToVersion(byte_to_string(versions[loop]))
-                if prereq is not None and flags[loop] & PREREQ_FLAG:
-                    prereq.append((name, flags[loop] & (~PREREQ_FLAG), evr))
-                else:
-                    xs.append(DepInfo(name, flags[loop], evr))
-        return xs, prereq
-
-    def _gatherDepInfo(self):
-        _requires = []
-        _prereq = []
-        _provides = []
-        _conflicts = []
-        _obsoletes = []
-        _recommends = []
-        _suggests = []
-        _enhances = []
-        _supplements = []
-
-        _requires, _prereq = self._gather_aux(self.header, _requires,
-                                              rpm.RPMTAG_REQUIRENAME,
-                                              rpm.RPMTAG_REQUIREFLAGS,
-                                              rpm.RPMTAG_REQUIREVERSION,
-                                              _prereq)
-        _conflits, _ = self._gather_aux(self.header, _conflicts,
-                                        rpm.RPMTAG_CONFLICTNAME,
-                                        rpm.RPMTAG_CONFLICTFLAGS,
-                                        rpm.RPMTAG_CONFLICTVERSION)
-        _provides, _ = self._gather_aux(self.header, _provides,
-                                        rpm.RPMTAG_PROVIDENAME,
-                                        rpm.RPMTAG_PROVIDEFLAGS,
-                                        rpm.RPMTAG_PROVIDEVERSION)
-        _obsoletes, _ = self._gather_aux(self.header, _obsoletes,
-                                         rpm.RPMTAG_OBSOLETENAME,
-                                         rpm.RPMTAG_OBSOLETEFLAGS,
-                                         rpm.RPMTAG_OBSOLETEVERSION)
-        _recommends, _ = self._gather_aux(self.header, _recommends,
-                                          rpm.RPMTAG_RECOMMENDNAME,
-                                          rpm.RPMTAG_RECOMMENDFLAGS,
-                                          rpm.RPMTAG_RECOMMENDVERSION)
-        _suggests, _ = self._gather_aux(self.header, _suggests,
-                                        rpm.RPMTAG_SUGGESTNAME,
-                                        rpm.RPMTAG_SUGGESTFLAGS,
-                                        rpm.RPMTAG_SUGGESTVERSION)
-        _enhances, _ = self._gather_aux(self.header, _enhances,
-                                        rpm.RPMTAG_ENHANCENAME,
-                                        rpm.RPMTAG_ENHANCEFLAGS,
-                                        rpm.RPMTAG_ENHANCEVERSION)
-        _supplements, _ = self._gather_aux(self.header, _supplements,
-                                           rpm.RPMTAG_SUPPLEMENTNAME,
-                                           rpm.RPMTAG_SUPPLEMENTFLAGS,
-                                           rpm.RPMTAG_SUPPLEMENTVERSION)
-
-        return (_requires, _prereq, _provides, _conflicts, _obsoletes, _recommends,
-                _suggests, _enhances, _supplements)
-
     def scriptprog(self, which):
         """
         Get the specified script interpreter as a string.
@@ -733,7 +1091,7 @@ class InstalledPkg(Pkg):
              self[rpm.RPMTAG_ARCH])
 
     def cleanup(self):
-        pass
+        self.content_cache.clear()
 
     def checkSignature(self):
         return (0, 'fake: pgp md5 OK')
@@ -746,6 +1104,7 @@ class FakePkg(AbstractPkg):
         self.arch = None
         self.current_linenum = None
         self.dirname = None
+        self.content_cache = ContentCache(CONTENT_CACHE_SIZE)
 
         # files are dictionary where key is name of a file
         self.files = {f.name: f for f in files} if files else {}
@@ -757,5 +1116,6 @@ class FakePkg(AbstractPkg):
         return self.dirname
 
     def cleanup(self):
+        self.content_cache.clear()
         if self.dirname:
             self.__tmpdir.cleanup()
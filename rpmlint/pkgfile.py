@@ -1,16 +1,20 @@
+import os
+
 import rpm
 
 
 class PkgFile(object):
 
-    __slots__ = ['name', 'path', 'flags', 'mode', 'user', 'group', 'linkto',
+    __slots__ = ['name', 'root', '_path', 'flags', 'mode', 'user', 'group', 'linkto',
                  'size', 'md5', 'mtime', 'rdev', 'inode', 'requires', 'provides',
-                 'lang', 'magic', 'filecaps']
+                 'lang', '_magic', 'classify', 'filecaps']
 
-    def __init__(self, name):
+    def __init__(self, name, root=None):
         self.name = name
-        # Real path to the file (taking extract dir into account)
-        self.path = name
+        # Callable returning the directory the package is extracted to,
+        # it is called only once the real path to the file is needed
+        self.root = root
+        self._path = None
         self.flags = 0
         self.mode = 0
         self.user = None
@@ -24,9 +28,36 @@ class PkgFile(object):
         self.requires = []
         self.provides = []
         self.lang = ''
-        self.magic = ''
+        self._magic = ''
+        # Callable returning the magic of the file, it is called on the
+        # first access when the magic is None
+        self.classify = None
         self.filecaps = None
 
+    @property
+    def path(self):
+        """Real path to the file (taking extract dir into account)."""
+        if self._path is None:
+            if self.root is None:
+                return self.name
+            self._path = os.path.normpath(os.path.join(self.root() or '/', self.name.lstrip('/')))
+        return self._path
+
+    @path.setter
+    def path(self, path):
+        self._path = path
+
+    @property
+    def magic(self):
+        """Type of the file as described by libmagic."""
+        if self._magic is None:
+            self._magic = self.classify(self) if self.classify else ''
+        return self._magic
+
+    @magic.setter
+    def magic(self, magic):
+        self._magic = magic
+
     @property
     def is_config(self):
         return self.flags & rpm.RPMFILE_CONFIG
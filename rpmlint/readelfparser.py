@@ -2,6 +2,8 @@ from itertools import dropwhile, takewhile
 import re
 import subprocess
 
+from rpmlint.elfreader import ElfReaderError, read_elf
+
 
 class ElfSection:
     """
@@ -74,12 +76,23 @@ class ElfSectionInfo:
     section_regex = re.compile(r'.*\] (?P<section>\S*)\s*\S+\s*\S*\s*\S*\s*(?P<size>\w*)')
     pic_regex = re.compile(r'\.rela?\.(data|text)')
 
-    def __init__(self, path):
+    def __init__(self, path, elf_objects=None):
         self.path = path
         self.elf_files = []
         self.parsing_failed_reason = None
         self.pic = False
-        self.parse()
+        if elf_objects is not None:
+            self.load(elf_objects)
+        else:
+            self.parse()
+
+    def load(self, elf_objects):
+        for elf_object in elf_objects:
+            parsed_sections = [ElfSection(s.name, format(s.size, 'x')) for s in elf_object.sections]
+            if any(self.pic_regex.search(s.name) for s in parsed_sections):
+                self.pic = True
+            if len(parsed_sections) > 0:
+                self.elf_files.append(parsed_sections)
 
     def parse(self):
         r = subprocess.run(['readelf', '-W', '-S', self.path], encoding='utf8',
@@ -134,11 +147,19 @@ class ElfProgramHeaderInfo:
 
     header_regex = re.compile('\\s+(?P<header>\\w+)(\\s+\\w+){5}\\s+(?P<flags>[RWE ]{3}).*')
 
-    def __init__(self, path):
+    def __init__(self, path, elf_objects=None):
         self.path = path
         self.headers = []
         self.parsing_failed_reason = None
-        self.parse()
+        if elf_objects is not None:
+            self.load(elf_objects)
+        else:
+            self.parse()
+
+    def load(self, elf_objects):
+        for elf_object in elf_objects:
+            for name, flags in elf_object.program_headers:
+                self.headers.append(ElfProgramHeader(name, flags))
 
     def parse(self):
         r = subprocess.run(['readelf', '-W', '-l', self.path], encoding='utf8',
@@ -201,13 +222,21 @@ class ElfDynamicSectionInfo:
     needed_regex = re.compile('Shared library: \\[(?P<library>[^\\]]+)\\]')
     rpath_regex = re.compile('Library runpath: \\[(?P<path>[^\\]]+)\\]')
 
-    def __init__(self, path):
+    def __init__(self, path, elf_objects=None):
         self.path = path
         self.sections = []
         self.parsing_failed_reason = None
-        self.parse()
+        if elf_objects is not None:
+            self.load(elf_objects)
+        else:
+            self.parse()
         self.parse_meta()
 
+    def load(self, elf_objects):
+        for elf_object in elf_objects:
+            for key, value in elf_object.dynamic:
+                self.sections.append(ElfDynamicSection(key, value))
+
     def parse(self):
         r = subprocess.run(['readelf', '-W', '-d', self.path], encoding='utf8',
                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -260,11 +289,30 @@ class ElfSymbolTableInfo:
 
     section_regex = re.compile('\\s+[0-9]+:\\s\\w+\\s+(\\w+)\\s+(?P<type>\\w+)\\s+(?P<bind>\\w+)\\s+(?P<visibility>\\w+)\\s+\\w+\\s+(?P<name>\\S+)')
 
-    def __init__(self, path):
+    def __init__(self, path, elf_objects=None):
         self.path = path
         self.symbols = []
         self.parsing_failed_reason = None
-        self.parse()
+        if elf_objects is not None:
+            self.load(elf_objects)
+        else:
+            self.parse()
+
+        # index of function names with the @GLIBC version split off,
+        # e.g. 'setuid@GLIBC_2.2.5' -> 'setuid'
+        self.function_names = {self.undecorated_name(sym.name) for sym in self.symbols
+                               if sym.type == 'FUNC'}
+
+    @staticmethod
+    def undecorated_name(name):
+        if '@GLIBC' in name:
+            return name.split('@', 1)[0]
+        return name
+
+    def load(self, elf_objects):
+        for elf_object in elf_objects:
+            for kind, bind, visibility, name in elf_object.symbols:
+                self.symbols.append(ElfSymbol(kind, bind, visibility, name))
 
     def parse(self):
         r = subprocess.run(['readelf', '-W', '-s', self.path], encoding='utf8',
@@ -285,6 +333,35 @@ class ElfSymbolTableInfo:
             if sym.type == 'FUNC' and regex.search(sym.name):
                 yield sym
 
+    def find_functions(self, probes):
+        """
+        Return set of keys of the probes dictionary that match some of the
+        undecorated function names. A probe is either a set of the literal
+        names, looked up in the function index, or a regex.
+
+        All the regexes are matched in one pass over the function index,
+        individual regexes are tried only for the names that match
+        some of them.
+        """
+        found = set()
+        regexes = {}
+        for key, probe in probes.items():
+            if isinstance(probe, re.Pattern):
+                regexes[key] = probe
+            elif not self.function_names.isdisjoint(probe):
+                found.add(key)
+        if not regexes:
+            return found
+        combined = re.compile('|'.join(f'(?:{regex.pattern})' for regex in regexes.values()))
+        matched = set()
+        for name in self.function_names:
+            if combined.search(name):
+                matched.update(key for key, regex in regexes.items()
+                               if key not in matched and regex.search(name))
+                if len(matched) == len(regexes):
+                    break
+        return found | matched
+
 
 class ElfCommentInfo:
     """
@@ -294,11 +371,18 @@ class ElfCommentInfo:
 
     comment_regex = re.compile('\\s+\\[[\\s[0-9]+\\]\\s+(?P<comment>.*)')
 
-    def __init__(self, path):
+    def __init__(self, path, elf_objects=None):
         self.path = path
         self.comments = []
         self.parsing_failed_reason = None
-        self.parse()
+        if elf_objects is not None:
+            self.load(elf_objects)
+        else:
+            self.parse()
+
+    def load(self, elf_objects):
+        for elf_object in elf_objects:
+            self.comments.extend(elf_object.comments)
 
     def parse(self):
         r = subprocess.run(['readelf', '-p', '.comment', self.path], encoding='utf8',
@@ -318,20 +402,31 @@ class ReadelfParser:
     """
     Class contains all information obtained by readelf command
     in a structured format.
+
+    With native set the file is read in-process by the ELF reader in
+    a single pass; readelf is used only when the reader can't handle
+    the file, so the failure reasons stay the ones readelf reports.
     """
 
     so_regex = re.compile(r'/lib(64)?/[^/]+\.so(\.[0-9]+)*$')
 
-    def __init__(self, pkgfile_path, path):
+    def __init__(self, pkgfile_path, path, native=True):
         self.is_archive = path.endswith('.a')
         self.is_shlib = self.so_regex.search(path)
         self.is_debug = path.endswith('.debug')
 
-        self.section_info = ElfSectionInfo(pkgfile_path)
-        self.program_header_info = ElfProgramHeaderInfo(pkgfile_path)
-        self.dynamic_section_info = ElfDynamicSectionInfo(pkgfile_path)
-        self.symbol_table_info = ElfSymbolTableInfo(pkgfile_path)
-        self.comment_section_info = ElfCommentInfo(pkgfile_path)
+        elf_objects = None
+        if native:
+            try:
+                elf_objects = read_elf(pkgfile_path)
+            except (ElfReaderError, OSError):
+                pass
+
+        self.section_info = ElfSectionInfo(pkgfile_path, elf_objects)
+        self.program_header_info = ElfProgramHeaderInfo(pkgfile_path, elf_objects)
+        self.dynamic_section_info = ElfDynamicSectionInfo(pkgfile_path, elf_objects)
+        self.symbol_table_info = ElfSymbolTableInfo(pkgfile_path, elf_objects)
+        self.comment_section_info = ElfCommentInfo(pkgfile_path, elf_objects)
 
     def parsing_failed_reason(self):
         reasons = [self.section_info.parsing_failed_reason,
@@ -24,6 +24,15 @@ class Spellcheck(object):
     def __init__(self):
         pass
 
+    @staticmethod
+    def dictionaries():
+        """
+        Return sorted list of the installed dictionaries as 'language:provider'
+        """
+        if not ENCHANT:
+            return []
+        return sorted(f'{lang}:{provider.name}' for lang, provider in Broker().list_dicts())
+
     def _init_checker(self, lang='en_US'):
         """
         Initialize a checker of selected language if it is not yet present
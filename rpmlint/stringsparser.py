@@ -1,15 +1,26 @@
 import subprocess
 
+from rpmlint.elfreader import ElfReaderError, read_strings
+
 
 class StringsParser:
     """
     Class contains all information obtained by strings command.
+
+    With native set the strings are taken in-process from the read-only
+    data sections of the ELF file, strings is run only for other files.
     """
 
-    def __init__(self, pkgfile_path):
+    def __init__(self, pkgfile_path, native=False):
         self.pkgfile_path = pkgfile_path
         self.strings = []
         self.parsing_failed_reason = None
+        if native:
+            try:
+                self.strings = read_strings(pkgfile_path)
+                return
+            except (ElfReaderError, OSError):
+                pass
         self.parse()
 
     def parse(self):
@@ -1,8 +1,11 @@
+from pathlib import Path
+
 import pytest
 from rpmlint.checks.BinariesCheck import BinariesCheck
 from rpmlint.filter import Filter
+from rpmlint.pkg import FakePkg
 
-from Testing import CONFIG, get_tested_package
+from Testing import CONFIG, get_tested_package, get_tested_path
 
 
 @pytest.fixture(scope='function', autouse=True)
@@ -252,3 +255,26 @@ def test_dependency_information(tmpdir, package, binariescheck):
     out = output.print_results(output.results)
     assert 'E: shared-library-without-dependency-information /usr/lib64/ruby/enc/gb2312.so' in out
     assert 'W: library-not-linked-against-libc /usr/lib64/ruby/continuation.so' in out
+
+
+def test_elf_threads(binariescheck):
+    output, test = binariescheck
+    assert test.executor is None
+    binary = str(get_tested_path(Path('readelf', 'call-setgroups')))
+    elf = test._submit(FakePkg('fake'), binary, '/bin/call-setgroups', True, False).result()
+    assert not elf.readelf_parser.parsing_failed_reason()
+    assert test.executor._max_workers == CONFIG.configuration['ElfThreads']
+    test.close()
+    assert test.executor is None
+
+
+def test_elf_diagnostics_in_file_order(binariescheck):
+    output, test = binariescheck
+    binary = str(get_tested_path(Path('readelf', 'executable-stack')))
+    elf = test._submit(FakePkg('fake'), binary, '/bin/executable-stack', True, False).result()
+    # the worker threads only collect the diagnostics
+    assert not output.results
+    assert elf.diagnostics
+    test._emit_diagnostics(elf)
+    assert 'E: executable-stack /bin/executable-stack' in output.print_results(output.results)
+    test.close()
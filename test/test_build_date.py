@@ -3,6 +3,7 @@ import re
 import pytest
 from rpmlint.checks.BuildDateCheck import BuildDateCheck
 from rpmlint.filter import Filter
+from rpmlint.pkg import FakePkg, FileView
 
 from Testing import CONFIG, get_tested_package
 
@@ -33,3 +34,14 @@ def test_build_date_time_correct(tmpdir, package, builddatecheck):
     out = output.print_results(output.results)
     assert 'E: file-contains-date-and-time' not in out
     assert 'E: file-contains-current-date' not in out
+
+
+def test_reads_content(builddatecheck):
+    output, test = builddatecheck
+    pkg = FakePkg('fake')
+    pkg.is_source = False
+    assert test.reads_content(pkg, FileView('/usr/bin/foo', 0o100755, 0, 'ELF'))
+    assert not test.reads_content(pkg, FileView('/usr/lib/debug/usr/bin/foo.debug', 0o100644, 0, 'ELF'))
+    assert not test.reads_content(pkg, FileView('/usr/lib64/libfoo.so', 0o120777, 0, 'symbolic link'))
+    pkg.is_source = True
+    assert not test.reads_content(pkg, FileView('/usr/bin/foo', 0o100755, 0, 'ELF'))
@@ -0,0 +1,98 @@
+from pathlib import Path
+import time
+
+from rpmlint.cache import ElfCache, ResultCache
+from rpmlint.checks.BinariesCheck import BinariesCheck
+from rpmlint.checks.BuildDateCheck import BuildDateCheck
+from rpmlint.filter import Filter
+from rpmlint.helpers import installed_state
+from rpmlint.lint import Lint
+from rpmlint.pkg import FakePkg, PkgFile
+
+from Testing import CONFIG, get_tested_path, TEST_CONFIG
+
+
+def test_put_get(tmpdir):
+    cache = ResultCache(Path(tmpdir, 'results.sqlite'), 1024 * 1024, CONFIG.configuration)
+    assert cache.get('foo') is None
+    diagnostics = [['E', 'foo', 'x86_64', None, 'some-error', ['/usr/bin/foo']]]
+    cache.put('foo', diagnostics)
+    assert cache.get('foo') == diagnostics
+
+
+def test_eviction(tmpdir):
+    cache = ResultCache(Path(tmpdir, 'results.sqlite'), 200, CONFIG.configuration)
+    diagnostics = [['W', 'foo', 'noarch', None, 'some-warning', ['x' * 50]]]
+    for key in ('first', 'second', 'third'):
+        cache.put(key, diagnostics)
+    assert cache.get('first') is None
+    assert cache.get('third') == diagnostics
+
+
+def test_fingerprint():
+    fingerprint = ResultCache.config_fingerprint(CONFIG.configuration)
+    configuration = {**CONFIG.configuration, 'Filters': ['.*']}
+    assert fingerprint != ResultCache.config_fingerprint(configuration)
+
+
+def test_host_state(tmpdir):
+    cache = ResultCache(Path(tmpdir, 'results.sqlite'), 1024 * 1024, CONFIG.configuration)
+    package = 'test/binary/ruby2.5-rubygem-rubyzip-testsuite-1.2.1-0.x86_64.rpm'
+    check = BuildDateCheck(CONFIG, Filter(CONFIG))
+    assert check.host_state() == time.strftime('%b %e %Y')
+    assert cache.key(package, ['BuildDateCheck'], check.host_state()) != \
+        cache.key(package, ['BuildDateCheck'], 'Jan  1 2000')
+    state = installed_state(['sh', 'no-such-program'])
+    assert 'sh=/' in state
+    assert state.endswith(' no-such-program=')
+
+
+def test_replay(capsys, tmpdir):
+    options = {
+        'config': TEST_CONFIG,
+        'verbose': False,
+        'strict': False,
+        'permissive': False,
+        'print_config': False,
+        'explain': '',
+        'rpmfile': [Path('test/binary/ruby2.5-rubygem-rubyzip-testsuite-1.2.1-0.x86_64.rpm')],
+        'rpmlintrc': False,
+        'installed': '',
+        'jobs': 1,
+        'no_cache': True,
+        'format': 'text',
+        'stream': False,
+        'profile': None,
+    }
+    outputs = []
+    for _ in range(2):
+        linter = Lint(options)
+        linter.cache = ResultCache(Path(tmpdir, 'results.sqlite'), 1024 * 1024,
+                                   linter.config.configuration)
+        linter.checks = {'ZipCheck': linter.checks['ZipCheck']}
+        linter.run()
+        out, err = capsys.readouterr()
+        outputs.append(out)
+        # the cache is closed when the run finishes
+        assert linter.cache is None
+    assert 'W: unable-to-read-zip' in outputs[0]
+    assert outputs[0] == outputs[1]
+
+
+def test_elf_cache(tmpdir):
+    cache = ElfCache(Path(tmpdir, 'elf.sqlite'), 1024 * 1024)
+    pkgfile = PkgFile('/bin/call-setgroups')
+    pkgfile.md5 = 'f0' * 32
+    binary = str(get_tested_path(Path('readelf', 'call-setgroups')))
+    outputs = []
+    for _ in range(2):
+        output = Filter(CONFIG)
+        test = BinariesCheck(CONFIG, output)
+        test.elf_cache = cache
+        elf = test.run_elf_checks(FakePkg('fake', [pkgfile]), binary, pkgfile.name)
+        outputs.append(output.print_results(output.results))
+    assert 'E: missing-call-to-setgroups-before-setuid' in outputs[0]
+    assert outputs[0] == outputs[1]
+    key = cache.key(pkgfile.md5, 'ReadelfParser', pkgfile.name, True)
+    assert cache.get(key).symbol_table_info.function_names == elf.readelf_parser.symbol_table_info.function_names
+    assert key != cache.key(pkgfile.md5, 'ReadelfParser', pkgfile.name, False)
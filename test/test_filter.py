@@ -1,3 +1,5 @@
+import io
+import json
 from pathlib import Path
 from typing.re import Pattern
 
@@ -107,3 +109,36 @@ ngircd.x86_64: E: suse-dbus-unauthorized-service\n"""
     result.info = True
     assert len(result.print_results(result.results).splitlines()) == 11
     assert result.print_results(result.results) == expected_output
+
+
+def test_jsonl_output(tmpdir):
+    """
+    Test the diagnostics are written as JSON objects one per line
+    """
+    cfg = Config(TEST_CONFIG_FILTERS)
+    result = Filter(cfg)
+    result.format = 'jsonl'
+    pkg = get_tested_package(TEST_PACKAGE, tmpdir)
+    result.add_info('E', pkg, 'suse-dbus-unauthorized-service', '')
+    result.add_info('I', pkg, 'suse-other-error', '/usr/bin/1', 'x')
+    stream = io.StringIO()
+    result.write_results(result.results, stream)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {'package': 'ngircd', 'arch': 'x86_64', 'line': None,
+                                    'level': 'I', 'reason': 'suse-other-error',
+                                    'details': ['/usr/bin/1', 'x'], 'badness': 0}
+    assert json.loads(lines[1])['reason'] == 'suse-dbus-unauthorized-service'
+    assert json.loads(lines[1])['details'] == []
+
+
+def test_is_reported():
+    """
+    Test the filtered reasons are recognized and the answers memoized
+    """
+    cfg = Config(TEST_CONFIG_FILTERS)
+    result = Filter(cfg)
+    assert not result.is_reported('invalid-buildhost')
+    assert result.is_reported('no-manual-page-for-binary')
+    assert result._reported == {'invalid-buildhost': False,
+                                'no-manual-page-for-binary': True}
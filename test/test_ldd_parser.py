@@ -2,9 +2,11 @@ from pathlib import Path
 
 import pytest
 from rpmlint.checks.BinariesCheck import BinariesCheck
+from rpmlint.demangler import Demangler
 from rpmlint.filter import Filter
 from rpmlint.lddparser import LddParser
-from rpmlint.pkg import FakePkg
+from rpmlint.libraryresolver import LibraryResolver, read_ld_so_conf
+from rpmlint.pkg import FakePkg, PkgFile
 
 from Testing import CONFIG, get_tested_path
 
@@ -46,6 +48,51 @@ def test_ldd_parser_failure():
     assert 'not-existing-file: No such file or directory' in ldd.parsing_failed_reason
 
 
+def test_native_resolver():
+    resolver = LibraryResolver(FakePkg('fake'), ['/lib64', '/usr/lib64'])
+    ldd = LddParser(get_full_path('appletviewer'), '/usr/bin/appletviewer', resolver)
+    assert not ldd.parsing_failed_reason
+    assert ldd.unused_dependencies[0] == 'libFOO.so'
+    assert ldd.dependencies[0] == 'libFOO.so => not found'
+    assert 'JLI_Launch' in ldd.undefined_symbols
+
+
+def test_native_resolver_package_library():
+    link = PkgFile('/usr/lib64/libFOO.so')
+    link.linkto = 'libFOO.so.1'
+    library = PkgFile('/usr/lib64/libFOO.so.1')
+    library.path = str(get_tested_path(Path('readelf', 'no-soname.so')))
+    resolver = LibraryResolver(FakePkg('fake', [link, library]), ['/lib64', '/usr/lib64'])
+    ldd = LddParser(get_full_path('appletviewer'), '/usr/bin/appletviewer', resolver)
+    assert ldd.dependencies[0] == 'libFOO.so => /usr/lib64/libFOO.so'
+    # JLI_Launch is not defined by the library
+    assert ldd.unused_dependencies[0] == '/usr/lib64/libFOO.so'
+    assert 'JLI_Launch' in ldd.undefined_symbols
+
+
+def test_native_resolver_foreign_machine(tmp_path):
+    # the same library built for other machine (EM_AARCH64) is skipped
+    data = bytearray(get_tested_path(Path('readelf', 'no-soname.so')).read_bytes())
+    data[18:20] = (183).to_bytes(2, 'little')
+    foreign = tmp_path / 'libFOO.so'
+    foreign.write_bytes(bytes(data))
+    library = PkgFile('/usr/lib64/libFOO.so')
+    library.path = str(foreign)
+    resolver = LibraryResolver(FakePkg('fake', [library]), ['/lib64', '/usr/lib64'])
+    ldd = LddParser(get_full_path('appletviewer'), '/usr/bin/appletviewer', resolver)
+    assert ldd.dependencies[0] == 'libFOO.so => not found'
+
+
+def test_ld_so_conf(tmp_path):
+    (tmp_path / 'ld.so.conf.d').mkdir()
+    (tmp_path / 'ld.so.conf.d' / 'multiarch.conf').write_text('# Multiarch\n/usr/lib/x86_64-linux-gnu\n')
+    (tmp_path / 'ld.so.conf').write_text('/opt/lib\ninclude ld.so.conf.d/*.conf\n')
+    conf = str(tmp_path / 'ld.so.conf')
+    assert read_ld_so_conf(conf) == ['/opt/lib', '/usr/lib/x86_64-linux-gnu']
+    resolver = LibraryResolver(FakePkg('fake'), ['/lib64', '/opt/lib'], conf)
+    assert resolver.loader_paths == ['/opt/lib', '/usr/lib/x86_64-linux-gnu', '/lib64']
+
+
 def test_dependencies():
     ldd = lddparser('libtirpc.so.3.0.0')
     assert not ldd.parsing_failed_reason
@@ -55,35 +102,49 @@ def test_dependencies():
 
 def test_unused_dependency_in_package(binariescheck):
     output, test = binariescheck
-    test.run_elf_checks(FakePkg('fake'), get_full_path('libtirpc.so.3.0.0'), '/lib64/x.so')
-    assert not test.readelf_parser.parsing_failed_reason()
-    assert not test.ldd_parser.parsing_failed_reason
+    elf = test.run_elf_checks(FakePkg('fake'), get_full_path('libtirpc.so.3.0.0'), '/lib64/x.so')
+    assert not elf.readelf_parser.parsing_failed_reason()
+    assert not elf.ldd_parser.parsing_failed_reason
     out = output.print_results(output.results)
     assert 'E: unused-direct-shlib-dependency ' in out
 
 
 def test_unused_dependency_in_package_for_executable(binariescheck):
     output, test = binariescheck
-    test.run_elf_checks(FakePkg('fake'), get_full_path('appletviewer'), '/usr/bin/appletviewer')
-    assert not test.readelf_parser.parsing_failed_reason()
-    assert not test.ldd_parser.parsing_failed_reason
+    elf = test.run_elf_checks(FakePkg('fake'), get_full_path('appletviewer'), '/usr/bin/appletviewer')
+    assert not elf.readelf_parser.parsing_failed_reason()
+    assert not elf.ldd_parser.parsing_failed_reason
     out = output.print_results(output.results)
     assert 'W: unused-direct-shlib-dependency ' in out
 
 
 def test_opt_dependency(binariescheck):
     output, test = binariescheck
-    test.run_elf_checks(FakePkg('fake'), get_full_path('opt-dependency'), '/bin/opt-dependency')
-    assert not test.readelf_parser.parsing_failed_reason()
-    assert not test.ldd_parser.parsing_failed_reason
+    elf = test.run_elf_checks(FakePkg('fake'), get_full_path('opt-dependency'), '/bin/opt-dependency')
+    assert not elf.readelf_parser.parsing_failed_reason()
+    assert not elf.ldd_parser.parsing_failed_reason
     out = output.print_results(output.results)
     assert 'E: linked-against-opt-library /bin/opt-dependency /opt/libfoo.so' in out
 
 
 def test_usr_dependency(binariescheck):
     output, test = binariescheck
-    test.run_elf_checks(FakePkg('fake'), get_full_path('usr-dependency'), '/bin/usr-dependency')
-    assert not test.readelf_parser.parsing_failed_reason()
-    assert not test.ldd_parser.parsing_failed_reason
+    elf = test.run_elf_checks(FakePkg('fake'), get_full_path('usr-dependency'), '/bin/usr-dependency')
+    assert not elf.readelf_parser.parsing_failed_reason()
+    assert not elf.ldd_parser.parsing_failed_reason
     out = output.print_results(output.results)
     assert 'W: linked-against-usr-library /bin/usr-dependency /usr/libfoo.so' in out
+
+
+@pytest.mark.parametrize('in_process', [True, False])
+def test_demangler(in_process):
+    demangler = Demangler()
+    if in_process:
+        assert demangler.cxa_demangle is not None
+    else:
+        demangler.cxa_demangle = None
+    assert demangler.demangle('_ZNSt6vectorIiSaIiEE9push_backERKi') == \
+        'std::vector<int, std::allocator<int> >::push_back(int const&)'
+    assert demangler.demangle('_ZTV3foo') == 'vtable for foo'
+    assert demangler.demangle('i') == 'i'
+    assert demangler.demangle('gss_get_mic') == 'gss_get_mic'
@@ -1,9 +1,11 @@
+import importlib
 from pathlib import Path
+import re
 
 import pytest
 from rpmlint.lint import Lint
 
-from Testing import TEST_CONFIG
+from Testing import TEST_CONFIG, testpath
 
 options_preset = {
     'config': TEST_CONFIG,
@@ -15,6 +17,11 @@ options_preset = {
     'rpmfile': '',
     'rpmlintrc': False,
     'installed': '',
+    'jobs': 1,
+    'no_cache': True,
+    'format': 'text',
+    'stream': False,
+    'profile': None,
 }
 
 basic_tests = [
@@ -60,6 +67,49 @@ def test_cases_loading():
     assert list(linter.checks.keys()) == basic_tests
 
 
+def test_filtered_checks_skipped():
+    additional_options = {
+        'config': testpath() / 'configs/testfilteredchecks.config',
+    }
+    options = {**options_preset, **additional_options}
+    linter = Lint(options)
+    # all the issues of LSBCheck are filtered out
+    assert linter.load_check('LSBCheck') is None
+    assert linter.load_check('XinetdDepCheck') is not None
+
+
+def test_profile(capsys):
+    additional_options = {
+        'profile': 'fast',
+        'rpmfile': [Path('test/source/wrongsrc-0-0.src.rpm')],
+    }
+    options = {**options_preset, **additional_options}
+    linter = Lint(options)
+    assert 'TagsCheck' in linter.checks
+    assert 'ZipCheck' not in linter.checks
+    assert 'BinariesCheck' not in linter.checks
+    assert all(check.cost == 'fast' for check in linter.checks.values())
+    linter.run()
+    out, err = capsys.readouterr()
+    assert 'profile: fast' in out
+
+
+def test_described_reasons():
+    """
+    Checks claiming their description file is complete must not report
+    other issues, they could be skipped while those are not filtered
+    """
+    reason_regex = re.compile(r"add_info\(\s*'[EWI]',\s*\w+,\s*'([^']+)'\s*[,)]")
+    linter = Lint(options_preset)
+    for path in Path('rpmlint/checks').glob('*Check.py'):
+        name = path.stem
+        klass = getattr(importlib.import_module(f'rpmlint.checks.{name}'), name)
+        if not klass.describes_all_reasons:
+            continue
+        reasons = set(klass.reported_reasons(linter.config, linter.output))
+        assert set(reason_regex.findall(path.read_text())) <= reasons, name
+
+
 def test_configoutput(capsys):
     additional_options = {
         'print_config': True,
@@ -226,6 +276,49 @@ def test_run_full_rpm(capsys, packages):
     assert not err_reduced
 
 
+@pytest.mark.parametrize('packages', [list(Path('test').glob('*/*.rpm'))])
+@pytest.mark.no_cover
+def test_run_parallel(capsys, packages):
+    """
+    Check the worker pool produces the very same report as a serial run
+    """
+    additional_options = {
+        'rpmfile': packages,
+    }
+    options = {**options_preset, **additional_options}
+    linter = Lint(options)
+    linter.run()
+    serial_out, _ = capsys.readouterr()
+    options['jobs'] = 4
+    linter = Lint(options)
+    linter.run()
+    parallel_out, _ = capsys.readouterr()
+    assert f'{len(packages)} packages and 0 specfiles checked' in parallel_out
+    assert parallel_out == serial_out
+
+
+@pytest.mark.parametrize('packages', [sorted(Path('test/binary').glob('*.rpm'))[:5]])
+def test_run_stream(capsys, packages):
+    """
+    Check the streamed report carries the same diagnostics as the buffered
+    one and nothing is kept once a package is written out
+    """
+    additional_options = {
+        'rpmfile': packages,
+    }
+    options = {**options_preset, **additional_options}
+    linter = Lint(options)
+    linter.run()
+    buffered_out, _ = capsys.readouterr()
+    options['stream'] = True
+    linter = Lint(options)
+    linter.run()
+    stream_out, _ = capsys.readouterr()
+    assert not linter.output.results
+    assert stream_out.startswith(buffered_out.split('\n\n\n')[0])
+    assert sorted(stream_out.splitlines()) == sorted(buffered_out.splitlines())
+
+
 @pytest.mark.parametrize('packages', [list(Path('test/spec').glob('*.spec'))])
 @pytest.mark.no_cover
 def test_run_full_specs(capsys, packages):
@@ -22,10 +22,10 @@ def get_full_path(path):
     return str(get_tested_path(Path('readelf', path)))
 
 
-def objdumpparser(path, system_path=None):
+def objdumpparser(path, system_path=None, native=False):
     if system_path is None:
         system_path = path
-    return ObjdumpParser(get_full_path(path), system_path)
+    return ObjdumpParser(get_full_path(path), system_path, native)
 
 
 def test_basic():
@@ -39,9 +39,40 @@ def test_basic():
     assert first['language'] == '32769\t(MIPS assembler)'
 
 
+@pytest.mark.parametrize('path', ['executable-stack', 'nested-function', 'no-soname.so',
+                                  'hostname', 'dwarf5-compressed', 'archive-with-debuginfo.a'])
+def test_native_reader(path):
+    native = objdumpparser(path, native=True)
+    objdump = objdumpparser(path)
+    assert not native.parsing_failed_reason
+    assert [unit['producer'] for unit in native.compile_units] == \
+        [unit['producer'] for unit in objdump.compile_units]
+
+
+def test_native_reader_compressed():
+    objdump = objdumpparser('dwarf5-compressed', native=True)
+    assert len(objdump.compile_units) == 2
+    assert objdump.compile_units[0]['producer'].startswith('GNU C17 12.2.0 ')
+    assert '-gz=zlib' in objdump.compile_units[0]['producer'].split(' ')
+
+
 def test_executable_stack_package(binariescheck):
     output, test = binariescheck
     test.run_elf_checks(FakePkg('fake'), get_full_path('executable-stack'), 'a.out')
     out = output.print_results(output.results)
     assert 'W: missing-mandatory-optflags a.out -fno-PIE -g -Ofast' in out
     assert 'E: forbidden-optflags a.out -frounding-math' in out
+
+
+def test_disabled_optflags_check():
+    CONFIG.configuration['DisabledElfChecks'] = ['optflags']
+    try:
+        output = Filter(CONFIG)
+        test = BinariesCheck(CONFIG, output)
+    finally:
+        CONFIG.configuration['DisabledElfChecks'] = []
+    elf = test.run_elf_checks(FakePkg('fake'), get_full_path('executable-stack'), 'a.out')
+    out = output.print_results(output.results)
+    assert 'optflags' not in out
+    # objdump is not run at all
+    assert elf._objdump_parser is None
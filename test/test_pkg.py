@@ -1,5 +1,16 @@
+import os
+from pathlib import Path
+import re
+import stat
+
 import rpm
-from rpmlint.pkg import parse_deps, rangeCompare
+from rpmlint import contentscanner
+from rpmlint.contentcache import ContentCache
+from rpmlint.contentscanner import ContentScanner
+from rpmlint.pkg import DependencyIndex, FakePkg, FileTable, FileView, parse_deps, rangeCompare
+from rpmlint.pkgfile import PkgFile
+
+from Testing import get_tested_package
 
 
 def test_parse_deps():
@@ -19,3 +30,194 @@ def test_range_compare():
          ('foo', rpm.RPMSENSE_EQUAL, ('1', '0.5', None))),
     ):
         assert not rangeCompare(req, prov)
+
+
+def test_extract(tmpdir):
+    with get_tested_package(Path('binary', 'ngircd'), tmpdir) as pkg:
+        assert not pkg.extraction_error
+        for pkgfile in pkg.files.values():
+            if stat.S_ISREG(pkgfile.mode) and not pkgfile.is_ghost:
+                assert os.path.isfile(pkgfile.path)
+                assert os.access(pkgfile.path, os.R_OK)
+                assert os.path.getsize(pkgfile.path) == pkgfile.size
+
+
+def test_extract_hardlinks(tmpdir):
+    with get_tested_package(Path('binary', 'duplicates'), tmpdir) as pkg:
+        assert not pkg.extraction_error
+        root = pkg.dirName()
+        assert os.path.samefile(root + '/etc/foo', root + '/var/foo')
+        assert os.path.samefile(root + '/etc/foo2', root + '/var/foo2')
+
+
+def test_lazy_extract(tmpdir):
+    with get_tested_package(Path('binary', 'ngircd'), tmpdir) as pkg:
+        # nothing is extracted while only the header is used
+        assert not pkg.extracted
+        assert pkg.files
+        assert not os.listdir(tmpdir)
+        assert os.path.isdir(pkg.dirName())
+        assert pkg.extracted
+        assert os.listdir(tmpdir)
+
+
+def test_selective_extract(tmpdir):
+    with get_tested_package(Path('binary', 'ngircd'), tmpdir) as pkg:
+        pkg.extract_filter = lambda pkg, pkgfile: pkgfile.name.startswith('/etc/')
+        for pkgfile in pkg.files.values():
+            if stat.S_ISREG(pkgfile.mode) and not pkgfile.is_ghost:
+                assert os.path.exists(pkgfile.path) == pkgfile.name.startswith('/etc/')
+
+
+def test_content_scanner(tmpdir):
+    certificate = re.compile(r'^-----BEGIN CERTIFICATE-----$')
+    rpath = re.compile(r'(?:-rpath|Wl,-R)\b')
+    repeated = re.compile(r'(\w+) \1')
+    scanner = ContentScanner([certificate, rpath, repeated])
+    path = Path(tmpdir, 'file')
+    path.write_bytes(b'#!/bin/sh\n-----BEGIN CERTIFICATE-----\r\nfoo\nbar bar\n')
+    assert scanner.scan(path) == {certificate: 2, rpath: None, repeated: 4}
+    assert scanner.scan(path, [rpath]) == {rpath: None}
+    Path(tmpdir, 'empty').write_bytes(b'')
+    assert scanner.scan(Path(tmpdir, 'empty')) == {certificate: None, rpath: None, repeated: None}
+    assert scanner.scan(Path(tmpdir, 'missing'))[certificate] is None
+
+
+def test_content_scanner_binary(tmpdir):
+    # the lines after the first one that isn't UTF-8 are not searched
+    # like when the file was read in the text mode
+    path = Path(tmpdir, 'binary')
+    path.write_bytes(b'-Wl,-rpath\n\x7fELF\xff -rpath\n-rpath\n')
+    rpath = re.compile(r'-rpath\b')
+    elf = re.compile('ELF')
+    assert ContentScanner([rpath, elf]).scan(path) == {rpath: 1, elf: None}
+    path.write_bytes(b'\x7fELF\xff\n-rpath\n')
+    assert ContentScanner([rpath, elf]).scan(path) == {rpath: None, elf: None}
+
+
+def test_read_text_chunks(tmpdir, monkeypatch):
+    # characters and newlines split by the chunks are read whole
+    monkeypatch.setattr(contentscanner, 'read_chunk_size', 3)
+    path = Path(tmpdir, 'file')
+    path.write_bytes('naïve\r\n€\n'.encode() + b'foo\xff\nbar\n')
+    assert contentscanner.read_text(path) == 'naïve\n€\n'
+
+
+def test_content_scanner_lines(tmpdir):
+    path = Path(tmpdir, 'file')
+    path.write_text('foo\nbar\n\tfoo bar\nnaïve\n')
+    # the matches can't span several lines
+    spaced = re.compile(r'foo\s+bar')
+    negated = re.compile(r'foo[^x]bar')
+    unicode = re.compile(r'na\wve')
+    end = re.compile(r'bar$')
+    scanner = ContentScanner([spaced, negated, unicode, end])
+    assert scanner.scan(path) == {spaced: 3, negated: 3, unicode: 4, end: 2}
+    path.write_text('foo\nbar')
+    assert scanner.scan(path) == {spaced: None, negated: None, unicode: None, end: 2}
+
+
+def test_content_cache(tmpdir):
+    first = Path(tmpdir, 'first')
+    first.write_bytes(b'#!/bin/sh\necho first\n')
+    second = Path(tmpdir, 'second')
+    second.write_bytes(b'second')
+    cache = ContentCache(25)
+    assert cache.read(first, 9) == b'#!/bin/sh'
+    assert cache.size == 9
+    # the head is replaced by the whole content
+    assert cache.read(first) == b'#!/bin/sh\necho first\n'
+    first.write_bytes(b'changed')
+    assert cache.read(first, 4) == b'#!/b'
+    # the least recently used file is evicted when over the budget
+    assert cache.read(second) == b'second'
+    assert cache.size == 6
+    assert cache.read(first) == b'changed'
+    cache.clear()
+    assert not cache.entries and not cache.size
+
+
+def test_content_accessors(tmpdir):
+    path = Path(tmpdir, 'script')
+    path.write_bytes(b'first\r\nsecond\n\xff')
+    pkg = FakePkg('fake')
+    assert pkg.read_lines(path) == ['first\r\n', 'second\n', '\ufffd']
+    with pkg.open_text(path, encoding='latin-1') as f:
+        assert f.readlines() == ['first\n', 'second\n', '\xff']
+    assert not pkg.is_utf8(path)
+    pkg.cleanup()
+    assert not pkg.content_cache.entries
+
+
+def test_dependency_index():
+    header = {
+        rpm.RPMTAG_REQUIRENAME: [b'foo(x86-64)', b'bar', b'/bin/sh', b'python(abi)'],
+        rpm.RPMTAG_REQUIREFLAGS: [rpm.RPMSENSE_EQUAL, 0, rpm.RPMSENSE_SCRIPT_PRE,
+                                  rpm.RPMSENSE_EQUAL],
+        rpm.RPMTAG_REQUIREVERSION: [b'1.0-1', b'', b'', b'3.8'],
+        rpm.RPMTAG_PROVIDENAME: [b'baz', b'baz', b'baz-devel'],
+        rpm.RPMTAG_PROVIDEFLAGS: [0, 0, 0],
+        rpm.RPMTAG_PROVIDEVERSION: [b'', b'', b''],
+    }
+    deps = DependencyIndex(header)
+    assert [x[0] for x in deps.deps('requires')] == ['foo(x86-64)', 'bar', 'python(abi)']
+    assert deps.deps('prereq') == [('/bin/sh', 0, (None, None, None))]
+    assert deps.get('foo') == [('foo(x86-64)', rpm.RPMSENSE_EQUAL, (None, '1.0', '1'))]
+    assert deps.get('foo(x86-64)') == deps.get('foo')
+    assert deps.get('/bin/sh')
+    assert not deps.get('python')
+    assert 'foo' not in deps.names('requires')
+    assert list(deps.names('provides')) == ['baz', 'baz-devel']
+    assert len(deps.names('provides')['baz']) == 2
+
+
+def test_file_table():
+    header = {
+        rpm.RPMTAG_FILENAMES: [b'/etc/foo.conf', b'/usr/bin/foo', b'/usr/lib/libfoo.so'],
+        rpm.RPMTAG_FILEFLAGS: [rpm.RPMFILE_CONFIG, 0, 0],
+        rpm.RPMTAG_FILEMODES: [0o100644, 0o100755, 0o120777],
+        rpm.RPMTAG_FILESIZES: [10, 20, 14],
+        rpm.RPMTAG_FILEMTIMES: [1, 2, 3],
+        rpm.RPMTAG_FILERDEVS: [0, 0, 0],
+        rpm.RPMTAG_FILEINODES: [1, 2, 3],
+        rpm.RPMTAG_FILEUSERNAME: [b'root', b'root', b'root'],
+        rpm.RPMTAG_FILEGROUPNAME: [b'root', b'bin', b'root'],
+        rpm.RPMTAG_FILELINKTOS: [b'', b'', b'libfoo.so.1'],
+        rpm.RPMTAG_FILEMD5S: ['a', 'b', ''],
+        rpm.RPMTAG_FILELANGS: [b'', b'', b''],
+        rpm.RPMTAG_FILEREQUIRE: [b'', b'libc.so.6()(64bit)', b''],
+        rpm.RPMTAG_FILEPROVIDE: [b'', b'', b''],
+        rpm.RPMTAG_FILECLASS: [b'ASCII text', b'ELF 64-bit LSB executable', b''],
+        rpm.RPMTAG_FILECAPS: ['', 'cap_net_raw=ep', ''],
+    }
+    files = FileTable(header, lambda: '/extracted')
+    assert list(files) == ['/etc/foo.conf', '/usr/bin/foo', '/usr/lib/libfoo.so']
+    assert '/usr/bin/foo' in files and '/usr/bin/bar' not in files
+    assert files.view('/usr/bin/foo') == FileView('/usr/bin/foo', 0o100755, 0, 'ELF 64-bit LSB executable')
+    assert files.view('/usr/bin/bar') is None
+    assert not files.pkgfiles
+    pkgfile = files['/usr/bin/foo']
+    assert files.get('/usr/bin/foo') is pkgfile
+    assert list(files.pkgfiles) == ['/usr/bin/foo']
+    assert pkgfile.group == 'bin'
+    assert pkgfile.path == '/extracted/usr/bin/foo'
+    assert pkgfile.requires == [('libc.so.6()(64bit)', 0, (None, None, None))]
+    assert pkgfile.filecaps == 'cap_net_raw=ep'
+    assert files['/usr/lib/libfoo.so'].magic == "symbolic link to `libfoo.so.1'"
+    assert list(files.names_with_flag(rpm.RPMFILE_CONFIG)) == ['/etc/foo.conf']
+
+
+def test_lazy_magic():
+    calls = []
+
+    def classify(pkgfile):
+        calls.append(pkgfile.name)
+        return 'ELF 64-bit LSB executable'
+
+    pkgfile = PkgFile('/usr/bin/foo')
+    assert pkgfile.magic == ''
+    pkgfile.magic = None
+    pkgfile.classify = classify
+    assert pkgfile.magic.startswith('ELF ')
+    assert pkgfile.magic.startswith('ELF ')
+    assert calls == ['/usr/bin/foo']
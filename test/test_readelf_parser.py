@@ -3,9 +3,11 @@ import re
 
 import pytest
 from rpmlint.checks.BinariesCheck import BinariesCheck
+from rpmlint.elfreader import ElfReaderError, read_elf
 from rpmlint.filter import Filter
 from rpmlint.pkg import FakePkg, PkgFile
 from rpmlint.readelfparser import ReadelfParser
+from rpmlint.stringsparser import StringsParser
 
 from Testing import CONFIG, get_tested_path
 
@@ -56,6 +58,17 @@ def test_simple_archive():
     assert len(list(readelf.symbol_table_info.get_functions_for_regex(re.compile('mai.')))) == 1
 
 
+def test_function_index():
+    readelf = readelfparser('call-setgroups')
+    symbols = readelf.symbol_table_info
+    assert 'setgid' in symbols.function_names
+    assert not any('@GLIBC' in name for name in symbols.function_names)
+    assert symbols.find_functions({'uid': re.compile('setuid$'), 'gid': re.compile('setgid$'),
+                                   'groups': re.compile('setgroups$')}) == {'uid', 'gid'}
+    assert symbols.find_functions({'uid': {'setuid', 'seteuid'}, 'groups': {'setgroups'},
+                                   'gid': re.compile('^set.?gid$')}) == {'uid', 'gid'}
+
+
 def test_program_header_parsing():
     readelf = readelfparser('nested-function')
     assert len(readelf.program_header_info.headers) == 11
@@ -92,8 +105,8 @@ def test_rpath():
 
 def test_lto_bytecode(binariescheck):
     output, test = binariescheck
-    test.run_elf_checks(FakePkg('fake'), get_full_path('lto-object.o'), 'x.a')
-    assert not test.readelf_parser.parsing_failed_reason()
+    elf = test.run_elf_checks(FakePkg('fake'), get_full_path('lto-object.o'), 'x.a')
+    assert not elf.readelf_parser.parsing_failed_reason()
     out = output.print_results(output.results)
     assert 'lto-bytecode' in out
 
@@ -140,7 +153,7 @@ def test_archive_with_debuginfo(binariescheck):
 def test_executable_stack(binariescheck):
     output, test = binariescheck
     test.run_elf_checks(FakePkg('fake'), get_full_path('executable-stack'), 'a.out')
-    assert 'E: executable-stack' in output.results[0]
+    assert 'E: executable-stack' in output.format_diagnostic(output.results[0])
 
 
 def test_readelf_failure():
@@ -222,7 +235,58 @@ def test_missing_dependency(binariescheck):
     out = output.print_results(output.results)
     assert 'E: statically-linked-binary' in out
 
-    test.is_shobj = True
-    test.run_elf_checks(FakePkg('fake'), get_full_path('no-dependency.so'), '/lib64/no-dependency.so')
+    test.run_elf_checks(FakePkg('fake'), get_full_path('no-dependency.so'), '/lib64/no-dependency.so',
+                        is_shobj=True)
     out = output.print_results(output.results)
     assert 'E: shared-library-without-dependency-information' in out
+
+
+@pytest.mark.parametrize('path', ['main.a', 'nested-function', 'libutil-2.29.so', 'rpath-lib.so',
+                                  'lto-object.o', 'archive-with-debuginfo.a'])
+def test_native_reader(path):
+    native = ReadelfParser(get_full_path(path), path)
+    readelf = ReadelfParser(get_full_path(path), path, native=False)
+    assert not native.parsing_failed_reason()
+    assert [[(s.name, s.size) for s in f] for f in native.section_info.elf_files] == \
+        [[(s.name, s.size) for s in f] for f in readelf.section_info.elf_files]
+    assert native.section_info.pic == readelf.section_info.pic
+    assert [(h.name, h.flags) for h in native.program_header_info.headers] == \
+        [(h.name, h.flags) for h in readelf.program_header_info.headers]
+    assert [(d.key, d.value) for d in native.dynamic_section_info.sections] == \
+        [(d.key, d.value) for d in readelf.dynamic_section_info.sections]
+    # newer readelf prints names of the section symbols
+    symbols = {(s.type, s.bind, s.visibility, s.name) for s in readelf.symbol_table_info.symbols
+               if s.type != 'SECTION'}
+    assert {(s.type, s.bind, s.visibility, s.name) for s in native.symbol_table_info.symbols} == symbols
+    assert native.comment_section_info.comments == readelf.comment_section_info.comments
+
+
+def test_native_reader_fallback():
+    with pytest.raises(ElfReaderError):
+        read_elf(__file__)
+    readelf = ReadelfParser(__file__, '/lib64/not-an-elf.so')
+    assert 'Not an ELF file' in readelf.parsing_failed_reason()
+
+
+def test_native_strings():
+    path = get_full_path('hostname')
+    strings = StringsParser(path, native=True).strings
+    assert any(s.startswith('Usage: hostname') for s in strings)
+    assert set(strings) <= set(StringsParser(path).strings)
+
+
+@pytest.mark.parametrize('good_param, waived', [('ld-linux', True), ('SYSLOG', False)])
+def test_forbidden_function_waiver(good_param, waived):
+    forbidden_functions = CONFIG.configuration['WarnOnFunction']
+    CONFIG.configuration['WarnOnFunction'] = {
+        'setgid-call': {'f_name': 'setgid', 'good_param': good_param, 'description': 'setgid is called'},
+    }
+    try:
+        output = Filter(CONFIG)
+        test = BinariesCheck(CONFIG, output)
+    finally:
+        CONFIG.configuration['WarnOnFunction'] = forbidden_functions
+    assert output.error_details['setgid-call'] == 'setgid is called'
+    test.run_elf_checks(FakePkg('fake'), get_full_path('call-setgroups'), '/bin/call-setgroups')
+    out = output.print_results(output.results)
+    assert ('W: setgid-call /bin/call-setgroups setgid' in out) != waived